@@ -1,8 +1,6 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
-from flask_cors import CORS
 from dotenv import load_dotenv
 from pathlib import Path
 import os
@@ -11,6 +9,21 @@ from datetime import datetime
 
 from models import db
 from routes import register_routes
+from utils.instrumentation import init_instrumentation
+from utils.metrics import init_metrics, watch_engine, registry
+from utils.health import CachedProbe
+from utils.database import configure_database
+from utils.startup import LazyGroup, import_profile_command, init_db_command
+from utils.cors import init_cors
+from utils.digest import init_digests
+from utils.changes import init_changes
+from utils.tracking import init_tracking
+from utils.storage import init_storage
+from utils.media import init_media_processing
+from utils.similarity import init_similarity
+from utils.triage import init_triage
+from utils.archive import init_archive
+from utils.summaries import init_summaries
 
 # Load environment variables
 load_dotenv(dotenv_path=Path('.') / '.env')
@@ -22,59 +35,14 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def create_app():
-    """Application factory pattern"""
-    app = Flask(__name__)
+def create_app(config=None):
+    """Application factory pattern
     
-    # CORS Configuration - COMPREHENSIVE FIX
-    # Handle multiple scenarios: with and without /api prefix, different origins
-    CORS(app, 
-         resources={
-             r"/api/*": {
-                 "origins": [
-                     "http://localhost:5173",    # Vite dev server
-                     "http://127.0.0.1:5173",   # Alternative localhost
-                     "http://localhost:3000",   # Alternative React dev server
-                     "http://localhost:5174",   # Alternative Vite port
-                     "https://jiseti.go.ke",    # Production domain (if applicable)
-                 ],
-                 "methods": ["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"],
-                 "allow_headers": [
-                     "Content-Type", 
-                     "Authorization", 
-                     "Access-Control-Allow-Credentials",
-                     "Access-Control-Allow-Origin",
-                     "X-Requested-With",
-                     "Accept",
-                     "Origin"
-                 ],
-                 "supports_credentials": True,
-                 "expose_headers": ["Content-Range", "X-Content-Range"],
-                 "max_age": 600  # Cache preflight for 10 minutes
-             },
-             r"/*": {  # Fallback for routes without /api prefix (your current setup)
-                 "origins": [
-                     "http://localhost:5173",
-                     "http://127.0.0.1:5173", 
-                     "http://localhost:3000",
-                     "http://localhost:5174",
-                     "https://jiseti.go.ke"
-                 ],
-                 "methods": ["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"],
-                 "allow_headers": [
-                     "Content-Type", 
-                     "Authorization", 
-                     "Access-Control-Allow-Credentials",
-                     "Access-Control-Allow-Origin",
-                     "X-Requested-With",
-                     "Accept",
-                     "Origin"
-                 ],
-                 "supports_credentials": True,
-                 "expose_headers": ["Content-Range", "X-Content-Range"],
-                 "max_age": 600
-             }
-         })
+    Args:
+        config (dict): Optional settings applied over the environment-derived
+            configuration before extensions are initialized (e.g. for tests)
+    """
+    app = Flask(__name__)
     
     # Database Configuration
     database_url = os.getenv('SQLALCHEMY_DATABASE_URI')
@@ -85,10 +53,6 @@ def create_app():
     
     app.config['SQLALCHEMY_DATABASE_URI'] = database_url
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
-        'pool_pre_ping': True,  # Verify connections before use
-        'pool_recycle': 300,    # Recycle connections every 5 minutes
-    }
     
     # JWT Configuration
     jwt_secret = os.getenv('JWT_SECRET_KEY')
@@ -99,68 +63,86 @@ def create_app():
     app.config['JWT_SECRET_KEY'] = jwt_secret
     app.config['JWT_ACCESS_TOKEN_EXPIRES'] = False  # Tokens don't expire for simplicity
     
-    # CORS Fix: Handle preflight requests explicitly
-    @app.before_request
-    def handle_preflight():
-        if request.method == "OPTIONS":
-            response = jsonify({'status': 'OK'})
-            
-            # Get the origin from the request
-            origin = request.headers.get('Origin')
-            
-            # List of allowed origins
-            allowed_origins = [
-                'http://localhost:5173',
-                'http://127.0.0.1:5173',
-                'http://localhost:3000', 
-                'http://localhost:5174',
-                'https://jiseti.go.ke'
-            ]
-            
-            # Set CORS headers if origin is allowed
-            if origin in allowed_origins:
-                response.headers['Access-Control-Allow-Origin'] = origin
-                response.headers['Access-Control-Allow-Credentials'] = 'true'
-                response.headers['Access-Control-Allow-Methods'] = 'GET, POST, PUT, DELETE, PATCH, OPTIONS'
-                response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization, X-Requested-With, Accept, Origin'
-                response.headers['Access-Control-Max-Age'] = '600'
-            
-            return response
-    
-    # CORS Fix: Add headers to all responses as backup
+    if config:
+        app.config.update(config)
+    
+    # Pool sizing per environment (DB_POOL_* overrides) and read-replica binds
+    configure_database(app)
+    
+    # CORS: one precompiled origin policy; preflights are answered before routing
+    init_cors(app)
+    
+    # Security headers (unchanged from original)
     @app.after_request
-    def after_request(response):
-        # Get the origin from the request
-        origin = request.headers.get('Origin')
-        
-        # List of allowed origins
-        allowed_origins = [
-            'http://localhost:5173',
-            'http://127.0.0.1:5173',
-            'http://localhost:3000',
-            'http://localhost:5174', 
-            'https://jiseti.go.ke'
-        ]
-        
-        # Add CORS headers if origin is allowed
-        if origin in allowed_origins:
-            response.headers['Access-Control-Allow-Origin'] = origin
-            response.headers['Access-Control-Allow-Credentials'] = 'true'
-            response.headers['Access-Control-Allow-Methods'] = 'GET, POST, PUT, DELETE, PATCH, OPTIONS'
-            response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization, X-Requested-With, Accept, Origin'
-        
-        # Security headers (unchanged from original)
+    def add_security_headers(response):
         response.headers['X-Content-Type-Options'] = 'nosniff'
         response.headers['X-Frame-Options'] = 'DENY'
         response.headers['X-XSS-Protection'] = '1; mode=block'
-        
         return response
     
     # Initialize extensions
     db.init_app(app)
-    migrate = Migrate(app, db)
     jwt = JWTManager(app)
     
+    # `flask db ...` imports Flask-Migrate/alembic only when the command is run
+    def load_migrate_commands():
+        from flask_migrate import Migrate
+        from flask_migrate.cli import db as db_cli_group
+        Migrate(app, db)
+        return db_cli_group
+    
+    app.cli.add_command(LazyGroup('db', load_migrate_commands, help='Perform database migrations.'))
+    app.cli.add_command(import_profile_command)
+    app.cli.add_command(init_db_command)
+    
+    # Status-change notifications coalesced into per-user digests
+    init_digests(app)
+    
+    # Record change feed (/changes, /changes/stream) and its retention command
+    init_changes(app)
+    
+    # Anonymous report tracking lookups (/public/track/<token>) are cached briefly
+    init_tracking(app)
+    
+    # Media object store: clients upload straight to it with presigned URLs
+    init_storage(app)
+    
+    # Thumbnails, transcodes and EXIF stripping for uploaded media (process pool)
+    init_media_processing(app)
+    
+    # Duplicate report detection (MinHash/LSH index, /admin/records/<id>/similar)
+    init_similarity(app)
+    
+    # Admin triage queue (/admin/queue) priority maintenance command
+    init_triage(app)
+    
+    # Moves old resolved/rejected records to the (partitioned) archive
+    init_archive(app)
+    
+    # Denormalized record summary columns and their repair command
+    init_summaries(app)
+    
+    # Per-request SQL query count / timing (Server-Timing header, logs, /admin/debug/queries)
+    init_instrumentation(app)
+    
+    # Prometheus-style request, pool, notification and cache metrics (/metrics)
+    init_metrics(app)
+    with app.app_context():
+        watch_engine(db.engine)
+    replicas = app.extensions.get('jiseti_replicas')
+    if replicas:
+        for name, engine in replicas.engines.items():
+            watch_engine(engine, name)
+    
+    # Readiness probe result is cached so frequent probes don't hit the database
+    app.config['READINESS_CACHE_SECONDS'] = float(os.getenv('READINESS_CACHE_SECONDS', 5))
+    
+    def check_database():
+        with app.app_context():
+            db.session.execute(db.text('SELECT 1'))
+    
+    database_probe = CachedProbe('readiness_probe', check_database, ttl=app.config['READINESS_CACHE_SECONDS'])
+    
     # Register routes (unchanged from original)
     register_routes(app)
     
@@ -182,21 +164,43 @@ def create_app():
     @app.route('/health')
     def health_check():
         """Health check endpoint for monitoring"""
-        try:
-            # Test database connection
-            db.session.execute('SELECT 1')
+        probe = database_probe()
+        if probe['ok']:
             return jsonify({
                 "status": "healthy",
                 "database": "connected",
                 "timestamp": str(datetime.utcnow())
             }), 200
-        except Exception as e:
-            logger.error(f"Health check failed: {str(e)}")
-            return jsonify({
-                "status": "unhealthy", 
-                "database": "disconnected",
-                "error": str(e)
-            }), 500
+        
+        logger.error(f"Health check failed: {probe['error']}")
+        return jsonify({
+            "status": "unhealthy", 
+            "database": "disconnected",
+            "error": probe['error']
+        }), 500
+    
+    @app.route('/livez')
+    def liveness_check():
+        """Liveness probe - the process is up and serving, no dependencies checked"""
+        return jsonify({"status": "alive"}), 200
+    
+    @app.route('/readyz')
+    def readiness_check():
+        """Readiness probe - database reachable (result cached for a few seconds)"""
+        probe = database_probe()
+        return jsonify({
+            "status": "ready" if probe['ok'] else "not ready",
+            "database": "connected" if probe['ok'] else "disconnected",
+            "checked_at": datetime.utcfromtimestamp(probe['checked_at']).isoformat()
+        }), 200 if probe['ok'] else 503
+    
+    @app.route('/metrics')
+    def metrics():
+        """Prometheus text-format metrics"""
+        metrics_token = os.getenv('METRICS_TOKEN')
+        if metrics_token and request.headers.get('Authorization') != f'Bearer {metrics_token}':
+            return jsonify({'error': 'Unauthorized', 'message': 'Metrics token required'}), 401
+        return Response(registry.render(), mimetype='text/plain; version=0.0.4')
     
     # Error handlers (unchanged from original)
     @app.errorhandler(404)
@@ -260,35 +264,22 @@ def create_app():
     
     return app
 
-# Create the app instance
-app = create_app()
+_app = None
+
+def __getattr__(name):
+    """Create the module-level `app` (e.g. gunicorn app:app) on first access, not at import"""
+    global _app
+    if name == 'app':
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 if __name__ == '__main__':
-    with app.app_context():
-        try:
-            # Create all database tables
-            db.create_all()
-            logger.info("Database tables created successfully")
-            
-            # Check if we need to create a default admin
-            from models import Administrator
-            from werkzeug.security import generate_password_hash
-            
-            if not Administrator.query.first():
-                default_admin = Administrator(
-                    name="Default Admin",
-                    email="admin@jiseti.go.ke",
-                    password=generate_password_hash("admin123"),
-                    admin_number="ADM-DEFAULT-001"
-                )
-                db.session.add(default_admin)
-                db.session.commit()
-                logger.info("Default admin created: admin@jiseti.go.ke / admin123")
-            
-        except Exception as e:
-            logger.error(f"Database initialization failed: {str(e)}")
-    
-    # Run the development server
+    app = create_app()
+    
+    # Run the development server (tables and the default admin come from `flask init-db`;
+    # production serving uses gunicorn.conf.py)
     port = int(os.getenv('PORT', 5000))
     debug = os.getenv('FLASK_ENV') == 'development'
     
@@ -0,0 +1,75 @@
+# benchmarks/bench_micro.py
+"""
+Microbenchmarks for serialization, validation and email formatting hot paths.
+
+Run with: python -m pytest benchmarks/bench_micro.py --benchmark-autosave
+Compare with: python -m pytest benchmarks/bench_micro.py --benchmark-compare
+"""
+from datetime import datetime
+
+import pytest
+
+from models import NormalUser, Record, Media, StatusHistory, Administrator
+from utils.validators import validate_email, validate_media_url, validate_coordinates
+from utils.emailer import format_email_html
+
+@pytest.fixture
+def record():
+    """Build a detached record with media, owner and history - no database needed"""
+    now = datetime.utcnow()
+    record = Record(
+        id=1,
+        type='red-flag',
+        title='Police officer demanding bribes at roadblock',
+        description='A police officer at the checkpoint is demanding 500 KSH from drivers.' * 5,
+        status='under-investigation',
+        latitude=-1.2921,
+        longitude=36.8219,
+        location_name='Nairobi CBD',
+        urgency_level='high',
+        vote_count=12,
+        is_anonymous=False,
+        normal_user_id=1,
+        creator_name='Alice Wanjiku',
+        media_count=3,
+        created_at=now,
+        updated_at=now,
+    )
+    record.normal_user = NormalUser(id=1, name='Alice Wanjiku', email='alice.wanjiku@gmail.com', password='x')
+    record.media = [
+        Media(id=i, record_id=1, media_type='image', media_url=f'https://cdn.example.com/{i}.jpg',
+              position=i, uploaded_at=now)
+        for i in range(3)
+    ]
+    return record
+
+def test_record_to_dict(benchmark, record):
+    result = benchmark(record.to_dict)
+    assert result['creator_name'] == 'Alice Wanjiku'
+
+def test_record_to_public_dict(benchmark, record):
+    result = benchmark(record.to_public_dict)
+    assert result['creator_name'] == 'Anonymous'
+
+def test_status_history_to_dict(benchmark):
+    history = StatusHistory(id=1, record_id=1, old_status='draft', new_status='resolved',
+                            changed_by=1, changed_at=datetime.utcnow())
+    history.admin = Administrator(id=1, name='Catherine Kariuki')
+    result = benchmark(history.to_dict)
+    assert result['admin_name'] == 'Catherine Kariuki'
+
+def test_validate_email(benchmark):
+    assert benchmark(validate_email, 'alice.wanjiku@gmail.com')
+
+def test_validate_media_url_image(benchmark):
+    assert benchmark(validate_media_url, 'https://cdn.example.com/evidence/photo.JPG', 'image')
+
+def test_validate_media_url_video(benchmark):
+    assert benchmark(validate_media_url, 'https://cdn.example.com/evidence/clip.webm', 'video')
+
+def test_validate_coordinates(benchmark):
+    assert benchmark(validate_coordinates, -1.2921, 36.8219)
+
+def test_format_email_html(benchmark):
+    message = "Hello Alice,\n\nYour record has been updated.\n\nStatus: DRAFT ➝ RESOLVED\n" * 3
+    assert '<br>' in benchmark(format_email_html, message)
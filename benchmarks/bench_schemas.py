@@ -0,0 +1,109 @@
+# benchmarks/bench_schemas.py
+"""
+Declarative schema validation vs the previous hand-written route checks.
+
+Run with: python -m pytest benchmarks/bench_schemas.py --benchmark-group-by=param:payload
+"""
+import re
+from urllib.parse import urlparse
+
+import pytest
+
+from utils.schemas import CREATE_RECORD, SIGNUP
+
+# Previous per-request path, kept verbatim for comparison: string patterns
+# passed to re.match, extension lists rebuilt and urlparse on every call
+
+def legacy_validate_email(email):
+    if not email:
+        return False
+    gmail_pattern = r'^[a-zA-Z0-9._%+-]+@gmail\.com$'
+    return re.match(gmail_pattern, email) is not None
+
+def legacy_validate_media_url(url, media_type=None):
+    if not url:
+        return True
+    try:
+        result = urlparse(url)
+        if not all([result.scheme, result.netloc]):
+            return False
+        if result.scheme not in ['http', 'https']:
+            return False
+        if media_type:
+            url_lower = url.lower()
+            if media_type == 'image':
+                image_extensions = ['.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp']
+                if not any(url_lower.endswith(ext) for ext in image_extensions):
+                    return False
+            elif media_type == 'video':
+                video_extensions = ['.mp4', '.avi', '.mov', '.wmv', '.flv', '.webm', '.mkv']
+                if not any(url_lower.endswith(ext) for ext in video_extensions):
+                    return False
+        return True
+    except Exception:
+        return False
+
+def legacy_validate_coordinates(latitude, longitude):
+    try:
+        if latitude is None or longitude is None:
+            return True
+        lat = float(latitude)
+        lng = float(longitude)
+        return -90 <= lat <= 90 and -180 <= lng <= 180
+    except (ValueError, TypeError):
+        return False
+
+def legacy_create_record_checks(data):
+    if not data.get('title'):
+        return 'Title is required'
+    if data.get('type') not in ['red-flag', 'intervention', 'incident', 'complaint', 'suggestion', 'emergency']:
+        data['type'] = 'red-flag'
+    if data.get('latitude') is not None or data.get('longitude') is not None:
+        if not legacy_validate_coordinates(data.get('latitude'), data.get('longitude')):
+            return 'Invalid coordinates provided'
+    image_url = data.get('image_url')
+    video_url = data.get('video_url')
+    if image_url and not legacy_validate_media_url(image_url, 'image'):
+        return 'Invalid image URL format'
+    if video_url and not legacy_validate_media_url(video_url, 'video'):
+        return 'Invalid video URL format'
+    return None
+
+def legacy_signup_checks(data):
+    if not all(data.get(field) for field in ['name', 'email', 'password']):
+        return 'Name, email, and password are required'
+    if not legacy_validate_email(data['email']):
+        return 'Email must be a valid Gmail address (@gmail.com)'
+    if len(data['password']) < 6:
+        return 'Password must be at least 6 characters long'
+    return None
+
+RECORD_PAYLOAD = {
+    'title': 'Police officer demanding bribes at roadblock',
+    'description': 'A police officer at the checkpoint is demanding 500 KSH from drivers.',
+    'type': 'red-flag',
+    'latitude': -1.2921,
+    'longitude': 36.8219,
+    'location_name': 'Nairobi CBD',
+    'urgency_level': 'high',
+    'image_url': 'https://cdn.example.com/evidence/photo.jpg',
+    'video_url': 'https://cdn.example.com/evidence/clip.mp4',
+}
+
+SIGNUP_PAYLOAD = {'name': 'Alice Wanjiku', 'email': 'alice.wanjiku@gmail.com', 'password': 'password123'}
+
+@pytest.mark.parametrize('payload', ['create_record'])
+def test_create_record_legacy(benchmark, payload):
+    assert benchmark(lambda: legacy_create_record_checks(dict(RECORD_PAYLOAD))) is None
+
+@pytest.mark.parametrize('payload', ['create_record'])
+def test_create_record_schema(benchmark, payload):
+    assert benchmark(CREATE_RECORD.validate, RECORD_PAYLOAD)[1] is None
+
+@pytest.mark.parametrize('payload', ['signup'])
+def test_signup_legacy(benchmark, payload):
+    assert benchmark(legacy_signup_checks, SIGNUP_PAYLOAD) is None
+
+@pytest.mark.parametrize('payload', ['signup'])
+def test_signup_schema(benchmark, payload):
+    assert benchmark(SIGNUP.validate, SIGNUP_PAYLOAD)[1] is None
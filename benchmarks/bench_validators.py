@@ -0,0 +1,74 @@
+# benchmarks/bench_validators.py
+"""
+Batch vs per-value validator cost on large columns (1M values by default).
+
+Run with: python -m pytest benchmarks/bench_validators.py
+Set BENCH_ROWS to change the column size. Each result records per_row_ns in
+extra_info (shown with --benchmark-json / --benchmark-autosave).
+"""
+import os
+import random
+
+import pytest
+
+from utils.validators import (
+    validate_email, validate_media_url, validate_coordinates, validate_phone_number, sanitize_input,
+    validate_emails, validate_media_urls, validate_coordinates_batch, validate_phone_numbers, sanitize_inputs,
+)
+
+ROWS = int(os.getenv('BENCH_ROWS', 1_000_000))
+
+@pytest.fixture(scope='module')
+def columns():
+    """Mostly valid columns with a sprinkling of invalid values"""
+    rng = random.Random(42)
+    return {
+        'emails': [f'user{i}@gmail.com' if i % 10 else f'user{i}@yahoo.com' for i in range(ROWS)],
+        'urls': [f'https://cdn.example.com/evidence/{i}.JPG' if i % 10 else f'ftp://cdn/{i}.jpg' for i in range(ROWS)],
+        'latitudes': [rng.uniform(-5, 5) if i % 10 else 120.0 for i in range(ROWS)],
+        'longitudes': [rng.uniform(33, 42) for _ in range(ROWS)],
+        'phones': [f'07{i:08d}' if i % 10 else '12' for i in range(ROWS)],
+        'texts': [f'Report <b>{i}</b> & notes' for i in range(ROWS)],
+    }
+
+def run(benchmark, func, *args):
+    result = benchmark.pedantic(func, args=args, rounds=3, iterations=1)
+    benchmark.extra_info['rows'] = ROWS
+    benchmark.extra_info['per_row_ns'] = round(benchmark.stats.stats.mean / ROWS * 1e9, 1)
+    return result
+
+def test_emails_per_value(benchmark, columns):
+    mask = run(benchmark, lambda values: [validate_email(v) for v in values], columns['emails'])
+    assert mask.count(False) == ROWS // 10
+
+def test_emails_batch(benchmark, columns):
+    assert run(benchmark, validate_emails, columns['emails']).count(False) == ROWS // 10
+
+def test_media_urls_per_value(benchmark, columns):
+    mask = run(benchmark, lambda values: [validate_media_url(v, 'image') for v in values], columns['urls'])
+    assert mask.count(False) == ROWS // 10
+
+def test_media_urls_batch(benchmark, columns):
+    assert run(benchmark, validate_media_urls, columns['urls'], 'image').count(False) == ROWS // 10
+
+def test_coordinates_per_value(benchmark, columns):
+    mask = run(benchmark, lambda lats, lngs: [validate_coordinates(a, b) for a, b in zip(lats, lngs)],
+               columns['latitudes'], columns['longitudes'])
+    assert mask.count(False) == ROWS // 10
+
+def test_coordinates_batch(benchmark, columns):
+    mask = run(benchmark, validate_coordinates_batch, columns['latitudes'], columns['longitudes'])
+    assert mask.count(False) == ROWS // 10
+
+def test_phone_numbers_per_value(benchmark, columns):
+    mask = run(benchmark, lambda values: [validate_phone_number(v) for v in values], columns['phones'])
+    assert mask.count(False) == ROWS // 10
+
+def test_phone_numbers_batch(benchmark, columns):
+    assert run(benchmark, validate_phone_numbers, columns['phones']).count(False) == ROWS // 10
+
+def test_sanitize_per_value(benchmark, columns):
+    assert run(benchmark, lambda values: [sanitize_input(v) for v in values], columns['texts'])[1] == 'Report b1/b  notes'
+
+def test_sanitize_batch(benchmark, columns):
+    assert run(benchmark, sanitize_inputs, columns['texts'])[1] == 'Report b1/b  notes'
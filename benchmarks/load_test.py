@@ -0,0 +1,222 @@
+# benchmarks/load_test.py
+"""
+In-process load generator for the API routes in routes.py.
+
+Drives create_app() through Flask's test client against a (seeded) database
+and reports p50/p95/p99 latency and SQL queries per request for each route.
+Results can be saved as JSON and compared against a previous run.
+
+Run with:
+    python -m benchmarks.load_test --database-url sqlite:////tmp/jiseti_load.db --seed-records 100000
+    python -m benchmarks.load_test --output bench_output.json
+    python -m benchmarks.load_test --compare bench_output.json
+"""
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+# Routes exercised by the load generator: (name, method, path template, role, writes)
+ROUTES = [
+    ('public_records', 'GET', '/public/records?page={page}', None, False),
+    ('public_records_search', 'GET', '/public/records?search=bribes&status=resolved', None, False),
+    ('public_record_details', 'GET', '/public/records/{record_id}', None, False),
+    ('my_records', 'GET', '/my-records?page={page}', 'user', False),
+    ('admin_records', 'GET', '/admin/records?page={page}', 'admin', False),
+    ('admin_stats', 'GET', '/admin/stats', 'admin', False),
+    ('record_history', 'GET', '/records/{record_id}/history', 'admin', False),
+    ('current_user', 'GET', '/user', 'user', False),
+    ('create_record', 'POST', '/records', 'user', True),
+    ('anonymous_report', 'POST', '/public/report', None, True),
+    ('vote_record', 'POST', '/records/{record_id}/vote', 'user', True),
+]
+
+WRITE_PAYLOADS = {
+    'create_record': {'title': 'Load test record', 'description': 'Generated by the load test',
+                      'type': 'red-flag', 'latitude': -1.2921, 'longitude': 36.8219},
+    'anonymous_report': {'title': 'Load test anonymous report', 'description': 'Generated by the load test',
+                         'type': 'incident'},
+    'vote_record': {'vote_type': 'support'},
+}
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+def current_commit():
+    """Short git commit hash of the working tree, if available"""
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+class QueryCounter:
+    """Counts SQL statements executed on an engine"""
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+        self.count = 0
+        event.listen(engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+def build_headers(app, db):
+    """Create JWT headers for a seeded user and admin"""
+    from flask_jwt_extended import create_access_token
+    from werkzeug.security import generate_password_hash
+    from models import NormalUser, Administrator
+
+    with app.app_context():
+        user = NormalUser.query.first()
+        if not user:
+            user = NormalUser(name='Load Tester', email='load.tester@gmail.com',
+                              password=generate_password_hash('password123'))
+            db.session.add(user)
+        admin = Administrator.query.first()
+        if not admin:
+            admin = Administrator(name='Load Admin', email='load.admin@jiseti.go.ke',
+                                  password=generate_password_hash('admin123'), admin_number='ADM-LOAD-001')
+            db.session.add(admin)
+        db.session.commit()
+
+        return {
+            'user': {'Authorization': f"Bearer {create_access_token(identity={'id': user.id, 'role': 'user'})}"},
+            'admin': {'Authorization': f"Bearer {create_access_token(identity={'id': admin.id, 'role': 'admin'})}"},
+        }
+
+def pick_record_ids(app, limit=200):
+    """Sample of public record ids to spread detail requests across"""
+    from models import Record
+
+    with app.app_context():
+        rows = (Record.query.with_entities(Record.id)
+                .filter(Record.status != 'draft')
+                .order_by(Record.id.desc())
+                .limit(limit).all())
+    return [row.id for row in rows] or [1]
+
+def run_route(client, counter, route, headers, record_ids, requests_per_route):
+    """Issue requests against one route and collect latency / query statistics"""
+    name, method, template, role, _ = route
+    latencies, queries, errors = [], [], 0
+
+    for i in range(requests_per_route):
+        path = template.format(page=i % 5 + 1, record_id=record_ids[i % len(record_ids)])
+        kwargs = {'headers': headers.get(role, {})}
+        if method != 'GET':
+            kwargs['json'] = WRITE_PAYLOADS.get(name, {})
+
+        counter.count = 0
+        started = time.perf_counter()
+        response = client.open(path, method=method, **kwargs)
+        latencies.append((time.perf_counter() - started) * 1000)
+        queries.append(counter.count)
+        if response.status_code >= 400:
+            errors += 1
+
+    latencies.sort()
+    return {
+        'route': f'{method} {template}',
+        'requests': requests_per_route,
+        'errors': errors,
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'mean_ms': round(sum(latencies) / len(latencies), 3),
+        'queries_per_request': round(sum(queries) / len(queries), 2),
+    }
+
+def print_report(results, baseline=None):
+    """Print a per-route table, with deltas against a baseline run if given"""
+    baseline_routes = (baseline or {}).get('routes', {})
+    print(f"\n{'route':<24}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'queries':>10}{'errors':>8}"
+          + (f"{'Δ p95':>10}{'Δ queries':>11}" if baseline else ''))
+    for name, stats in results['routes'].items():
+        line = (f"{name:<24}{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}{stats['p99_ms']:>10.2f}"
+                f"{stats['queries_per_request']:>10.1f}{stats['errors']:>8}")
+        previous = baseline_routes.get(name)
+        if previous:
+            p95_delta = (stats['p95_ms'] - previous['p95_ms']) / previous['p95_ms'] * 100 if previous['p95_ms'] else 0
+            line += f"{p95_delta:>+9.1f}%{stats['queries_per_request'] - previous['queries_per_request']:>+11.1f}"
+        print(line)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='In-process load test for the Jiseti API')
+    parser.add_argument('--database-url', help='Database to run against (defaults to SQLALCHEMY_DATABASE_URI)')
+    parser.add_argument('--seed-records', type=int, default=0,
+                        help='Bulk-seed this many records first if the database has fewer')
+    parser.add_argument('--requests', type=int, default=200, help='Requests issued per route')
+    parser.add_argument('--routes', help='Comma-separated subset of route names to run')
+    parser.add_argument('--include-writes', action='store_true', help='Also exercise routes that write data')
+    parser.add_argument('--output', help='Write results as JSON to this path')
+    parser.add_argument('--compare', help='Previous JSON results to compare against')
+    args = parser.parse_args(argv)
+
+    if args.database_url:
+        os.environ['SQLALCHEMY_DATABASE_URI'] = args.database_url
+
+    from app import create_app
+    from models import db, Record
+
+    app = create_app()
+    app.config['TESTING'] = True
+    logging.getLogger().setLevel(os.getenv('LOAD_TEST_LOG_LEVEL', 'WARNING'))
+
+    with app.app_context():
+        db.create_all()
+        if args.seed_records:
+            existing = Record.query.count()
+            if existing < args.seed_records:
+                from seed import seed_at_scale
+                seed_at_scale(args.seed_records - existing)
+        counter = QueryCounter(db.engine)
+        record_count = Record.query.count()
+        database = db.engine.url.render_as_string(hide_password=True)
+
+    headers = build_headers(app, db)
+    record_ids = pick_record_ids(app)
+    selected = set(args.routes.split(',')) if args.routes else None
+
+    results = {
+        'commit': current_commit(),
+        'timestamp': datetime.utcnow().isoformat(),
+        'database': database,
+        'record_count': record_count,
+        'requests_per_route': args.requests,
+        'routes': {},
+    }
+
+    client = app.test_client()
+    for route in ROUTES:
+        name, _, _, _, writes = route
+        if (selected and name not in selected) or (writes and not args.include_writes and not selected):
+            continue
+        results['routes'][name] = run_route(client, counter, route, headers, record_ids, args.requests)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"Comparing against commit {baseline.get('commit')} ({baseline.get('timestamp')})")
+
+    print(f"Commit {results['commit']} - {record_count} records - {args.requests} requests per route")
+    print_report(results, baseline)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
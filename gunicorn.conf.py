@@ -0,0 +1,49 @@
+# gunicorn.conf.py - production serving profile, loaded automatically by `gunicorn app:app`
+#
+# Run `flask init-db` once before starting workers; workers never create tables.
+# Reload: `kill -HUP <master>` re-reads this file and replaces workers gracefully.
+# Because the app is preloaded, deploy new code with `kill -USR2 <master>`
+# (starts a new master) followed by `kill -QUIT <old master>`.
+import logging
+import os
+
+from utils.serving import worker_settings
+
+_settings = worker_settings()
+
+bind = os.getenv('GUNICORN_BIND', f"0.0.0.0:{os.getenv('PORT', 5000)}")
+workers = _settings['workers']
+threads = _settings['threads']
+worker_class = 'gthread' if threads > 1 else 'sync'
+
+# Import and build the app once in the master; workers fork from it
+preload_app = True
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+
+# Recycle workers periodically, staggered so they don't restart together
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 200))
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+
+def on_starting(server):
+    logging.getLogger('gunicorn.error').info(
+        f"Serving with {workers} worker(s) x {threads} thread(s), "
+        f"up to {_settings['max_connections']} database connection(s)"
+    )
+
+def post_fork(server, worker):
+    # Connections opened in the master must not be shared with forked workers
+    import app as app_module
+    from models import db
+
+    with app_module.app.app_context():
+        db.engine.dispose(close=False)
+    replicas = app_module.app.extensions.get('jiseti_replicas')
+    if replicas:
+        for engine in replicas.engines.values():
+            engine.dispose(close=False)
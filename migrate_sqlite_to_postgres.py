@@ -146,7 +146,11 @@ try:
             latitude=record.latitude,
             longitude=record.longitude,
             created_at=record.created_at,
-            normal_user_id=record.normal_user_id
+            normal_user_id=record.normal_user_id,
+            creator_name=record.creator_name,
+            thumbnail_url=record.thumbnail_url,
+            media_count=record.media_count,
+            status_changed_at=record.status_changed_at
         )
         postgres_session.add(new_record)
         print(f"  - Migrating record: {record.title}")
@@ -167,8 +171,9 @@ try:
             
         new_media = Media(
             id=media.id,
-            image_url=media.image_url,
-            video_url=media.video_url,
+            media_type=media.media_type,
+            media_url=media.media_url,
+            position=media.position,
             record_id=media.record_id
         )
         postgres_session.add(new_media)
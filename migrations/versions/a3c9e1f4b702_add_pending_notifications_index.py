@@ -0,0 +1,26 @@
+"""Add pending notifications index for status digests
+
+Revision ID: a3c9e1f4b702
+Revises: 5e31ab9b788f
+Create Date: 2026-10-19 10:12:41.315207
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3c9e1f4b702'
+down_revision = '5e31ab9b788f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('notifications', schema=None) as batch_op:
+        batch_op.create_index('ix_notifications_pending', ['delivery_status', 'notification_type', 'sent_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('notifications', schema=None) as batch_op:
+        batch_op.drop_index('ix_notifications_pending')
@@ -0,0 +1,53 @@
+"""Add denormalized summary columns to records (creator name, thumbnail, media count, status time)
+
+Revision ID: a8d3f5c2e071
+Revises: f2b8d4e6a913
+Create Date: 2026-10-19 22:12:37.640915
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a8d3f5c2e071'
+down_revision = 'f2b8d4e6a913'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('records', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('creator_name', sa.String(length=80), nullable=True))
+        batch_op.add_column(sa.Column('thumbnail_url', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('media_count', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('status_changed_at', sa.DateTime(), nullable=True))
+
+    # Same values as utils/summaries.py (`flask refresh-summaries` recomputes them)
+    op.execute("""
+        UPDATE records SET
+            creator_name = (SELECT name FROM normal_users WHERE normal_users.id = records.normal_user_id),
+            media_count = (SELECT COUNT(*) FROM media WHERE media.record_id = records.id),
+            status_changed_at = (SELECT MAX(changed_at) FROM status_history
+                                 WHERE status_history.record_id = records.id),
+            thumbnail_url = (
+                SELECT media_variants.url FROM media_variants
+                JOIN media ON media.blob_id = media_variants.blob_id
+                WHERE media.id = (SELECT first_media.id FROM media AS first_media
+                                  WHERE first_media.record_id = records.id
+                                  ORDER BY first_media.position, first_media.id LIMIT 1)
+                  AND media_variants.content_type LIKE 'image/%'
+                ORDER BY media_variants.width LIMIT 1
+            )
+    """)
+
+    with op.batch_alter_table('records', schema=None) as batch_op:
+        batch_op.alter_column('media_count', server_default=None)
+
+
+def downgrade():
+    with op.batch_alter_table('records', schema=None) as batch_op:
+        batch_op.drop_column('status_changed_at')
+        batch_op.drop_column('media_count')
+        batch_op.drop_column('thumbnail_url')
+        batch_op.drop_column('creator_name')
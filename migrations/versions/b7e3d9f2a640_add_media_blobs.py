@@ -0,0 +1,81 @@
+"""Add content-addressed media_blobs and move variants onto them
+
+Revision ID: b7e3d9f2a640
+Revises: e9a2c5d71b48
+Create Date: 2026-10-19 18:40:27.518204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e3d9f2a640'
+down_revision = 'e9a2c5d71b48'
+branch_labels = None
+depends_on = None
+
+
+def _create_variants(owner_column, owner_table):
+    op.create_table('media_variants',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column(owner_column, sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=20), nullable=False),
+    sa.Column('url', sa.Text(), nullable=False),
+    sa.Column('storage_key', sa.String(length=512), nullable=False),
+    sa.Column('content_type', sa.String(length=50), nullable=False),
+    sa.Column('width', sa.Integer(), nullable=False),
+    sa.Column('height', sa.Integer(), nullable=False),
+    sa.Column('file_size', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint([owner_column], [f'{owner_table}.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint(owner_column, 'name', name='unique_media_variant')
+    )
+
+
+def upgrade():
+    op.create_table('media_blobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('content_hash', sa.String(length=64), nullable=False),
+    sa.Column('media_type', sa.String(length=10), nullable=False),
+    sa.Column('storage_key', sa.String(length=512), nullable=False),
+    sa.Column('url', sa.Text(), nullable=False),
+    sa.Column('file_size', sa.Integer(), nullable=True),
+    sa.Column('processing_status', sa.String(length=20), nullable=False),
+    sa.Column('processed_at', sa.DateTime(), nullable=True),
+    sa.Column('width', sa.Integer(), nullable=True),
+    sa.Column('height', sa.Integer(), nullable=True),
+    sa.Column('duration_seconds', sa.Float(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('media_blobs', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_media_blobs_content_hash'), ['content_hash'], unique=True)
+
+    with op.batch_alter_table('media', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('blob_id', sa.Integer(), nullable=True))
+        batch_op.create_index('ix_media_blob_id', ['blob_id'], unique=False)
+        batch_op.create_foreign_key('fk_media_blob_id', 'media_blobs', ['blob_id'], ['id'])
+
+    # Variants are derived data; rather than hashing stored files here, uploaded
+    # media goes back to pending and `flask process-media` rehashes and rerenders it
+    op.drop_table('media_variants')
+    _create_variants('blob_id', 'media_blobs')
+    op.execute("UPDATE media SET processing_status = 'pending' WHERE storage_key IS NOT NULL")
+
+
+def downgrade():
+    op.drop_table('media_variants')
+    _create_variants('media_id', 'media')
+    op.execute("UPDATE media SET processing_status = 'pending' WHERE storage_key IS NOT NULL")
+
+    with op.batch_alter_table('media', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_media_blob_id', type_='foreignkey')
+        batch_op.drop_index('ix_media_blob_id')
+        batch_op.drop_column('blob_id')
+
+    with op.batch_alter_table('media_blobs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_media_blobs_content_hash'))
+
+    op.drop_table('media_blobs')
@@ -0,0 +1,62 @@
+"""Store one media asset per row with a position; drop image_url/video_url
+
+Revision ID: c3f8a1d6e952
+Revises: b7e3d9f2a640
+Create Date: 2026-10-19 19:26:03.741190
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3f8a1d6e952'
+down_revision = 'b7e3d9f2a640'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('media', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('position', sa.Integer(), nullable=False, server_default='0'))
+
+    # Rows holding both an image and a video become two rows; the video goes after the image
+    op.execute("""
+        INSERT INTO media (record_id, media_type, media_url, uploaded_at, position)
+        SELECT record_id, 'video', video_url, uploaded_at, 0 FROM media
+        WHERE image_url IS NOT NULL AND image_url <> '' AND video_url IS NOT NULL AND video_url <> ''
+    """)
+    # Edits used to write whichever URL changed into media_url; the typed columns are authoritative
+    op.execute("""
+        UPDATE media SET media_type = 'image', media_url = image_url
+        WHERE image_url IS NOT NULL AND image_url <> ''
+    """)
+    op.execute("""
+        UPDATE media SET media_type = 'video', media_url = video_url
+        WHERE (image_url IS NULL OR image_url = '') AND video_url IS NOT NULL AND video_url <> ''
+    """)
+    op.execute("""
+        UPDATE media SET position = (
+            SELECT COUNT(*) FROM media AS earlier
+            WHERE earlier.record_id = media.record_id AND earlier.id < media.id
+        )
+    """)
+
+    with op.batch_alter_table('media', schema=None) as batch_op:
+        batch_op.alter_column('position', server_default=None)
+        batch_op.drop_column('video_url')
+        batch_op.drop_column('image_url')
+        batch_op.create_index('ix_media_record_position', ['record_id', 'position'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('media', schema=None) as batch_op:
+        batch_op.drop_index('ix_media_record_position')
+        batch_op.add_column(sa.Column('image_url', sa.String(), nullable=True))
+        batch_op.add_column(sa.Column('video_url', sa.String(), nullable=True))
+
+    op.execute("UPDATE media SET image_url = media_url WHERE media_type = 'image'")
+    op.execute("UPDATE media SET video_url = media_url WHERE media_type = 'video'")
+
+    with op.batch_alter_table('media', schema=None) as batch_op:
+        batch_op.drop_column('position')
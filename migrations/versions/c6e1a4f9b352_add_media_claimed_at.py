@@ -0,0 +1,32 @@
+"""Add claimed_at to media and media_blobs so stale processing claims can be reclaimed
+
+Revision ID: c6e1a4f9b352
+Revises: a8d3f5c2e071
+Create Date: 2026-10-19 23:05:18.204716
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c6e1a4f9b352'
+down_revision = 'a8d3f5c2e071'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('media', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('claimed_at', sa.DateTime(), nullable=True))
+
+    with op.batch_alter_table('media_blobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('claimed_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('media_blobs', schema=None) as batch_op:
+        batch_op.drop_column('claimed_at')
+
+    with op.batch_alter_table('media', schema=None) as batch_op:
+        batch_op.drop_column('claimed_at')
@@ -0,0 +1,38 @@
+"""Add record_changes table for the change feed
+
+Revision ID: c7d2e8a91f35
+Revises: a3c9e1f4b702
+Create Date: 2026-10-19 14:05:22.418930
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7d2e8a91f35'
+down_revision = 'a3c9e1f4b702'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('record_changes',
+    sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), nullable=False),
+    sa.Column('record_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('change_type', sa.String(length=20), nullable=False),
+    sa.Column('status', sa.String(length=50), nullable=True),
+    sa.Column('vote_count', sa.Integer(), nullable=True),
+    sa.Column('changed_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('record_changes', schema=None) as batch_op:
+        batch_op.create_index('ix_record_changes_user', ['user_id', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('record_changes', schema=None) as batch_op:
+        batch_op.drop_index('ix_record_changes_user')
+
+    op.drop_table('record_changes')
@@ -0,0 +1,34 @@
+"""Store anonymous report tracking token hashes; index status history by record
+
+Revision ID: d4f6b1c83e27
+Revises: c7d2e8a91f35
+Create Date: 2026-10-19 15:31:08.772104
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4f6b1c83e27'
+down_revision = 'c7d2e8a91f35'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('records', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('tracking_token_hash', sa.String(length=64), nullable=True))
+        batch_op.create_index(batch_op.f('ix_records_tracking_token_hash'), ['tracking_token_hash'], unique=True)
+
+    with op.batch_alter_table('status_history', schema=None) as batch_op:
+        batch_op.create_index('ix_status_history_record', ['record_id', 'changed_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('status_history', schema=None) as batch_op:
+        batch_op.drop_index('ix_status_history_record')
+
+    with op.batch_alter_table('records', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_records_tracking_token_hash'))
+        batch_op.drop_column('tracking_token_hash')
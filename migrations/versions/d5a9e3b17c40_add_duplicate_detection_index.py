@@ -0,0 +1,44 @@
+"""Add record_fingerprints and record_lsh_buckets for duplicate detection
+
+Revision ID: d5a9e3b17c40
+Revises: c3f8a1d6e952
+Create Date: 2026-10-19 20:08:45.162377
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5a9e3b17c40'
+down_revision = 'c3f8a1d6e952'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing records are indexed afterwards with `flask index-duplicates`
+    op.create_table('record_fingerprints',
+    sa.Column('record_id', sa.Integer(), nullable=False),
+    sa.Column('signature', sa.LargeBinary(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['record_id'], ['records.id'], ),
+    sa.PrimaryKeyConstraint('record_id')
+    )
+    op.create_table('record_lsh_buckets',
+    sa.Column('band', sa.SmallInteger(), nullable=False),
+    sa.Column('bucket', sa.BigInteger(), nullable=False),
+    sa.Column('record_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['record_id'], ['records.id'], ),
+    sa.PrimaryKeyConstraint('band', 'bucket', 'record_id')
+    )
+    with op.batch_alter_table('record_lsh_buckets', schema=None) as batch_op:
+        batch_op.create_index('ix_record_lsh_buckets_record', ['record_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('record_lsh_buckets', schema=None) as batch_op:
+        batch_op.drop_index('ix_record_lsh_buckets_record')
+
+    op.drop_table('record_lsh_buckets')
+    op.drop_table('record_fingerprints')
@@ -0,0 +1,31 @@
+"""Add records.triage_priority with a partial index for the admin queue
+
+Revision ID: e1c4b7a95d23
+Revises: d5a9e3b17c40
+Create Date: 2026-10-19 20:51:12.904518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e1c4b7a95d23'
+down_revision = 'd5a9e3b17c40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing reports join the queue after `flask refresh-triage`
+    with op.batch_alter_table('records', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('triage_priority', sa.Float(), nullable=True))
+        batch_op.create_index('ix_records_triage', ['triage_priority', 'id'], unique=False,
+                              postgresql_where=sa.text('triage_priority IS NOT NULL'),
+                              sqlite_where=sa.text('triage_priority IS NOT NULL'))
+
+
+def downgrade():
+    with op.batch_alter_table('records', schema=None) as batch_op:
+        batch_op.drop_index('ix_records_triage')
+        batch_op.drop_column('triage_priority')
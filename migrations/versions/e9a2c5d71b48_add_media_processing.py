@@ -0,0 +1,56 @@
+"""Add media processing state and media_variants
+
+Revision ID: e9a2c5d71b48
+Revises: d4f6b1c83e27
+Create Date: 2026-10-19 17:12:54.093615
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e9a2c5d71b48'
+down_revision = 'd4f6b1c83e27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('media', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('storage_key', sa.String(length=512), nullable=True))
+        batch_op.add_column(sa.Column('processing_status', sa.String(length=20), nullable=True))
+        batch_op.add_column(sa.Column('processed_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('width', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('height', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('duration_seconds', sa.Float(), nullable=True))
+        batch_op.create_index('ix_media_processing_status', ['processing_status'], unique=False)
+
+    op.create_table('media_variants',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('media_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=20), nullable=False),
+    sa.Column('url', sa.Text(), nullable=False),
+    sa.Column('storage_key', sa.String(length=512), nullable=False),
+    sa.Column('content_type', sa.String(length=50), nullable=False),
+    sa.Column('width', sa.Integer(), nullable=False),
+    sa.Column('height', sa.Integer(), nullable=False),
+    sa.Column('file_size', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['media_id'], ['media.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('media_id', 'name', name='unique_media_variant')
+    )
+
+
+def downgrade():
+    op.drop_table('media_variants')
+
+    with op.batch_alter_table('media', schema=None) as batch_op:
+        batch_op.drop_index('ix_media_processing_status')
+        batch_op.drop_column('duration_seconds')
+        batch_op.drop_column('height')
+        batch_op.drop_column('width')
+        batch_op.drop_column('processed_at')
+        batch_op.drop_column('processing_status')
+        batch_op.drop_column('storage_key')
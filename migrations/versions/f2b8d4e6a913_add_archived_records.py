@@ -0,0 +1,65 @@
+"""Add archived_records (range-partitioned by year on PostgreSQL) and ix_records_closed
+
+Revision ID: f2b8d4e6a913
+Revises: e1c4b7a95d23
+Create Date: 2026-10-19 21:34:50.218643
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2b8d4e6a913'
+down_revision = 'e1c4b7a95d23'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Yearly partitions are created by `flask archive-records` as it needs them
+    op.create_table('archived_records',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('closed_at', sa.DateTime(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), nullable=True),
+    sa.Column('type', sa.String(length=20), nullable=False),
+    sa.Column('title', sa.String(length=200), nullable=False),
+    sa.Column('description', sa.Text(), nullable=False),
+    sa.Column('status', sa.String(length=50), nullable=False),
+    sa.Column('latitude', sa.Float(), nullable=True),
+    sa.Column('longitude', sa.Float(), nullable=True),
+    sa.Column('location_name', sa.String(length=255), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.Column('resolution_notes', sa.Text(), nullable=True),
+    sa.Column('is_anonymous', sa.Boolean(), nullable=True),
+    sa.Column('vote_count', sa.Integer(), nullable=True),
+    sa.Column('urgency_level', sa.String(length=20), nullable=True),
+    sa.Column('tracking_token_hash', sa.String(length=64), nullable=True),
+    sa.Column('normal_user_id', sa.Integer(), nullable=True),
+    sa.Column('assigned_admin_id', sa.Integer(), nullable=True),
+    sa.Column('creator_name', sa.String(length=80), nullable=True),
+    sa.Column('media', sa.JSON(), nullable=False),
+    sa.Column('votes', sa.JSON(), nullable=False),
+    sa.Column('status_history', sa.JSON(), nullable=False),
+    sa.PrimaryKeyConstraint('id', 'closed_at'),
+    postgresql_partition_by='RANGE (closed_at)'
+    )
+    with op.batch_alter_table('archived_records', schema=None) as batch_op:
+        batch_op.create_index('ix_archived_records_tracking', ['tracking_token_hash'], unique=False)
+
+    with op.batch_alter_table('records', schema=None) as batch_op:
+        batch_op.create_index('ix_records_closed', ['updated_at'], unique=False,
+                              postgresql_where=sa.text("status IN ('resolved', 'rejected')"),
+                              sqlite_where=sa.text("status IN ('resolved', 'rejected')"))
+
+
+def downgrade():
+    # Archived records are not moved back; dropping the table discards them
+    with op.batch_alter_table('records', schema=None) as batch_op:
+        batch_op.drop_index('ix_records_closed')
+
+    with op.batch_alter_table('archived_records', schema=None) as batch_op:
+        batch_op.drop_index('ix_archived_records_tracking')
+
+    op.drop_table('archived_records')
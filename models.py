@@ -1,7 +1,9 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
+from utils.database import RoutingSession
 
-db = SQLAlchemy()
+# RoutingSession sends reads from @read_only endpoints to a replica when one is configured
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 class NormalUser(db.Model):
     __tablename__ = 'normal_users'
@@ -75,20 +77,51 @@ class Record(db.Model):
     is_anonymous = db.Column(db.Boolean, default=False)  
     vote_count = db.Column(db.Integer, default=0)  
     urgency_level = db.Column(db.String(20), default='medium')  
+    # SHA-256 of the anonymous reporter's tracking token (see utils/tracking.py)
+    tracking_token_hash = db.Column(db.String(64), nullable=True, unique=True, index=True)
+    # Admin queue order (utils/triage.py); None once assigned or closed
+    triage_priority = db.Column(db.Float, nullable=True)
+    # Summaries kept on the row so serializing records needs no owner or variant lookups;
+    # maintained on write, recomputed by utils/summaries.py
+    creator_name = db.Column(db.String(80), nullable=True)  # owner's name, shown unless anonymous
+    thumbnail_url = db.Column(db.Text, nullable=True)  # smallest image variant of the first attachment
+    media_count = db.Column(db.Integer, nullable=False, default=0)
+    status_changed_at = db.Column(db.DateTime, nullable=True)  # None until the first status change
     
     # Foreign Keys
     normal_user_id = db.Column(db.Integer, db.ForeignKey('normal_users.id'), nullable=True) 
     assigned_admin_id = db.Column(db.Integer, db.ForeignKey('administrators.id'), nullable=True)
 
+    # Only queued reports are indexed, so the queue is one short index scan; likewise
+    # only closed reports awaiting archival (utils/archive.py) are in ix_records_closed
+    __table_args__ = (
+        db.Index('ix_records_triage', 'triage_priority', 'id',
+                 postgresql_where=db.text('triage_priority IS NOT NULL'),
+                 sqlite_where=db.text('triage_priority IS NOT NULL')),
+        db.Index('ix_records_closed', 'updated_at',
+                 postgresql_where=db.text("status IN ('resolved', 'rejected')"),
+                 sqlite_where=db.text("status IN ('resolved', 'rejected')")),
+    )
+
     # Relationships
-    media = db.relationship("Media", backref="record", cascade="all, delete-orphan")
+    media = db.relationship("Media", backref="record", cascade="all, delete-orphan",
+                            order_by="(Media.position, Media.id)")
     votes = db.relationship("Vote", backref="record", cascade="all, delete-orphan")
     status_history = db.relationship("StatusHistory", backref="record", cascade="all, delete-orphan")
+    # Duplicate detection index, maintained by utils/similarity.py
+    fingerprint = db.relationship("RecordFingerprint", uselist=False, cascade="all, delete-orphan")
+    lsh_buckets = db.relationship("RecordLshBucket", cascade="all, delete-orphan")
 
-    def to_dict(self):
-        """Convert record to dictionary for API responses"""
+    def to_dict(self, image_width=None):
+        """Convert record to dictionary for API responses
+
+        Args:
+            image_width (int): For listings - image_url/video_url and the media list point at
+                the smallest processed variant that is at least this wide instead of the original
+        """
     
-        media = self.media[0] if self.media else None
+        image = self.first_media('image')
+        video = self.first_media('video')
         
         return {
             "id": self.id,
@@ -107,21 +140,40 @@ class Record(db.Model):
             "assigned_admin_id": self.assigned_admin_id,
             "created_at": self.created_at.isoformat(),
             "updated_at": self.updated_at.isoformat(),
+            "status_changed_at": (self.status_changed_at or self.created_at).isoformat(),
             
             
-            "image_url": media.image_url if media and media.image_url else None,
-            "video_url": media.video_url if media and media.video_url else None,
+            # First image and video, kept for clients that show a single attachment
+            "image_url": image.display_url(image_width) if image else None,
+            "video_url": video.display_url(image_width) if video else None,
+            "thumbnail_url": self.thumbnail_url,
+            "media_count": self.media_count,
             
-            
-            "media": [m.to_dict() for m in self.media],
+            "media": [m.to_summary(image_width) for m in self.media],
             
             # Creator info (only for non-anonymous)
-            "creator_name": self.normal_user.name if self.normal_user and not self.is_anonymous else "Anonymous",
+            "creator_name": self.creator_name if self.creator_name and not self.is_anonymous else "Anonymous",
         }
 
-    def to_public_dict(self):
+    def first_media(self, media_type):
+        """The record's first attachment of a type ('image' or 'video'), or None"""
+        for media in self.media:
+            if media.media_type == media_type:
+                return media
+        return None
+
+    def next_media_position(self):
+        return max((media.position for media in self.media), default=-1) + 1
+
+    def refresh_media_summary(self):
+        """Recompute media_count and thumbnail_url after attachments were added or removed"""
+        ordered = sorted(self.media, key=lambda m: (m.position, m.id is None, m.id or 0))
+        self.media_count = len(ordered)
+        self.thumbnail_url = ordered[0].variant_url(0) if ordered else None
+
+    def to_public_dict(self, image_width=None):
         """Public view without sensitive information"""
-        data = self.to_dict()
+        data = self.to_dict(image_width)
         
         if self.is_anonymous or True:  
             data.pop('normal_user_id', None)
@@ -138,10 +190,61 @@ class Media(db.Model):
     filename = db.Column(db.String(255), nullable=True)
     file_size = db.Column(db.Integer, nullable=True)
     uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
-    
+    # One asset per row; a record's attachments are shown in position order
+    position = db.Column(db.Integer, nullable=False, default=0)
+
+    # Files uploaded to our object store are processed in the background (utils/media.py);
+    # media referenced by external URL has no storage key and is never processed.
+    # storage_key is where the file was uploaded; once hashed, the content lives in
+    # the blob (the same key unless an identical file was already stored)
+    storage_key = db.Column(db.String(512), nullable=True)
+    blob_id = db.Column(db.Integer, db.ForeignKey('media_blobs.id'), nullable=True)
+    processing_status = db.Column(db.String(20), nullable=True)
+    processed_at = db.Column(db.DateTime, nullable=True)
+    # When a worker moved the row to processing; claims older than MEDIA_CLAIM_TIMEOUT_SECONDS are retaken
+    claimed_at = db.Column(db.DateTime, nullable=True)
+    width = db.Column(db.Integer, nullable=True)
+    height = db.Column(db.Integer, nullable=True)
+    duration_seconds = db.Column(db.Float, nullable=True)
 
-    image_url = db.Column(db.String, nullable=True)
-    video_url = db.Column(db.String, nullable=True)
+    blob = db.relationship("MediaBlob", backref="media")
+    # Variants belong to the content, so every copy of a file shares one set
+    variants = db.relationship("MediaVariant", primaryjoin="foreign(MediaVariant.blob_id) == Media.blob_id",
+                               viewonly=True, order_by="MediaVariant.width")
+
+    __table_args__ = (
+        db.Index('ix_media_record_position', 'record_id', 'position'),
+        db.Index('ix_media_processing_status', 'processing_status'),
+        db.Index('ix_media_blob_id', 'blob_id'),
+    )
+
+    def variant_url(self, width, content_type_prefix='image/'):
+        """URL of the smallest processed variant at least `width` wide (else the largest), or None"""
+        candidates = [v for v in self.variants if v.content_type.startswith(content_type_prefix)]
+        if not candidates:
+            return None
+        for variant in candidates:
+            if variant.width >= width:
+                return variant.url
+        return candidates[-1].url
+
+    def display_url(self, image_width=None):
+        """Original URL, or for listings the variant chosen by variant_url()"""
+        if image_width and self.variants:
+            prefix = 'image/' if self.media_type == 'image' else 'video/'
+            return self.variant_url(image_width, prefix) or self.media_url
+        return self.media_url
+
+    def to_summary(self, image_width=None):
+        """Compact form embedded in record responses; to_dict() has the full details"""
+        return {
+            "id": self.id,
+            "media_type": self.media_type,
+            "url": self.display_url(image_width),
+            "thumbnail_url": self.variant_url(0),
+            "width": self.width,
+            "height": self.height,
+        }
 
     def to_dict(self):
         return {
@@ -149,11 +252,62 @@ class Media(db.Model):
             "record_id": self.record_id,
             "media_type": self.media_type,
             "media_url": self.media_url,
+            "position": self.position,
             "filename": self.filename,
             "file_size": self.file_size,
             "uploaded_at": self.uploaded_at.isoformat(),
-            "image_url": self.image_url,
-            "video_url": self.video_url
+            "width": self.width,
+            "height": self.height,
+            "duration_seconds": self.duration_seconds,
+            "processing_status": self.processing_status,
+            "variants": [v.to_dict() for v in self.variants]
+        }
+
+class MediaBlob(db.Model):
+    """One stored file, keyed by the SHA-256 of its uploaded bytes and shared by every Media row with that content"""
+    __tablename__ = 'media_blobs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    content_hash = db.Column(db.String(64), nullable=False, unique=True, index=True)
+    media_type = db.Column(db.String(10), nullable=False)
+    storage_key = db.Column(db.String(512), nullable=False)
+    url = db.Column(db.Text, nullable=False)
+    file_size = db.Column(db.Integer, nullable=True)
+    processing_status = db.Column(db.String(20), nullable=False)
+    processed_at = db.Column(db.DateTime, nullable=True)
+    claimed_at = db.Column(db.DateTime, nullable=True)
+    width = db.Column(db.Integer, nullable=True)
+    height = db.Column(db.Integer, nullable=True)
+    duration_seconds = db.Column(db.Float, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    variants = db.relationship("MediaVariant", backref="blob", cascade="all, delete-orphan",
+                               order_by="MediaVariant.width")
+
+class MediaVariant(db.Model):
+    __tablename__ = 'media_variants'
+
+    id = db.Column(db.Integer, primary_key=True)
+    blob_id = db.Column(db.Integer, db.ForeignKey('media_blobs.id'), nullable=False)
+    name = db.Column(db.String(20), nullable=False)  # thumb, small, medium, large, poster, 720p
+    url = db.Column(db.Text, nullable=False)
+    storage_key = db.Column(db.String(512), nullable=False)
+    content_type = db.Column(db.String(50), nullable=False)
+    width = db.Column(db.Integer, nullable=False)
+    height = db.Column(db.Integer, nullable=False)
+    file_size = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (db.UniqueConstraint('blob_id', 'name', name='unique_media_variant'),)
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "url": self.url,
+            "content_type": self.content_type,
+            "width": self.width,
+            "height": self.height,
+            "file_size": self.file_size
         }
 
 class Vote(db.Model):
@@ -191,6 +345,9 @@ class StatusHistory(db.Model):
 
     admin = db.relationship('Administrator', backref='status_changes')
 
+    # Record history and tracking lookups read one record's changes in order
+    __table_args__ = (db.Index('ix_status_history_record', 'record_id', 'changed_at'),)
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -215,6 +372,9 @@ class Notification(db.Model):
     delivery_status = db.Column(db.String(20), default='pending') 
     external_id = db.Column(db.String(100), nullable=True) 
 
+    # Pending status changes are looked up by state and age when digests are flushed
+    __table_args__ = (db.Index('ix_notifications_pending', 'delivery_status', 'notification_type', 'sent_at'),)
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -226,3 +386,127 @@ class Notification(db.Model):
             "delivery_status": self.delivery_status,
             "external_id": self.external_id
         }
+
+class RecordChange(db.Model):
+    __tablename__ = 'record_changes'
+
+    # The id is the change sequence clients sync from (GET /changes?since=<id>)
+    id = db.Column(db.BigInteger().with_variant(db.Integer, 'sqlite'), primary_key=True)
+    record_id = db.Column(db.Integer, nullable=False)  # no FK: deletions stay in the feed
+    user_id = db.Column(db.Integer, nullable=True)  # record owner, None for anonymous reports
+    change_type = db.Column(db.String(20), nullable=False)
+    status = db.Column(db.String(50), nullable=True)
+    vote_count = db.Column(db.Integer, nullable=True)
+    changed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # Users sync only their own records' changes
+    __table_args__ = (db.Index('ix_record_changes_user', 'user_id', 'id'),)
+
+    def to_dict(self):
+        return {
+            "seq": self.id,
+            "record_id": self.record_id,
+            "change_type": self.change_type,
+            "status": self.status,
+            "vote_count": self.vote_count,
+            "changed_at": self.changed_at.isoformat()
+        }
+
+class RecordFingerprint(db.Model):
+    """MinHash signature of a record's title and description (see utils/similarity.py)"""
+    __tablename__ = 'record_fingerprints'
+
+    record_id = db.Column(db.Integer, db.ForeignKey('records.id'), primary_key=True)
+    signature = db.Column(db.LargeBinary, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class RecordLshBucket(db.Model):
+    """One LSH band of a record's signature; records sharing a (band, bucket) are duplicate candidates"""
+    __tablename__ = 'record_lsh_buckets'
+
+    band = db.Column(db.SmallInteger, primary_key=True)
+    bucket = db.Column(db.BigInteger, primary_key=True)
+    record_id = db.Column(db.Integer, db.ForeignKey('records.id'), primary_key=True)
+
+    __table_args__ = (db.Index('ix_record_lsh_buckets_record', 'record_id'),)
+
+class ArchivedRecord(db.Model):
+    """
+    A resolved or rejected record moved out of `records` (see utils/archive.py)
+
+    Votes, media and status history are kept as snapshots on the row, since an
+    archived record is only ever read back whole. On PostgreSQL the table is
+    range-partitioned by year of closing, so old years can be detached or moved
+    to cheaper storage.
+    """
+    __tablename__ = 'archived_records'
+
+    id = db.Column(db.Integer, autoincrement=False)  # the record's original id
+    closed_at = db.Column(db.DateTime, nullable=False)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+    type = db.Column(db.String(20), nullable=False)
+    title = db.Column(db.String(200), nullable=False)
+    description = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(50), nullable=False)
+    latitude = db.Column(db.Float, nullable=True)
+    longitude = db.Column(db.Float, nullable=True)
+    location_name = db.Column(db.String(255), nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False)
+    resolution_notes = db.Column(db.Text, nullable=True)
+    is_anonymous = db.Column(db.Boolean, default=False)
+    vote_count = db.Column(db.Integer, default=0)
+    urgency_level = db.Column(db.String(20), nullable=True)
+    tracking_token_hash = db.Column(db.String(64), nullable=True)
+    # No foreign keys: archived rows outlive the accounts they mention
+    normal_user_id = db.Column(db.Integer, nullable=True)
+    assigned_admin_id = db.Column(db.Integer, nullable=True)
+    creator_name = db.Column(db.String(80), nullable=True)
+
+    media = db.Column(db.JSON, nullable=False, default=list)  # Media.to_summary() in display order
+    votes = db.Column(db.JSON, nullable=False, default=list)
+    status_history = db.Column(db.JSON, nullable=False, default=list)  # StatusHistory.to_dict(), oldest first
+
+    # A partitioned table's primary key has to include the partition column
+    __table_args__ = (
+        db.PrimaryKeyConstraint('id', 'closed_at'),
+        db.Index('ix_archived_records_tracking', 'tracking_token_hash'),
+        {'postgresql_partition_by': 'RANGE (closed_at)'},
+    )
+
+    def to_dict(self):
+        """Same shape as Record.to_dict(), plus archived_at"""
+        image = next((m for m in self.media if m['media_type'] == 'image'), None)
+        video = next((m for m in self.media if m['media_type'] == 'video'), None)
+        return {
+            "id": self.id,
+            "type": self.type,
+            "title": self.title,
+            "description": self.description,
+            "status": self.status,
+            "latitude": self.latitude,
+            "longitude": self.longitude,
+            "location_name": self.location_name,
+            "urgency_level": self.urgency_level,
+            "vote_count": self.vote_count,
+            "is_anonymous": self.is_anonymous,
+            "resolution_notes": self.resolution_notes,
+            "normal_user_id": self.normal_user_id,
+            "assigned_admin_id": self.assigned_admin_id,
+            "created_at": self.created_at.isoformat(),
+            "updated_at": self.updated_at.isoformat(),
+            "status_changed_at": self.closed_at.isoformat(),
+            "image_url": image['url'] if image else None,
+            "video_url": video['url'] if video else None,
+            "thumbnail_url": self.media[0]['thumbnail_url'] if self.media else None,
+            "media_count": len(self.media),
+            "media": self.media,
+            "creator_name": self.creator_name if self.creator_name and not self.is_anonymous else "Anonymous",
+            "archived_at": self.archived_at.isoformat(),
+        }
+
+    def to_public_dict(self):
+        data = self.to_dict()
+        data.pop('normal_user_id', None)
+        data['creator_name'] = "Anonymous"
+        return data
@@ -1,10 +1,27 @@
-from flask import Blueprint, request, jsonify, make_response
+from flask import Blueprint, request, jsonify, make_response, current_app, Response, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity, create_access_token
-from models import db, NormalUser, Record, Administrator, Media, Vote, StatusHistory, Notification
-from utils.emailer import send_status_email, send_welcome_email, send_record_created_email, send_sms_notification
-from utils.validators import validate_email, validate_media_url, validate_coordinates
+from models import db, NormalUser, Record, Administrator, Media, Vote, StatusHistory, Notification, ArchivedRecord
+from utils.emailer import send_welcome_email, send_record_created_email, send_import_summary_email
+from utils.importer import FORMATS as IMPORT_FORMATS, detect_format, iter_rows, import_records
+from utils.digest import queue_status_notification, queue_status_notifications, flush_user_digest
+from utils.changes import (
+    record_change, record_changes, changes_since, settled_head, history_starts_after, stream_changes,
+    CHANGE_CREATED, CHANGE_UPDATED, CHANGE_STATUS, CHANGE_VOTE, CHANGE_DELETED,
+)
+from utils.tracking import generate_tracking_token, hash_tracking_token, find_tracked_report, tracking_cache
+from utils.storage import get_storage, upload_limit, sign_upload_ticket, load_upload_ticket
+from utils.validators import MEDIA_CONTENT_TYPES
+from utils.media import submit_media_processing, PENDING as MEDIA_PENDING
+from utils.similarity import index_record, find_duplicates
+from utils.triage import refresh_priority, queued_records, claim_records, current_priority
+from utils.archive import find_archived_record
+from utils.schemas import use_schema
+from utils import schemas
+from utils.instrumentation import recent_requests
+from utils.database import read_only
 from datetime import datetime
 from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.utils import secure_filename
 from uuid import uuid4
 import logging
 import re
@@ -18,6 +35,77 @@ routes = Blueprint('routes', __name__)
 
 # ------------------ Helper Functions -------------
 
+def listing_image_width(request):
+    """Image width listings pick variants for (`image_width` query parameter, else the configured default)"""
+    width = request.args.get('image_width', type=int)
+    return width if width and width > 0 else current_app.config['MEDIA_LISTING_IMAGE_WIDTH']
+
+def with_media(query):
+    """Load each record's media and their variants in two extra queries instead of one per row"""
+    return query.options(db.selectinload(Record.media).selectinload(Media.variants))
+
+def set_media_url(record, media_type, url):
+    """
+    Point a record's first image or video at a new URL (removing it when url is empty)
+
+    The old asset row is replaced rather than edited, so its processing state
+    and variants never describe a different file.
+    """
+    current = record.first_media(media_type)
+    position = current.position if current else record.next_media_position()
+    if current:
+        record.media.remove(current)
+    if url:
+        record.media.append(Media(media_type=media_type, media_url=url, position=position))
+    record.refresh_media_summary()
+
+def parse_id_list(value):
+    """Ids from a comma-separated query parameter, or None if it is malformed or too long"""
+    try:
+        ids = [int(part) for part in value.split(',') if part.strip()]
+    except ValueError:
+        return None
+    return ids if 0 < len(ids) <= schemas.MAX_BATCH_IDS else None
+
+def record_details(ids, view):
+    """
+    Detail entries for many records, in request order, with a constant number of queries
+
+    Media (with variants) and status history (with each entry's admin) are
+    loaded eagerly; ids not in `records` are looked up in the archive.
+
+    Args:
+        view (callable): record -> dict shown to the caller, or None if they may not see it
+
+    Returns:
+        dict: {'records': [{'record', 'status_history'}], 'missing': [ids not found or not visible]}
+    """
+    ids = list(dict.fromkeys(ids))
+    found = {record.id: record for record in Record.query
+             .filter(Record.id.in_(ids))
+             .options(db.selectinload(Record.media).selectinload(Media.variants),
+                      db.selectinload(Record.status_history).joinedload(StatusHistory.admin))}
+    absent = [record_id for record_id in ids if record_id not in found]
+    if absent:
+        found.update((archived.id, archived) for archived in
+                     ArchivedRecord.query.filter(ArchivedRecord.id.in_(absent)))
+
+    entries, missing = [], []
+    for record_id in ids:
+        record = found.get(record_id)
+        data = view(record) if record is not None else None
+        if data is None:
+            missing.append(record_id)
+        elif isinstance(record, ArchivedRecord):
+            entries.append({'record': data, 'status_history': record.status_history})
+        else:
+            history = sorted(record.status_history, key=lambda h: (h.changed_at, h.id))
+            entries.append({'record': data, 'status_history': [h.to_dict() for h in history]})
+    return {'records': entries, 'missing': missing}
+
+def public_view(record):
+    return record.to_public_dict() if record.status != 'draft' else None
+
 def get_pagination_params(request):
     """Extract and validate pagination parameters from request"""
     try:
@@ -33,7 +121,7 @@ def get_pagination_params(request):
     except (ValueError, TypeError):
         return 1, 10
 
-def create_status_history(record_id, old_status, new_status, admin_id=None, reason=None):
+def create_status_history(record_id, old_status, new_status, admin_id=None, reason=None, changed_at=None):
     """Create status history record"""
     try:
         history = StatusHistory(
@@ -41,7 +129,8 @@ def create_status_history(record_id, old_status, new_status, admin_id=None, reas
             old_status=old_status,
             new_status=new_status,
             changed_by=admin_id,
-            change_reason=reason
+            change_reason=reason,
+            changed_at=changed_at or datetime.utcnow()
         )
         db.session.add(history)
         return True
@@ -56,6 +145,7 @@ def update_vote_count(record_id):
         record = Record.query.get(record_id)
         if record:
             record.vote_count = vote_count
+            refresh_priority(record)
         return vote_count
     except Exception as e:
         logger.error(f"Failed to update vote count: {str(e)}")
@@ -64,27 +154,16 @@ def update_vote_count(record_id):
 # ------------------ Authentication Endpoints ------------------
 
 @routes.route('/auth/signup', methods=['POST'])
-def signup():
+@use_schema(schemas.SIGNUP)
+def signup(payload):
     """User registration endpoint"""
-    data = request.get_json()
-    
-    # Validate required fields
-    required_fields = ['name', 'email', 'password']
-    if not all(data.get(field) for field in required_fields):
-        return make_response({'error': 'Name, email, and password are required'}, 400)
-
-    # Validate email format (Gmail only as per requirements)
-    if not validate_email(data['email']):
-        return make_response({'error': 'Email must be a valid Gmail address (@gmail.com)'}, 400)
+    data = payload
 
     # Check if user already exists
     if NormalUser.query.filter_by(email=data['email']).first():
         return make_response({'error': 'User with this email already exists'}, 409)
 
-    # Validate password strength
     password = data['password']
-    if len(password) < 6:
-        return make_response({'error': 'Password must be at least 6 characters long'}, 400)
 
     try:
         new_user = NormalUser(
@@ -115,11 +194,10 @@ def signup():
         return make_response({'error': 'User signup failed'}, 500)
 
 @routes.route('/auth/login', methods=['POST'])
-def login():
+@use_schema(schemas.LOGIN)
+def login(payload):
     """User login endpoint"""
-    data = request.get_json()
-    if not data or not data.get('email') or not data.get('password'):
-        return make_response({'error': 'Email and password are required'}, 400)
+    data = payload
 
     try:
         user = NormalUser.query.filter_by(email=data['email']).first()
@@ -140,13 +218,10 @@ def login():
         return make_response({'error': 'Login failed'}, 500)
 
 @routes.route('/admin/signup', methods=['POST'])
-def admin_signup():
+@use_schema(schemas.ADMIN_SIGNUP)
+def admin_signup(payload):
     """Admin registration endpoint"""
-    data = request.get_json()
-
-    required_fields = ['name', 'email', 'password']
-    if not all(data.get(field) for field in required_fields):
-        return make_response({'error': 'Name, email, and password are required'}, 400)
+    data = payload
 
     if Administrator.query.filter_by(email=data['email']).first():
         return make_response({'error': 'Admin with this email already exists'}, 409)
@@ -177,11 +252,10 @@ def admin_signup():
         return make_response({'error': 'Admin signup failed'}, 500)
 
 @routes.route('/admin/login', methods=['POST'])
-def admin_login():
+@use_schema(schemas.LOGIN)
+def admin_login(payload):
     """Admin login endpoint"""
-    data = request.get_json()
-    if not data or not data.get('email') or not data.get('password'):
-        return make_response({'error': 'Email and password are required'}, 400)
+    data = payload
     
     try:
         admin = Administrator.query.filter_by(email=data['email']).first()
@@ -204,9 +278,19 @@ def admin_login():
 # ------------------ Public Endpoints (No Authentication Required) ------------------
 
 @routes.route('/public/records', methods=['GET'])
+@read_only
 def get_public_records():
-    """Get all records for public viewing (anonymous access) with enhanced search and filtering"""
+    """Get all records for public viewing (anonymous access) with enhanced search and filtering
+
+    With `ids=1,2,3` returns those records' details instead (see record_details()).
+    """
     try:
+        if 'ids' in request.args:
+            ids = parse_id_list(request.args['ids'])
+            if ids is None:
+                return make_response({'error': f'ids must be 1 to {schemas.MAX_BATCH_IDS} comma-separated integers'}, 400)
+            return make_response(record_details(ids, public_view), 200)
+        
         page, per_page = get_pagination_params(request)
         
         # Enhanced filters with search support
@@ -239,7 +323,8 @@ def get_public_records():
             )
         
         # Order by vote count and creation date
-        query = query.order_by(Record.vote_count.desc(), Record.created_at.desc())
+        query = with_media(query.order_by(Record.vote_count.desc(), Record.created_at.desc()))
+        image_width = listing_image_width(request)
         
         # Paginate
         paginated_records = query.paginate(
@@ -249,7 +334,7 @@ def get_public_records():
         )
         
         return make_response({
-            'records': [r.to_public_dict() for r in paginated_records.items],
+            'records': [r.to_public_dict(image_width) for r in paginated_records.items],
             'pagination': {
                 'page': page,
                 'per_page': per_page,
@@ -273,39 +358,31 @@ def get_public_records():
         return make_response({'error': 'Failed to fetch records'}, 500)
 
 @routes.route('/public/records/<int:record_id>', methods=['GET'])
+@read_only
 def get_public_record_details(record_id):
-    """Get specific record details for public viewing"""
+    """Get specific record details for public viewing (archived records included)"""
     try:
-        record = Record.query.get_or_404(record_id)
-        
         # Only show non-draft records publicly
-        if record.status == 'draft':
+        details = record_details([record_id], public_view)
+        if not details['records']:
             return make_response({'error': 'Record not found'}, 404)
         
-        return make_response({
-            'record': record.to_public_dict(),
-            'status_history': [h.to_dict() for h in record.status_history]
-        }, 200)
+        return make_response(details['records'][0], 200)
         
     except Exception as e:
         logger.error(f"Failed to fetch public record: {str(e)}")
         return make_response({'error': 'Failed to fetch record'}, 500)
 
 @routes.route('/public/report', methods=['POST'])
-def anonymous_report():
+@use_schema(schemas.ANONYMOUS_REPORT)
+def anonymous_report(payload):
     """Create anonymous report without authentication"""
-    data = request.get_json()
-    
-    # Validate required fields
-    if not data.get('title') or not data.get('description'):
-        return make_response({'error': 'Title and description are required'}, 400)
-    
-    # Validate type
-    valid_types = ['red-flag', 'intervention', 'incident', 'complaint', 'suggestion', 'emergency']
-    if data.get('type') not in valid_types:
-        return make_response({'error': f'Type must be one of: {", ".join(valid_types)}'}, 400)
+    data = payload
     
     try:
+        # Only a hash of the tracking token is stored; the reporter gets the token once
+        tracking_token = generate_tracking_token()
+
         # Create anonymous record
         new_record = Record(
             title=data.get('title'),
@@ -314,36 +391,34 @@ def anonymous_report():
             latitude=data.get('latitude'),
             longitude=data.get('longitude'),
             location_name=data.get('location_name'),
-            urgency_level=data.get('urgency_level', 'medium'),
+            urgency_level=data['urgency_level'],
             status='under-investigation',  # Anonymous reports go straight to investigation
             is_anonymous=True,
-            normal_user_id=None  # No user associated
+            normal_user_id=None,  # No user associated
+            tracking_token_hash=hash_tracking_token(tracking_token)
         )
+        refresh_priority(new_record)
+
+        # Add media if provided
+        set_media_url(new_record, 'image', data.get('image_url'))
+        set_media_url(new_record, 'video', data.get('video_url'))
 
         db.session.add(new_record)
         db.session.flush()
 
-        # Add media if provided
-        if data.get('image_url') or data.get('video_url'):
-            media = Media(
-                record_id=new_record.id,
-                image_url=data.get('image_url'),
-                video_url=data.get('video_url'),
-                media_type='image' if data.get('image_url') else 'video',
-                media_url=data.get('image_url') or data.get('video_url')
-            )
-            db.session.add(media)
+        # Earlier public reports of the same incident
+        index_record(new_record)
+        duplicates = find_duplicates(new_record, visible=Record.status != 'draft')
 
+        record_change(new_record, CHANGE_CREATED)
         db.session.commit()
 
-        # Generate tracking token for anonymous user
-        tracking_token = f"ANON-{new_record.id}-{uuid4().hex[:8].upper()}"
-
         return make_response({
             'message': 'Anonymous report submitted successfully',
             'tracking_token': tracking_token,
             'record_id': new_record.id,
-            'record': new_record.to_public_dict()
+            'record': new_record.to_public_dict(),
+            'possible_duplicates': duplicates
         }, 201)
 
     except Exception as e:
@@ -351,76 +426,82 @@ def anonymous_report():
         logger.error(f"Anonymous report creation failed: {str(e)}")
         return make_response({'error': 'Failed to create anonymous report'}, 500)
 
+@routes.route('/public/track/<token>', methods=['GET'])
+@read_only
+def track_anonymous_report(token):
+    """Status and history of an anonymous report by its tracking token
+
+    Resolved with one indexed lookup on the token hash; results are cached
+    for TRACKING_CACHE_SECONDS since reporters poll this often.
+    """
+    try:
+        report = tracking_cache.get(hash_tracking_token(token), find_tracked_report)
+        if report is None:
+            return make_response({'error': 'No report found for this tracking token'}, 404)
+
+        response = make_response({'report': report}, 200)
+        response.headers['Cache-Control'] = f"private, max-age={int(current_app.config['TRACKING_CACHE_SECONDS'])}"
+        return response
+
+    except Exception as e:
+        logger.error(f"Failed to track report: {str(e)}")
+        return make_response({'error': 'Failed to fetch report status'}, 500)
+
 # ------------------ User Record Management ------------------
 
 @routes.route('/records', methods=['POST'])
 @jwt_required()
-def create_record():
+@use_schema(schemas.CREATE_RECORD)
+def create_record(payload):
     """Create new record (authenticated users)"""
     identity = get_jwt_identity()
     if identity.get('role') != 'user':
         return make_response({'error': 'Only users can create records'}, 403)
 
-    data = request.get_json()
-    if not data.get('title'):
-        return make_response({'error': 'Title is required'}, 400)
-
-    # Validate type
-    if data.get('type') not in ['red-flag', 'intervention', 'incident', 'complaint', 'suggestion', 'emergency']:
-        data['type'] = 'red-flag'  # Default fallback
-
-    # Validate coordinates if provided
-    if data.get('latitude') is not None or data.get('longitude') is not None:
-        if not validate_coordinates(data.get('latitude'), data.get('longitude')):
-            return make_response({'error': 'Invalid coordinates provided'}, 400)
-
-    # Validate media URLs if provided
+    data = payload
     image_url = data.get('image_url')
     video_url = data.get('video_url')
-    
-    if image_url and not validate_media_url(image_url, 'image'):
-        return make_response({'error': 'Invalid image URL format'}, 400)
-    
-    if video_url and not validate_media_url(video_url, 'video'):
-        return make_response({'error': 'Invalid video URL format'}, 400)
 
     try:
+        user = db.session.get(NormalUser, identity['id'])
         new_record = Record(
-            title=data.get('title'),
-            description=data.get('description', ''),
-            type=data.get('type', 'red-flag'),
+            title=data['title'],
+            description=data['description'] or '',
+            type=data['type'],
             latitude=data.get('latitude'),
             longitude=data.get('longitude'),
             location_name=data.get('location_name'),
-            urgency_level=data.get('urgency_level', 'medium'),
+            urgency_level=data['urgency_level'],
             status='draft',
             normal_user_id=identity['id'],
+            creator_name=user.name,
             is_anonymous=False
         )
+        refresh_priority(new_record)
+
+        # Add media if provided
+        set_media_url(new_record, 'image', image_url)
+        set_media_url(new_record, 'video', video_url)
 
         db.session.add(new_record)
         db.session.flush()
 
-        # Add media if provided
-        if image_url or video_url:
-            media = Media(
-                record_id=new_record.id,
-                image_url=image_url,
-                video_url=video_url,
-                media_type='image' if image_url else 'video',
-                media_url=image_url or video_url
-            )
-            db.session.add(media)
+        # Public reports and the user's own drafts that look like the same incident
+        index_record(new_record)
+        duplicates = find_duplicates(
+            new_record, visible=db.or_(Record.status != 'draft', Record.normal_user_id == identity['id'])
+        )
 
+        record_change(new_record, CHANGE_CREATED)
         db.session.commit()
 
         # Send confirmation email
-        user = NormalUser.query.get(identity['id'])
         send_record_created_email(user.email, user.name, new_record.title)
 
         return make_response({
             'message': 'Record created successfully',
-            'record': new_record.to_dict()
+            'record': new_record.to_dict(),
+            'possible_duplicates': duplicates
         }, 201)
 
     except Exception as e:
@@ -428,6 +509,76 @@ def create_record():
         logger.error(f"Record creation failed: {str(e)}")
         return make_response({'error': 'Failed to create record'}, 500)
 
+@routes.route('/records/import', methods=['POST'])
+@jwt_required()
+def import_records_bulk():
+    """Bulk import records from a JSON array, NDJSON or CSV body or file upload
+
+    The body is streamed and inserted in chunks, so large imports are never
+    held in memory. Returns per-row errors and sends one summary email.
+    """
+    identity = get_jwt_identity()
+    if identity.get('role') != 'user':
+        return make_response({'error': 'Only users can import records'}, 403)
+
+    upload = request.files.get('file') if request.mimetype == 'multipart/form-data' else None
+    if upload:
+        stream = upload.stream
+        fmt = request.args.get('format') or detect_format(upload.mimetype, upload.filename)
+    else:
+        stream = request.stream
+        fmt = request.args.get('format') or detect_format(request.mimetype)
+
+    if fmt not in IMPORT_FORMATS:
+        return make_response({'error': f'Upload must be one of: {", ".join(IMPORT_FORMATS)}'}, 400)
+
+    try:
+        summary = import_records(
+            iter_rows(stream, fmt),
+            identity['id'],
+            chunk_size=current_app.config.get('IMPORT_CHUNK_SIZE', 1000),
+            max_errors=current_app.config.get('IMPORT_MAX_REPORTED_ERRORS', 1000)
+        )
+
+        user = db.session.get(NormalUser, identity['id'])
+        if user and summary['total']:
+            send_import_summary_email(user.email, user.name, summary)
+
+        return make_response({
+            'message': f"Imported {summary['imported']} of {summary['total']} record(s)",
+            **summary
+        }, 201 if summary['imported'] else 400)
+
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Bulk import failed: {str(e)}")
+        return make_response({'error': 'Bulk import failed'}, 500)
+
+@routes.route('/records/batch-get', methods=['POST'])
+@jwt_required()
+@read_only
+@use_schema(schemas.BATCH_GET)
+def batch_get_records(payload):
+    """Details of up to MAX_BATCH_IDS records in one request, in the order asked for
+
+    Admins see every record in full; users see their own records in full and
+    other non-draft records in their public form. Ids that do not exist or
+    may not be seen are listed in `missing`.
+    """
+    identity = get_jwt_identity()
+
+    def view(record):
+        if identity.get('role') == 'admin' or record.normal_user_id == identity['id']:
+            return record.to_dict()
+        return public_view(record)
+
+    try:
+        return make_response(record_details(payload['ids'], view), 200)
+
+    except Exception as e:
+        logger.error(f"Failed to batch-get records: {str(e)}")
+        return make_response({'error': 'Failed to fetch records'}, 500)
+
 @routes.route('/my-records', methods=['GET'])
 @jwt_required()
 def get_my_records():
@@ -463,7 +614,8 @@ def get_my_records():
                 )
             )
         
-        query = query.order_by(Record.created_at.desc())
+        query = with_media(query.order_by(Record.created_at.desc()))
+        image_width = listing_image_width(request)
         
         paginated_records = query.paginate(
             page=page,
@@ -472,7 +624,7 @@ def get_my_records():
         )
         
         return make_response({
-            'records': [r.to_dict() for r in paginated_records.items],
+            'records': [r.to_dict(image_width) for r in paginated_records.items],
             'pagination': {
                 'page': page,
                 'per_page': per_page,
@@ -489,7 +641,8 @@ def get_my_records():
 
 @routes.route('/records/<int:id>', methods=['PATCH'])
 @jwt_required()
-def update_record(id):
+@use_schema(schemas.UPDATE_RECORD)
+def update_record(id, payload):
     """Update record (only draft records by owner)"""
     identity = get_jwt_identity()
     
@@ -504,23 +657,8 @@ def update_record(id):
         if record.status != 'draft':
             return make_response({'error': 'Only draft records can be edited'}, 400)
 
-        data = request.get_json()
-        
-        # Validate coordinates if being updated
-        if 'latitude' in data or 'longitude' in data:
-            lat = data.get('latitude', record.latitude)
-            lng = data.get('longitude', record.longitude)
-            if (lat is not None or lng is not None) and not validate_coordinates(lat, lng):
-                return make_response({'error': 'Invalid coordinates'}, 400)
-        
-        # Validate media URLs if being updated
-        if 'image_url' in data and data['image_url']:
-            if not validate_media_url(data['image_url'], 'image'):
-                return make_response({'error': 'Invalid image URL'}, 400)
-        
-        if 'video_url' in data and data['video_url']:
-            if not validate_media_url(data['video_url'], 'video'):
-                return make_response({'error': 'Invalid video URL'}, 400)
+        # Only fields present in the request (already validated by the schema)
+        data = payload
         
         # Update record fields
         if 'title' in data:
@@ -537,28 +675,21 @@ def update_record(id):
             record.location_name = data['location_name']
         if 'urgency_level' in data:
             record.urgency_level = data['urgency_level']
+        if 'urgency_level' in data or 'type' in data:
+            refresh_priority(record)
         
         record.updated_at = datetime.utcnow()
 
-        # Update or create media
-        if 'image_url' in data or 'video_url' in data:
-            media = Media.query.filter_by(record_id=record.id).first()
-            if media:
-                if 'image_url' in data:
-                    media.image_url = data['image_url']
-                if 'video_url' in data:
-                    media.video_url = data['video_url']
-                media.media_url = data.get('image_url') or data.get('video_url')
-            else:
-                media = Media(
-                    record_id=record.id,
-                    image_url=data.get('image_url'),
-                    video_url=data.get('video_url'),
-                    media_type='image' if data.get('image_url') else 'video',
-                    media_url=data.get('image_url') or data.get('video_url')
-                )
-                db.session.add(media)
+        if 'title' in data or 'description' in data:
+            index_record(record, replace=True)
+
+        # Replace (or remove, when cleared) the record's image / video
+        if 'image_url' in data:
+            set_media_url(record, 'image', data['image_url'])
+        if 'video_url' in data:
+            set_media_url(record, 'video', data['video_url'])
 
+        record_change(record, CHANGE_UPDATED)
         db.session.commit()
         
         return make_response({
@@ -588,6 +719,7 @@ def delete_record(id):
         if record.status != 'draft':
             return make_response({'error': 'Only draft records can be deleted'}, 400)
 
+        record_change(record, CHANGE_DELETED)
         db.session.delete(record)
         db.session.commit()
         
@@ -598,21 +730,130 @@ def delete_record(id):
         logger.error(f"Failed to delete record: {str(e)}")
         return make_response({'error': 'Failed to delete record'}, 500)
 
+# ------------------ Media Uploads ------------------
+
+@routes.route('/records/<int:id>/uploads', methods=['POST'])
+@jwt_required()
+@use_schema(schemas.UPLOAD_REQUEST)
+def request_media_upload(id, payload):
+    """Presigned URL for uploading a photo or video straight to storage (draft records by owner)
+
+    The client sends the file to `upload.url` (with `upload.fields` for a POST,
+    or `upload.headers` for a PUT), then calls /records/<id>/uploads/complete
+    with the returned upload_id. File bytes never pass through the API.
+    """
+    identity = get_jwt_identity()
+    config = current_app.config
+
+    try:
+        record = db.session.get(Record, id)
+        if record is None:
+            return make_response({'error': 'Record not found'}, 404)
+        if identity.get('role') != 'user' or record.normal_user_id != identity['id']:
+            return make_response({'error': 'Unauthorized'}, 403)
+        if record.status != 'draft':
+            return make_response({'error': 'Media can only be added to draft records'}, 400)
+
+        content_type = payload['content_type']
+        media_type, extension = MEDIA_CONTENT_TYPES[content_type]
+        max_bytes = upload_limit(media_type)
+        if payload['size'] > max_bytes:
+            return make_response({'error': f'{media_type.capitalize()} uploads are limited to {max_bytes // (1024 * 1024)} MB'}, 413)
+
+        key = f"records/{record.id}/{uuid4().hex}{extension}"
+        upload = get_storage().presign_upload(key, content_type, max_bytes, config['UPLOAD_URL_EXPIRES_SECONDS'])
+        upload_id = sign_upload_ticket({
+            'record_id': record.id,
+            'user_id': identity['id'],
+            'key': key,
+            'media_type': media_type,
+            'filename': secure_filename(payload['filename']) or None,
+            'max_bytes': max_bytes
+        })
+
+        return make_response({
+            'upload_id': upload_id,
+            'upload': upload,
+            'expires_in': config['UPLOAD_URL_EXPIRES_SECONDS']
+        }, 201)
+
+    except Exception as e:
+        logger.error(f"Failed to presign upload: {str(e)}")
+        return make_response({'error': 'Failed to prepare upload'}, 500)
+
+@routes.route('/records/<int:id>/uploads/complete', methods=['POST'])
+@jwt_required()
+@use_schema(schemas.UPLOAD_COMPLETE)
+def complete_media_upload(id, payload):
+    """Register an uploaded file as the record's media, with its stored size and filename"""
+    identity = get_jwt_identity()
+    ticket = load_upload_ticket(payload['upload_id'])
+    if ticket is None or ticket['record_id'] != id or ticket['user_id'] != identity.get('id'):
+        return make_response({'error': 'Invalid or expired upload_id'}, 400)
+
+    try:
+        record = db.session.get(Record, id)
+        if record is None:
+            return make_response({'error': 'Record not found'}, 404)
+        if identity.get('role') != 'user' or record.normal_user_id != identity['id']:
+            return make_response({'error': 'Unauthorized'}, 403)
+        # upload_id outlives the presign step, so the record may have been submitted since
+        if record.status != 'draft':
+            return make_response({'error': 'Media can only be added to draft records'}, 400)
+
+        store = get_storage()
+        media_url = store.public_url(ticket['key'])
+
+        # Completing twice (e.g. a client retry) returns the existing row; matched on the
+        # upload key since deduplication may repoint media_url at an earlier copy
+        existing = Media.query.filter_by(record_id=id, storage_key=ticket['key']).first()
+        if existing:
+            return make_response({'message': 'Upload already registered', 'media': existing.to_dict()}, 200)
+
+        stored = store.stat(ticket['key'])
+        if stored is None:
+            return make_response({'error': 'File has not been uploaded yet'}, 409)
+        if not 0 < stored['size'] <= ticket['max_bytes']:
+            store.delete(ticket['key'])
+            return make_response({'error': 'Uploaded file is empty or too large'}, 400)
+
+        media = Media(
+            media_type=ticket['media_type'],
+            media_url=media_url,
+            position=record.next_media_position(),
+            filename=ticket['filename'],
+            file_size=stored['size'],
+            storage_key=ticket['key'],
+            processing_status=MEDIA_PENDING
+        )
+        record.media.append(media)
+        record.refresh_media_summary()
+        record.updated_at = datetime.utcnow()
+        record_change(record, CHANGE_UPDATED)
+        db.session.commit()
+
+        # Thumbnails, dimensions and EXIF stripping happen off the request
+        submit_media_processing(media.id)
+
+        return make_response({'message': 'Upload registered', 'media': media.to_dict()}, 201)
+
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Failed to complete upload: {str(e)}")
+        return make_response({'error': 'Failed to register upload'}, 500)
+
 # ------------------ Voting System ------------------
 
 @routes.route('/records/<int:record_id>/vote', methods=['POST'])
 @jwt_required()
-def vote_record(record_id):
+@use_schema(schemas.VOTE)
+def vote_record(record_id, payload):
     """Vote/support a record"""
     identity = get_jwt_identity()
     if identity.get('role') != 'user':
         return make_response({'error': 'Only users can vote'}, 403)
 
-    data = request.get_json()
-    vote_type = data.get('vote_type', 'support')
-    
-    if vote_type not in ['support', 'urgent']:
-        return make_response({'error': 'Vote type must be "support" or "urgent"'}, 400)
+    vote_type = payload['vote_type']
 
     try:
         record = Record.query.get_or_404(record_id)
@@ -639,6 +880,7 @@ def vote_record(record_id):
         
         # Update vote count
         vote_count = update_vote_count(record_id)
+        record_change(record, CHANGE_VOTE)
         
         db.session.commit()
         
@@ -674,6 +916,9 @@ def remove_vote(record_id):
         
         # Update vote count
         vote_count = update_vote_count(record_id)
+        record = db.session.get(Record, record_id)
+        if record:
+            record_change(record, CHANGE_VOTE)
         
         db.session.commit()
         
@@ -734,7 +979,8 @@ def get_all_records():
                 )
             )
         
-        query = query.order_by(Record.created_at.desc())
+        query = with_media(query.order_by(Record.created_at.desc()))
+        image_width = listing_image_width(request)
         
         paginated_records = query.paginate(
             page=page,
@@ -743,7 +989,7 @@ def get_all_records():
         )
         
         return make_response({
-            'records': [r.to_dict() for r in paginated_records.items],
+            'records': [r.to_dict(image_width) for r in paginated_records.items],
             'pagination': {
                 'page': page,
                 'per_page': per_page,
@@ -758,9 +1004,79 @@ def get_all_records():
         logger.error(f"Failed to fetch all records: {str(e)}")
         return make_response({'error': 'Failed to fetch records'}, 500)
 
+@routes.route('/admin/records/<int:id>/similar', methods=['GET'])
+@jwt_required()
+@read_only
+def get_similar_records(id):
+    """Likely duplicate reports of a record (similar text, nearby if both are located)"""
+    identity = get_jwt_identity()
+    if identity.get('role') != 'admin':
+        return make_response({'error': 'Only admins can view similar records'}, 403)
+
+    try:
+        record = db.session.get(Record, id)
+        if record is None:
+            return make_response({'error': 'Record not found'}, 404)
+
+        limit = min(max(request.args.get('limit', 10, type=int), 1), 50)
+        return make_response({
+            'record_id': record.id,
+            'similar': find_duplicates(record, limit=limit)
+        }, 200)
+
+    except Exception as e:
+        logger.error(f"Failed to find similar records: {str(e)}")
+        return make_response({'error': 'Failed to find similar records'}, 500)
+
+@routes.route('/admin/queue', methods=['GET'])
+@jwt_required()
+@read_only
+def get_triage_queue():
+    """Next unassigned reports by priority (urgency, emergencies, votes and waiting time)"""
+    identity = get_jwt_identity()
+    if identity.get('role') != 'admin':
+        return make_response({'error': 'Only admins can view the queue'}, 403)
+
+    try:
+        limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+        records = with_media(queued_records(limit)).all()
+        now = datetime.utcnow()
+        return make_response({
+            'records': [{**record.to_dict(), 'priority': current_priority(record.triage_priority, now)}
+                        for record in records]
+        }, 200)
+
+    except Exception as e:
+        logger.error(f"Failed to fetch triage queue: {str(e)}")
+        return make_response({'error': 'Failed to fetch queue'}, 500)
+
+@routes.route('/admin/queue/claim', methods=['POST'])
+@jwt_required()
+@use_schema(schemas.CLAIM_QUEUE)
+def claim_queued_records(payload):
+    """Assign the next `count` queued reports, or the listed `ids` still unclaimed, to the calling admin"""
+    identity = get_jwt_identity()
+    if identity.get('role') != 'admin':
+        return make_response({'error': 'Only admins can claim records'}, 403)
+
+    try:
+        ids = payload.get('ids')
+        claimed = claim_records(identity['id'], len(ids) if ids else payload['count'], ids)
+        response = {'records': [record.to_dict() for record in claimed]}
+        if ids:
+            won = {record.id for record in claimed}
+            response['unavailable'] = [record_id for record_id in ids if record_id not in won]
+        return make_response(response, 200)
+
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Failed to claim records: {str(e)}")
+        return make_response({'error': 'Failed to claim records'}, 500)
+
 @routes.route('/records/<int:id>/status', methods=['PATCH'])
 @jwt_required()
-def update_status(id):
+@use_schema(schemas.UPDATE_STATUS)
+def update_status(id, payload):
     """Update record status (admin only)"""
     identity = get_jwt_identity()
     if identity.get('role') != 'admin':
@@ -768,69 +1084,159 @@ def update_status(id):
 
     try:
         record = Record.query.get_or_404(id)
-        data = request.get_json()
-        new_status = data.get('status')
-        reason = data.get('reason', '')
-
-        if new_status not in ['under-investigation', 'rejected', 'resolved']:
-            return make_response({'error': 'Invalid status'}, 400)
+        data = payload
+        new_status = data['status']
+        reason = data['reason']
 
         old_status = record.status
         record.status = new_status
-        record.updated_at = datetime.utcnow()
+        now = datetime.utcnow()
+        record.updated_at = record.status_changed_at = now
         
         # Add resolution notes if provided
         if data.get('resolution_notes'):
             record.resolution_notes = data['resolution_notes']
         
-        # Assign admin if not already assigned
+        # Assign admin if not already assigned (which takes the record off the queue)
         if not record.assigned_admin_id:
             record.assigned_admin_id = identity['id']
+        refresh_priority(record)
 
         # Create status history
-        create_status_history(record.id, old_status, new_status, identity['id'], reason)
+        create_status_history(record.id, old_status, new_status, identity['id'], reason, changed_at=now)
+
+        # Owner is notified in a digest of their changes unless the transition is urgent
+        send_now = queue_status_notification(record, old_status, new_status, reason, urgent=data['urgent'])
+        record_change(record, CHANGE_STATUS)
 
         db.session.commit()
 
-        # Send notifications if user exists (not anonymous)
-        if record.normal_user_id:
-            user = NormalUser.query.get(record.normal_user_id)
-            if user:
-                # Email notification
-                email_message = f"""Hello {user.name},
+        if send_now:
+            flush_user_digest(record.normal_user_id)
+        if record.tracking_token_hash:
+            tracking_cache.invalidate(record.tracking_token_hash)
 
-Your record "{record.title}" has been updated.
+        return make_response({
+            'message': f'Status updated to {new_status}',
+            'record': record.to_dict()
+        }, 200)
 
-Status: {old_status.upper()} ➝ {new_status.upper()}
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Failed to update status: {str(e)}")
+        return make_response({'error': 'Status update failed'}, 500)
 
-{f'Reason: {reason}' if reason else ''}
+@routes.route('/admin/records/status', methods=['PATCH'])
+@jwt_required()
+@use_schema(schemas.BULK_UPDATE_STATUS)
+def bulk_update_status(payload):
+    """Update the status of many records at once (admin only)
 
-{f'Resolution Notes: {record.resolution_notes}' if record.resolution_notes else ''}
+    Targets either `ids` or a `filter` on status/type/urgency_level. Uses one
+    UPDATE, bulk-inserted status history and batched digest notifications.
+    """
+    identity = get_jwt_identity()
+    if identity.get('role') != 'admin':
+        return make_response({'error': 'Only admins can update status'}, 403)
 
-Thank you for using Jiseti!
+    try:
+        data = payload
+        new_status = data['status']
+        reason = data['reason']
+        ids = data.get('ids')
+        filters = data.get('filter') or {}
+        max_records = current_app.config.get('BULK_STATUS_MAX_RECORDS', 5000)
+
+        if ids and len(ids) > max_records:
+            return make_response({'error': f'At most {max_records} records can be updated per request'}, 400)
+
+        # Current state of the targeted records in one query, locked until commit
+        query = db.session.query(Record.id, Record.status, Record.normal_user_id, Record.vote_count,
+                                 Record.tracking_token_hash)
+        if ids:
+            query = query.filter(Record.id.in_(ids))
+        for column, value in filters.items():
+            query = query.filter(getattr(Record, column) == value)
+        targets = query.order_by(Record.id).limit(max_records + 1).with_for_update().all()
+
+        if len(targets) > max_records:
+            return make_response({'error': f'Filter matches more than {max_records} records; narrow it down'}, 400)
+
+        found = {t.id: t for t in targets}
+        changed = [t for t in targets if t.status != new_status]
+        changed_ids = [t.id for t in changed]
+
+        if changed_ids:
+            now = datetime.utcnow()
+            values = {
+                'status': new_status,
+                'updated_at': now,
+                'status_changed_at': now,
+                # Assign admin if not already assigned; assigned records leave the queue
+                'assigned_admin_id': db.func.coalesce(Record.assigned_admin_id, identity['id']),
+                'triage_priority': None
+            }
+            if data.get('resolution_notes'):
+                values['resolution_notes'] = data['resolution_notes']
 
-Best regards,
-Jiseti Admin Team"""
+            db.session.execute(
+                db.update(Record).where(Record.id.in_(changed_ids)).values(**values),
+                execution_options={'synchronize_session': False}
+            )
+            db.session.execute(db.insert(StatusHistory), [{
+                'record_id': t.id,
+                'old_status': t.status,
+                'new_status': new_status,
+                'changed_by': identity['id'],
+                'change_reason': reason,
+                'changed_at': now
+            } for t in changed])
+
+        flush_now = queue_status_notifications([{
+            'record_id': t.id,
+            'user_id': t.normal_user_id,
+            'old_status': t.status,
+            'new_status': new_status
+        } for t in changed], reason=reason, urgent=data['urgent'])
+        record_changes([{
+            'record_id': t.id,
+            'user_id': t.normal_user_id,
+            'status': new_status,
+            'vote_count': t.vote_count
+        } for t in changed], CHANGE_STATUS)
 
-                email_sent = send_status_email(user.email, f"Status Update: {record.title}", email_message)
-                
-                # SMS notification if phone number available
-                if user.phone_number:
-                    sms_message = f"Jiseti Update: Your report '{record.title}' is now {new_status.upper()}. Check your email for details."
-                    send_sms_notification(user.phone_number, sms_message)
+        db.session.commit()
+
+        for user_id in flush_now:
+            flush_user_digest(user_id)
+        for t in changed:
+            if t.tracking_token_hash:
+                tracking_cache.invalidate(t.tracking_token_hash)
+
+        results = []
+        for record_id in (ids or [t.id for t in targets]):
+            target = found.get(record_id)
+            if target is None:
+                results.append({'id': record_id, 'result': 'not_found'})
+            elif target.status == new_status:
+                results.append({'id': record_id, 'result': 'unchanged', 'status': new_status})
+            else:
+                results.append({'id': record_id, 'result': 'updated', 'old_status': target.status, 'status': new_status})
 
         return make_response({
-            'message': f'Status updated to {new_status}',
-            'record': record.to_dict()
+            'message': f'{len(changed_ids)} record(s) updated to {new_status}',
+            'updated': len(changed_ids),
+            'results': results
         }, 200)
 
     except Exception as e:
         db.session.rollback()
-        logger.error(f"Failed to update status: {str(e)}")
-        return make_response({'error': 'Status update failed'}, 500)
+        logger.error(f"Failed to bulk update status: {str(e)}")
+        return make_response({'error': 'Bulk status update failed'}, 500)
 
 @routes.route('/admin/stats', methods=['GET'])
 @jwt_required()
+@read_only
 def get_admin_stats():
     """Get platform statistics (admin only)"""
     identity = get_jwt_identity()
@@ -852,6 +1258,23 @@ def get_admin_stats():
         red_flag_count = Record.query.filter_by(type='red-flag').count()
         intervention_count = Record.query.filter_by(type='intervention').count()
         
+        # Archived records still count; one grouped scan of the archive
+        archived_counts = (db.session.query(ArchivedRecord.status, ArchivedRecord.type, db.func.count())
+                           .group_by(ArchivedRecord.status, ArchivedRecord.type)
+                           .all())
+        archived_count = 0
+        for status, record_type, count in archived_counts:
+            archived_count += count
+            if status == 'resolved':
+                resolved_count += count
+            elif status == 'rejected':
+                rejected_count += count
+            if record_type == 'red-flag':
+                red_flag_count += count
+            elif record_type == 'intervention':
+                intervention_count += count
+        total_records += archived_count
+        
         # Recent activity (last 30 days)
         from datetime import timedelta
         thirty_days_ago = datetime.utcnow() - timedelta(days=30)
@@ -861,6 +1284,7 @@ def get_admin_stats():
         return make_response({
             'total_records': total_records,
             'total_users': total_users,
+            'archived_records': archived_count,
             'status_distribution': {
                 'draft': draft_count,
                 'under_investigation': investigation_count,
@@ -881,6 +1305,23 @@ def get_admin_stats():
         logger.error(f"Failed to fetch admin stats: {str(e)}")
         return make_response({'error': 'Failed to fetch statistics'}, 500)
 
+@routes.route('/admin/debug/queries', methods=['GET'])
+@jwt_required()
+def get_query_debug():
+    """Recent per-request SQL statistics (admin only)"""
+    identity = get_jwt_identity()
+    if identity.get('role') != 'admin':
+        return make_response({'error': 'Only admins can view query diagnostics'}, 403)
+
+    requests_seen = recent_requests()
+    if request.args.get('n_plus_one') == 'true':
+        requests_seen = [r for r in requests_seen if r['n_plus_one']]
+
+    return make_response({
+        'requests': requests_seen,
+        'count': len(requests_seen)
+    }, 200)
+
 # ------------------ User Profile ------------------
 
 @routes.route('/user', methods=['GET'])
@@ -913,7 +1354,8 @@ def get_current_user():
 
 @routes.route('/user/profile', methods=['PATCH'])
 @jwt_required()
-def update_user_profile():
+@use_schema(schemas.UPDATE_PROFILE)
+def update_user_profile(payload):
     """Update user profile"""
     identity = get_jwt_identity()
     if identity.get('role') != 'user':
@@ -924,11 +1366,16 @@ def update_user_profile():
         if not user:
             return make_response({'error': 'User not found'}, 404)
 
-        data = request.get_json()
+        data = payload
         
         # Update allowed fields
-        if 'name' in data:
+        if 'name' in data and data['name'] != user.name:
             user.name = data['name']
+            # Records carry a copy of the name for listings
+            db.session.execute(
+                db.update(Record).where(Record.normal_user_id == user.id).values(creator_name=user.name),
+                execution_options={'synchronize_session': False}
+            )
         if 'phone_number' in data:
             user.phone_number = data['phone_number']
         
@@ -944,21 +1391,125 @@ def update_user_profile():
         logger.error(f"Failed to update user profile: {str(e)}")
         return make_response({'error': 'Failed to update profile'}, 500)
 
+# ------------------ Change Feed ------------------
+
+def parse_since(value):
+    """Parse a change sequence cursor; None if absent, ValueError if not a non-negative integer"""
+    if value is None or value == '':
+        return None
+    if not value.isdigit():
+        raise ValueError(value)
+    return int(value)
+
+@routes.route('/changes', methods=['GET'])
+@jwt_required()
+@read_only
+def get_changes():
+    """Changes to the caller's records (every record for admins) after `since`
+
+    Clients sync incrementally by passing back `next_since`. Without `since`
+    the response only carries the current position to start syncing from.
+    """
+    identity = get_jwt_identity()
+    user_id = identity['id'] if identity.get('role') == 'user' else None
+    config = current_app.config
+
+    try:
+        since = parse_since(request.args.get('since'))
+    except ValueError:
+        return make_response({'error': 'since must be a non-negative integer'}, 400)
+    limit = request.args.get('limit', config['CHANGES_PAGE_LIMIT'], type=int)
+    limit = max(1, min(limit, config['CHANGES_PAGE_LIMIT']))
+
+    try:
+        if since is None:
+            head = settled_head(config['CHANGES_SETTLE_SECONDS'])
+            return make_response({'changes': [], 'next_since': head, 'has_more': False}, 200)
+
+        if history_starts_after(since):
+            return make_response({
+                'error': 'Changes since this point are no longer available; reload and sync from next_since',
+                'next_since': settled_head(config['CHANGES_SETTLE_SECONDS'])
+            }, 410)
+
+        changes, next_since, has_more = changes_since(since, user_id, limit, config['CHANGES_SETTLE_SECONDS'])
+        return make_response({
+            'changes': [c.to_dict() for c in changes],
+            'next_since': next_since,
+            'has_more': has_more
+        }, 200)
+
+    except Exception as e:
+        logger.error(f"Failed to fetch changes: {str(e)}")
+        return make_response({'error': 'Failed to fetch changes'}, 500)
+
+@routes.route('/changes/stream', methods=['GET'])
+@jwt_required()
+@read_only
+def stream_record_changes():
+    """Server-sent events for the same changes as /changes
+
+    Resumes from the Last-Event-ID header (or `since`), otherwise starts at
+    the current position. Live streams per process are capped; clients turned
+    away with a 503 should fall back to polling /changes.
+    """
+    identity = get_jwt_identity()
+    user_id = identity['id'] if identity.get('role') == 'user' else None
+    config = current_app.config
+
+    try:
+        since = parse_since(request.headers.get('Last-Event-ID') or request.args.get('since'))
+    except ValueError:
+        return make_response({'error': 'since must be a non-negative integer'}, 400)
+
+    try:
+        if since is None:
+            since = settled_head(config['CHANGES_SETTLE_SECONDS'])
+        elif history_starts_after(since):
+            return make_response({
+                'error': 'Changes since this point are no longer available; reload and sync from next_since',
+                'next_since': settled_head(config['CHANGES_SETTLE_SECONDS'])
+            }, 410)
+    except Exception as e:
+        logger.error(f"Failed to start change stream: {str(e)}")
+        return make_response({'error': 'Failed to start change stream'}, 500)
+
+    streams = current_app.extensions['jiseti_change_streams']
+    if not streams.acquire(blocking=False):
+        response = make_response({'error': 'Too many live change streams; poll /changes instead'}, 503)
+        response.headers['Retry-After'] = str(int(config['CHANGES_POLL_SECONDS']) or 1)
+        return response
+
+    response = Response(stream_with_context(stream_changes(config, since, user_id)), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    response.call_on_close(streams.release)
+    return response
+
 # ------------------ Utility Endpoints ------------------
 
 @routes.route('/records/<int:record_id>/history', methods=['GET'])
 @jwt_required()
+@read_only
 def get_record_history(record_id):
-    """Get status history for a record"""
+    """Get status history for a record (archived records included)"""
     identity = get_jwt_identity()
     
     try:
-        record = Record.query.get_or_404(record_id)
+        record = db.session.get(Record, record_id) or find_archived_record(record_id)
+        if record is None:
+            return make_response({'error': 'Record not found'}, 404)
         
         # Authorization check
         if identity.get('role') == 'user' and record.normal_user_id != identity['id']:
             return make_response({'error': 'Unauthorized'}, 403)
         
+        if isinstance(record, ArchivedRecord):
+            return make_response({
+                'record_id': record_id,
+                'history': record.status_history[::-1]
+            }, 200)
+        
         history = StatusHistory.query.filter_by(record_id=record_id).order_by(StatusHistory.changed_at.desc()).all()
         
         return make_response({
@@ -5,7 +5,12 @@ from datetime import datetime, timedelta
 from faker import Faker
 from werkzeug.security import generate_password_hash
 from app import create_app
-from models import db, NormalUser, Administrator, Record, Media, Vote, StatusHistory, Notification
+from utils.similarity import index_records, index_missing_records
+from utils.triage import triage_priority, refresh_all_priorities
+from utils.summaries import refresh_summaries
+from models import (
+    db, NormalUser, Administrator, Record, Media, Vote, StatusHistory, Notification, RecordFingerprint, RecordLshBucket,
+)
 
 # Initialize Faker for generating realistic data
 fake = Faker()
@@ -29,6 +34,8 @@ def clear_database():
     StatusHistory.query.delete()
     Notification.query.delete()
     Media.query.delete()
+    RecordLshBucket.query.delete()
+    RecordFingerprint.query.delete()
     Record.query.delete()
     Administrator.query.delete()
     NormalUser.query.delete()
@@ -362,7 +369,7 @@ def create_media(records):
                 record_id=record.id,
                 media_type="image",
                 media_url=image_url,
-                image_url=image_url,  
+                position=0,
                 filename=f"evidence_{record.id}_{random.randint(1000, 9999)}.jpg",
                 file_size=random.randint(500000, 3000000),  
                 uploaded_at=record.created_at + timedelta(minutes=random.randint(5, 120))
@@ -376,7 +383,7 @@ def create_media(records):
                 record_id=record.id,
                 media_type="video", 
                 media_url=video_url,
-                video_url=video_url,  
+                position=1,
                 filename=f"evidence_{record.id}_{random.randint(1000, 9999)}.mp4",
                 file_size=random.randint(5000000, 50000000),  
                 uploaded_at=record.created_at + timedelta(minutes=random.randint(10, 180))
@@ -591,9 +598,12 @@ def seed_database():
         users = create_users()
         admins = create_administrators()
         records = create_records(users, admins)
+        index_missing_records()
         media_items = create_media(records)
         votes = create_votes(records, users)
         histories = create_status_history(records, admins)
+        refresh_all_priorities()
+        refresh_summaries()
         notifications = create_notifications(records, users)
         
         # Print summary
@@ -610,10 +620,275 @@ def seed_database():
         db.session.rollback()
         raise
 
+# ------------------ Load-Test Scale Seeding ------------------
+
+SCALE_LOCATIONS = [
+    ("Nairobi CBD", -1.2921, 36.8219),
+    ("Mombasa", -4.0435, 39.6682),
+    ("Kisumu", -0.0917, 34.7680),
+    ("Nakuru", -0.3031, 36.0800),
+    ("Eldoret", 0.5143, 35.2698),
+    ("Machakos", -1.5177, 37.2634),
+    ("Meru", 0.0467, 37.6556),
+    ("Thika", -1.0332, 37.0692),
+    ("Kitale", 1.0157, 35.0062),
+    ("Malindi", -3.2194, 40.1169),
+]
+
+SCALE_FIRST_NAMES = ["Alice", "John", "Grace", "Peter", "Mary", "David", "Sarah", "Michael", "Faith", "James",
+                     "Esther", "Brian", "Joy", "Kevin", "Mercy", "Dennis", "Ruth", "Samuel", "Lucy", "Victor"]
+SCALE_LAST_NAMES = ["Wanjiku", "Mutua", "Achieng", "Kiprotich", "Njeri", "Otieno", "Wanjiru", "Kimani",
+                    "Muthoni", "Ochieng", "Kamau", "Mwangi", "Chebet", "Ndungu", "Karanja", "Omondi"]
+SCALE_TITLES = [
+    "Police officer demanding bribes at roadblock",
+    "County official soliciting kickbacks for permits",
+    "Hospital staff requesting payment for free services",
+    "Collapsed bridge blocking main road to market",
+    "Broken water pipes flooding residential area",
+    "Non-functional street lights causing accidents",
+    "Land office official demanding bribes for titles",
+    "Blocked drainage causing flooding during rains",
+]
+SCALE_IMAGES = [
+    "https://images.unsplash.com/photo-1590736969955-71cc94901144?w=800",
+    "https://images.unsplash.com/photo-1581833971358-2c8b550f87b3?w=800",
+    "https://images.unsplash.com/photo-1541888946425-d81bb19240f5?w=800",
+    "https://images.unsplash.com/photo-1562774053-701939374585?w=800",
+]
+SCALE_VIDEOS = [
+    "https://sample-videos.com/zip/10/mp4/SampleVideo_1280x720_1mb.mp4",
+    "https://sample-videos.com/zip/10/mp4/SampleVideo_1280x720_2mb.mp4",
+]
+SCALE_VOTE_COUNTS = [0, 1, 2, 3, 4, 5, 10, 15, 20]
+SCALE_VOTE_WEIGHTS = [10, 15, 20, 20, 15, 10, 5, 3, 2]
+
+def _next_id(model):
+    """Return the next free primary key for a model's table"""
+    return (db.session.query(db.func.max(model.id)).scalar() or 0) + 1
+
+def _bulk_insert(model, rows):
+    """Insert a list of row dicts with a single executemany statement"""
+    if rows:
+        db.session.execute(db.insert(model.__table__), rows)
+
+def _reset_sequences(models):
+    """Move PostgreSQL id sequences past explicitly inserted primary keys"""
+    if db.engine.dialect.name != 'postgresql':
+        return
+    for model in models:
+        table = model.__tablename__
+        db.session.execute(db.text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+            f"COALESCE((SELECT MAX(id) FROM {table}), 1))"
+        ))
+
+def create_users_at_scale(count, batch_size):
+    """Bulk-insert `count` users sharing one pre-hashed password, returning their ids"""
+    password_hash = generate_password_hash("password123")  # Hashed once for every user
+    first_id = _next_id(NormalUser)
+    now = datetime.utcnow()
+
+    for start in range(0, count, batch_size):
+        size = min(batch_size, count - start)
+        first_names = random.choices(SCALE_FIRST_NAMES, k=size)
+        last_names = random.choices(SCALE_LAST_NAMES, k=size)
+        ages = random.choices(range(1, 366), k=size)
+        phones = random.choices(range(700000000, 800000000), k=size)
+        rows = [
+            {
+                "id": first_id + start + i,
+                "name": f"{first_names[i]} {last_names[i]}",
+                "email": f"loadtest.user{first_id + start + i}@gmail.com",
+                "password": password_hash,
+                "phone_number": f"+254{phones[i]}",
+                "is_active": True,
+                "email_verified": i % 2 == 0,
+                "created_at": now - timedelta(days=ages[i]),
+            }
+            for i in range(size)
+        ]
+        _bulk_insert(NormalUser, rows)
+        db.session.commit()
+
+    return range(first_id, first_id + count)
+
+def create_records_at_scale(count, user_ids, admin_ids, batch_size):
+    """Bulk-insert records with their media, votes and status history in batches"""
+    record_id = _next_id(Record)
+    media_id = _next_id(Media)
+    vote_id = _next_id(Vote)
+    history_id = _next_id(StatusHistory)
+    now = datetime.utcnow()
+    totals = {"records": 0, "media": 0, "votes": 0, "status_history": 0}
+    user_count = len(user_ids)
+    first_user_id = user_ids[0]
+
+    for start in range(0, count, batch_size):
+        batch_started = datetime.utcnow()
+        size = min(batch_size, count - start)
+
+        # Draw every random column for the batch up front
+        statuses = random.choices(['draft', 'under-investigation', 'resolved', 'rejected'],
+                                  weights=[20, 40, 30, 10], k=size)
+        types = random.choices(['red-flag', 'intervention'], k=size)
+        urgencies = random.choices(['low', 'medium', 'high', 'critical'], weights=[15, 40, 35, 10], k=size)
+        locations = random.choices(SCALE_LOCATIONS, k=size)
+        titles = random.choices(SCALE_TITLES, k=size)
+        ages = random.choices(range(60, 90 * 24 * 60), k=size)  # Minutes ago, up to 90 days
+        owners = random.choices(range(user_count), k=size)
+        anonymous = [roll < 20 for roll in random.choices(range(100), k=size)]  # ~20% anonymous
+        vote_counts = random.choices(SCALE_VOTE_COUNTS, weights=SCALE_VOTE_WEIGHTS, k=size)
+        media_rolls = random.choices(range(100), k=size)
+
+        records, media, votes, histories = [], [], [], []
+        for i in range(size):
+            status = statuses[i]
+            created_at = now - timedelta(minutes=ages[i])
+            location_name, lat, lng = locations[i]
+            is_anonymous = anonymous[i]
+            num_votes = 0 if status == 'draft' else min(vote_counts[i], user_count)
+            assigned_admin_id = admin_ids[i % len(admin_ids)] if admin_ids and status != 'draft' else None
+
+            records.append({
+                "id": record_id,
+                "type": types[i],
+                "title": titles[i],
+                "description": f"{titles[i]} reported near {location_name}. Load-test record #{record_id}.",
+                "status": status,
+                "latitude": lat + (i % 200 - 100) * 0.0001,
+                "longitude": lng + (i % 170 - 85) * 0.0001,
+                "location_name": location_name,
+                "urgency_level": urgencies[i],
+                "is_anonymous": is_anonymous,
+                "vote_count": num_votes,
+                "triage_priority": triage_priority(urgencies[i], types[i], num_votes, created_at, status,
+                                                   assigned_admin_id),
+                "normal_user_id": None if is_anonymous else first_user_id + owners[i],
+                "assigned_admin_id": assigned_admin_id,
+                "created_at": created_at,
+                "updated_at": created_at + timedelta(hours=1),
+            })
+
+            # Media on ~60% of records: mostly images, some videos
+            roll = media_rolls[i]
+            if roll < 60:
+                is_video = roll < 12
+                url = SCALE_VIDEOS[i % len(SCALE_VIDEOS)] if is_video else SCALE_IMAGES[i % len(SCALE_IMAGES)]
+                media.append({
+                    "id": media_id,
+                    "record_id": record_id,
+                    "media_type": "video" if is_video else "image",
+                    "media_url": url,
+                    "position": 0,
+                    "filename": f"evidence_{record_id}.{'mp4' if is_video else 'jpg'}",
+                    "file_size": 5000000 if is_video else 800000,
+                    "uploaded_at": created_at + timedelta(minutes=10),
+                })
+                media_id += 1
+
+            # Votes from distinct users so the unique (record_id, user_id) constraint holds
+            if num_votes:
+                for user_offset in random.sample(range(user_count), num_votes):
+                    votes.append({
+                        "id": vote_id,
+                        "record_id": record_id,
+                        "user_id": first_user_id + user_offset,
+                        "vote_type": 'urgent' if user_offset % 3 == 0 else 'support',
+                        "created_at": created_at + timedelta(minutes=30),
+                    })
+                    vote_id += 1
+
+            # Status history mirrors the draft -> investigation -> final path
+            if status != 'draft':
+                transitions = [('draft', 'under-investigation')]
+                if status in ('resolved', 'rejected'):
+                    transitions.append(('under-investigation', status))
+                for step, (old_status, new_status) in enumerate(transitions, 1):
+                    histories.append({
+                        "id": history_id,
+                        "record_id": record_id,
+                        "old_status": old_status,
+                        "new_status": new_status,
+                        "changed_by": assigned_admin_id,
+                        "change_reason": "Load-test status change",
+                        "changed_at": created_at + timedelta(hours=step),
+                    })
+                    history_id += 1
+
+            record_id += 1
+
+        # Parents before children to keep foreign keys valid
+        _bulk_insert(Record, records)
+        index_records([(r["id"], r["title"], r["description"]) for r in records])
+        _bulk_insert(Media, media)
+        _bulk_insert(Vote, votes)
+        _bulk_insert(StatusHistory, histories)
+        db.session.commit()
+
+        totals["records"] += len(records)
+        totals["media"] += len(media)
+        totals["votes"] += len(votes)
+        totals["status_history"] += len(histories)
+        elapsed = (datetime.utcnow() - batch_started).total_seconds()
+        print(f"   ...{totals['records']}/{count} records ({elapsed:.2f}s for last batch)")
+
+    return totals
+
+def seed_at_scale(record_count, batch_size=10000, users_per_record=0.025):
+    """Generate a load-test sized dataset using batched bulk inserts
+
+    Unlike seed_database(), nothing is cleared and no ORM objects are built:
+    rows are generated in batches and written with executemany, and the shared
+    user password is hashed a single time.
+    """
+    print(f"🌱 Seeding {record_count} records at load-test scale (batch size {batch_size})...")
+    started = datetime.utcnow()
+
+    try:
+        admins = Administrator.query.all() or create_administrators()
+        admin_ids = [a.id for a in admins]
+
+        user_count = max(25, int(record_count * users_per_record))
+        print(f"👤 Creating {user_count} users...")
+        user_ids = create_users_at_scale(user_count, batch_size)
+
+        print(f"📋 Creating {record_count} records with media, votes and history...")
+        totals = create_records_at_scale(record_count, user_ids, admin_ids, batch_size)
+
+        _reset_sequences([NormalUser, Record, Media, Vote, StatusHistory])
+        db.session.commit()
+
+        print("🧾 Filling record summary columns...")
+        refresh_summaries()
+    except Exception as e:
+        print(f"❌ Error during scale seeding: {e}")
+        db.session.rollback()
+        raise
+
+    elapsed = (datetime.utcnow() - started).total_seconds()
+    print(f"✅ Created {user_count} users, {totals['records']} records, {totals['media']} media, "
+          f"{totals['votes']} votes and {totals['status_history']} status history entries in {elapsed:.1f}s")
+    return totals
+
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Seed the Jiseti database")
+    parser.add_argument("--scale", type=int, metavar="N",
+                        help="Append N records (plus users, media, votes and history) using bulk inserts")
+    parser.add_argument("--batch-size", type=int, default=10000,
+                        help="Rows generated and inserted per batch in --scale mode")
+    parser.add_argument("-y", "--yes", action="store_true", help="Skip the confirmation prompt")
+    args = parser.parse_args()
+
     app = create_app()
-    
+
     with app.app_context():
+        if args.scale:
+            db.create_all()
+            seed_at_scale(args.scale, batch_size=args.batch_size)
+            raise SystemExit(0)
+
         # Check if Faker is installed
         try:
             import faker
@@ -624,7 +899,7 @@ if __name__ == "__main__":
         
         # Confirm before seeding
         print("⚠️  This will clear all existing data and create new test data.")
-        confirm = input("Continue? (y/N): ").lower().strip()
+        confirm = 'y' if args.yes else input("Continue? (y/N): ").lower().strip()
         
         if confirm in ['y', 'yes']:
             seed_database()
@@ -1,15 +1,41 @@
 # tests/test_app.py
 import pytest
 import json
+import os
+import subprocess
+import sys
+import threading
+import io
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from datetime import datetime, timedelta
 from app import create_app
-from models import db, NormalUser, Administrator, Record
+from models import (db, NormalUser, Administrator, Record, Notification, StatusHistory, RecordChange, Media, MediaBlob,
+                    MediaVariant, Vote, ArchivedRecord)
+from utils.database import engine_options_for
+from utils.startup import summarize_importtime
+from utils.cors import CorsPolicy
+from utils.serving import worker_settings
+from utils.instrumentation import detect_n_plus_one, normalize_statement
+from utils.metrics import track_notification, NOTIFICATIONS_TOTAL
+from utils.emailer import submit_status_email, submit_sms_notification
+from utils.digest import flush_due_digests
+from utils.importer import iter_json_array
+from utils.changes import settled_head
+from utils.tracking import hash_tracking_token
+from utils.similarity import minhash, estimate_similarity
+from utils.triage import refresh_priority
+from utils.archive import archive_records
+from utils.summaries import refresh_summaries
+from utils.tracking import tracking_cache
+from utils.media import process_media
 
 @pytest.fixture
 def app():
     """Create test app"""
-    app = create_app()
-    app.config['TESTING'] = True
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:'
+    })
     
     with app.app_context():
         db.create_all()
@@ -178,6 +204,25 @@ class TestRecords:
         data = json.loads(response.data)
         assert data['record']['title'] == 'Updated Title'
     
+    def test_media_stored_one_asset_per_row(self, client, auth_headers):
+        """Test image and video become separate media rows that update independently"""
+        response = client.post('/records', headers=auth_headers, json={
+            'title': 'With evidence',
+            'image_url': 'https://example.com/scene.jpg',
+            'video_url': 'https://example.com/scene.mp4'
+        })
+        record = json.loads(response.data)['record']
+        assert [(m['media_type'], m['url']) for m in record['media']] == [
+            ('image', 'https://example.com/scene.jpg'), ('video', 'https://example.com/scene.mp4')]
+        assert record['video_url'] == 'https://example.com/scene.mp4'
+        
+        response = client.patch(f"/records/{record['id']}", headers=auth_headers, json={
+            'image_url': 'https://example.com/closer.jpg', 'video_url': None})
+        record = json.loads(response.data)['record']
+        assert [(m['media_type'], m['url']) for m in record['media']] == [('image', 'https://example.com/closer.jpg')]
+        assert record['image_url'] == 'https://example.com/closer.jpg'
+        assert record['video_url'] is None
+    
     def test_delete_record_success(self, client, auth_headers):
         """Test successful record deletion"""
         # Create a record first
@@ -337,5 +382,1018 @@ class TestValidation:
         assert response.status_code == 400
         data = json.loads(response.data)
         assert 'Invalid image URL' in data['error']
+    
+    def test_schema_errors_are_consistent(self, client, auth_headers):
+        """Test malformed bodies and wrong field types get a single 400 error"""
+        response = client.post('/records', headers=auth_headers, data='not json', content_type='application/json')
+        assert response.status_code == 400
+        assert json.loads(response.data) == {'error': 'Request body must be a JSON object'}
+        
+        response = client.post('/records/1/vote', headers=auth_headers, json={'vote_type': 'maybe'})
+        assert response.status_code == 400
+        assert json.loads(response.data)['error'] == 'Vote type must be "support" or "urgent"'
+    
+    def test_schema_converts_and_defaults(self):
+        """Test schemas convert numeric strings, apply defaults and keep partial updates partial"""
+        from utils.schemas import CREATE_RECORD, UPDATE_RECORD
+        
+        payload, error = CREATE_RECORD.validate({'title': 'Report', 'type': 'unknown', 'latitude': '-1.29', 'longitude': 36.8})
+        assert error is None
+        assert payload['type'] == 'red-flag'
+        assert payload['latitude'] == -1.29
+        assert payload['urgency_level'] == 'medium'
+        
+        assert UPDATE_RECORD.validate({'title': 'New title'}) == ({'title': 'New title'}, None)
+
+class TestInstrumentation:
+    """Test per-request SQL instrumentation"""
+    
+    def test_server_timing_header(self, client):
+        """Test responses carry query count and DB time"""
+        response = client.get('/public/records')
+        
+        assert response.status_code == 200
+        server_timing = response.headers.get('Server-Timing')
+        assert server_timing.startswith('db;dur=')
+        assert 'queries' in server_timing
+    
+    def test_n_plus_one_detection(self):
+        """Test repeated statement shapes are reported"""
+        statements = [f"SELECT * FROM media WHERE media.record_id = {i}" for i in range(6)]
+        statements.append("SELECT * FROM records LIMIT 10")
+        
+        suspects = detect_n_plus_one(statements, threshold=5)
+        
+        assert len(suspects) == 1
+        assert suspects[0]['count'] == 6
+        assert suspects[0]['statement'] == normalize_statement(statements[0])
+    
+    def test_debug_endpoint_admin_only(self, client, auth_headers, admin_headers):
+        """Test only admins can read query diagnostics"""
+        client.get('/public/records')
+        
+        response = client.get('/admin/debug/queries', headers=auth_headers)
+        assert response.status_code == 403
+        
+        response = client.get('/admin/debug/queries', headers=admin_headers)
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert any(r['path'] == '/public/records' for r in data['requests'])
+
+class TestObservability:
+    """Test metrics and health probe endpoints"""
+    
+    def test_liveness_and_readiness(self, client):
+        """Test liveness is dependency-free and readiness reports the database"""
+        assert client.get('/livez').status_code == 200
+        
+        response = client.get('/readyz')
+        assert response.status_code == 200
+        assert json.loads(response.data)['database'] == 'connected'
+        
+        response = client.get('/health')
+        assert response.status_code == 200
+        assert json.loads(response.data)['status'] == 'healthy'
+    
+    def test_metrics_endpoint(self, client):
+        """Test request metrics are exposed in Prometheus text format"""
+        client.get('/public/records')
+        
+        response = client.get('/metrics')
+        body = response.data.decode()
+        
+        assert response.status_code == 200
+        assert 'jiseti_http_request_duration_seconds_bucket{method="GET",route="/public/records"' in body
+        assert 'jiseti_http_requests_in_flight' in body
+        assert 'jiseti_db_pool_checkouts_total' in body
+    
+    def test_notification_tracking(self):
+        """Test notification senders are timed and counted by outcome"""
+        failed_before = NOTIFICATIONS_TOTAL.value(channel='test', outcome='failed')
+        
+        @track_notification('test')
+        def failing_sender():
+            return False
+        
+        failing_sender()
+        
+        assert NOTIFICATIONS_TOTAL.value(channel='test', outcome='failed') == failed_before + 1
+
+class TestDatabaseRouting:
+    """Test pool configuration and read-replica routing"""
+    
+    @pytest.fixture
+    def replica_app(self, tmp_path):
+        """App with a file-backed primary and one replica, each holding different data"""
+        app = create_app({
+            'TESTING': True,
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'primary.db'}",
+            'SQLALCHEMY_REPLICA_URIS': [f"sqlite:///{tmp_path / 'replica.db'}"]
+        })
+        
+        with app.app_context():
+            db.create_all()
+            replica = app.extensions['jiseti_replicas'].engines['replica_0']
+            db.metadata.create_all(replica)
+            with replica.begin() as conn:
+                conn.execute(Record.__table__.insert().values(
+                    type='red-flag', title='Replica Only', description='Served from replica',
+                    status='resolved', created_at=datetime.utcnow(), updated_at=datetime.utcnow()))
+            yield app
+            db.drop_all()
+    
+    def test_pool_options_by_backend(self, monkeypatch):
+        """Test queue sizing applies to server databases but not SQLite"""
+        monkeypatch.setenv('DB_POOL_SIZE', '25')
+        
+        assert engine_options_for('postgresql://u:p@db/jiseti', 'production')['pool_size'] == 25
+        assert 'pool_size' not in engine_options_for('sqlite:///jiseti.db', 'production')
+    
+    def test_read_only_endpoint_uses_replica(self, replica_app):
+        """Test public listings are served from the replica"""
+        client = replica_app.test_client()
+        
+        data = json.loads(client.get('/public/records').data)
+        
+        assert [r['title'] for r in data['records']] == ['Replica Only']
+    
+    def test_lagging_replica_falls_back_to_primary(self, replica_app):
+        """Test a replica beyond the lag budget is skipped"""
+        replica_app.extensions['jiseti_replicas'].record_lag('replica_0', 3600)
+        client = replica_app.test_client()
+        
+        data = json.loads(client.get('/public/records').data)
+        
+        assert data['records'] == []
+    
+    def test_read_your_writes_sticks_to_primary(self, replica_app):
+        """Test a client that just wrote reads from the primary"""
+        client = replica_app.test_client()
+        
+        response = client.post('/public/report', json={
+            'title': 'Fresh Report', 'description': 'Just written', 'type': 'incident'})
+        assert response.status_code == 201
+        
+        data = json.loads(client.get('/public/records').data)
+        
+        assert [r['title'] for r in data['records']] == ['Fresh Report']
+
+class TestStartup:
+    """Test start-up cost controls"""
+    
+    def test_import_does_not_load_provider_sdks(self):
+        """Test importing the app builds nothing and skips SendGrid, Twilio and alembic"""
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        check = (
+            "import sys, app; "
+            "assert app._app is None; "
+            "loaded = [m for m in ('sendgrid', 'twilio', 'alembic') if m in sys.modules]; "
+            "assert not loaded, loaded"
+        )
+        
+        result = subprocess.run([sys.executable, '-c', check], cwd=root, capture_output=True, text=True)
+        
+        assert result.returncode == 0, result.stderr
+    
+    def test_summarize_importtime(self):
+        """Test importtime output is summarized by cumulative and self time"""
+        output = "\n".join([
+            "import time: self [us] | cumulative | imported package",
+            "import time:       100 |        100 |   json.decoder",
+            "import time:       400 |        500 | json",
+            "import time:      2000 |       2000 | models",
+        ])
+        
+        summary = summarize_importtime(output, top=2)
+        
+        assert summary['total_ms'] == 2.5
+        assert [e['module'] for e in summary['top_level']] == ['models', 'json']
+        assert summary['self'][0]['module'] == 'models'
+    
+    def test_worker_settings_fit_connection_budget(self, monkeypatch):
+        """Test worker count is capped so all pools fit the database's connections"""
+        monkeypatch.delenv('WEB_CONCURRENCY', raising=False)
+        monkeypatch.delenv('GUNICORN_THREADS', raising=False)
+        monkeypatch.setenv('DB_POOL_SIZE', '10')
+        monkeypatch.setenv('DB_MAX_OVERFLOW', '10')
+        
+        assert worker_settings(cpu_count=2, max_db_connections=1000)['workers'] == 5
+        
+        settings = worker_settings(cpu_count=16, max_db_connections=100)
+        assert settings['workers'] == 5
+        assert settings['threads'] == 10
+        assert settings['max_connections'] <= 100
+    
+    def test_init_db_command(self, app):
+        """Test the one-shot init command creates the default admin once"""
+        runner = app.test_cli_runner()
+        
+        result = runner.invoke(args=['init-db', '--admin-email', 'ops@jiseti.go.ke'])
+        assert result.exit_code == 0, result.output
+        assert Administrator.query.filter_by(email='ops@jiseti.go.ke').count() == 1
+        
+        result = runner.invoke(args=['init-db'])
+        assert 'already exists' in result.output
+        assert Administrator.query.count() == 1
+
+class TestCors:
+    """Test CORS origin matching and preflight handling"""
+    
+    def test_origin_matching(self):
+        """Test exact origins and wildcard subdomains are matched"""
+        policy = CorsPolicy(['https://jiseti.go.ke', 'https://*.jiseti.go.ke'])
+        
+        assert policy.allows('https://jiseti.go.ke')
+        assert policy.allows('https://admin.jiseti.go.ke')
+        assert not policy.allows('https://jiseti.go.ke.evil.com')
+        assert not policy.allows('http://admin.jiseti.go.ke')
+        assert not policy.allows(None)
+    
+    def test_preflight_short_circuits(self, client):
+        """Test preflights are answered without authentication and cached for a day"""
+        response = client.options('/admin/stats', headers={
+            'Origin': 'http://localhost:5173',
+            'Access-Control-Request-Method': 'GET',
+            'Access-Control-Request-Headers': 'Authorization'
+        })
+        
+        assert response.status_code == 204
+        assert response.headers['Access-Control-Allow-Origin'] == 'http://localhost:5173'
+        assert response.headers['Access-Control-Max-Age'] == '86400'
+        assert 'Authorization' in response.headers['Access-Control-Allow-Headers']
+    
+    def test_response_headers(self, client):
+        """Test allowed origins get CORS headers and others do not"""
+        response = client.get('/public/records', headers={'Origin': 'https://jiseti.go.ke'})
+        assert response.headers['Access-Control-Allow-Origin'] == 'https://jiseti.go.ke'
+        assert response.headers['Access-Control-Allow-Credentials'] == 'true'
+        assert response.headers['X-Content-Type-Options'] == 'nosniff'
+        
+        response = client.get('/public/records', headers={'Origin': 'https://evil.example'})
+        assert 'Access-Control-Allow-Origin' not in response.headers
+
+class TestAsyncNotifications:
+    """Test async SendGrid/Twilio sends against a local fake provider"""
+    
+    @pytest.fixture
+    def provider(self, monkeypatch):
+        """Fake provider HTTP server recording each request"""
+        received = []
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers['Content-Length'])).decode()
+                received.append({'path': self.path, 'auth': self.headers['Authorization'], 'body': body})
+                status, reply = (202, b'') if self.path == '/v3/mail/send' else (201, b'{"sid": "SM123"}')
+                self.send_response(status)
+                self.send_header('Content-Length', str(len(reply)))
+                self.end_headers()
+                self.wfile.write(reply)
+            
+            def log_message(self, *args):
+                pass
+        
+        server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f'http://127.0.0.1:{server.server_port}'
+        
+        monkeypatch.setenv('SENDGRID_API_KEY', 'test-key')
+        monkeypatch.setenv('SENDGRID_API_URL', f'{base_url}/v3/mail/send')
+        monkeypatch.setenv('TWILIO_ACCOUNT_SID', 'AC123')
+        monkeypatch.setenv('TWILIO_AUTH_TOKEN', 'secret')
+        monkeypatch.setenv('TWILIO_PHONE_NUMBER', '+15550000000')
+        monkeypatch.setenv('TWILIO_API_URL', base_url)
+        
+        yield received
+        server.shutdown()
+    
+    def test_concurrent_emails(self, provider):
+        """Test many emails can be in flight from sync code at once"""
+        futures = [submit_status_email(f'user{i}@gmail.com', 'Status Update', 'Resolved') for i in range(50)]
+        
+        assert all(f.result(timeout=10) for f in futures)
+        assert len(provider) == 50
+        assert provider[0]['auth'] == 'Bearer test-key'
+    
+    def test_sms_waits_for_result(self, provider):
+        """Test the sync adapter can wait for the send result"""
+        assert submit_sms_notification('0712345678', 'Jiseti Update', wait=True, timeout=10) is True
+        
+        assert provider[0]['path'] == '/2010-04-01/Accounts/AC123/Messages.json'
+        assert 'To=%2B254712345678' in provider[0]['body']
+
+class TestStatusDigests:
+    """Test status-change notifications are coalesced into digests"""
+    
+    @pytest.fixture
+    def sent_emails(self, monkeypatch):
+        """Capture digest emails instead of sending them"""
+        sent = []
+        monkeypatch.setattr('utils.digest.submit_status_email', lambda to, subject, body: sent.append((to, subject, body)))
+        return sent
+    
+    def create_record(self, client, auth_headers, title):
+        response = client.post('/records', headers=auth_headers, json={
+            'title': title, 'description': 'Digest test record', 'type': 'red-flag'})
+        return json.loads(response.data)['record']['id']
+    
+    def test_transitions_are_coalesced(self, app, client, auth_headers, admin_headers, sent_emails):
+        """Test several transitions across records produce one digest after the window"""
+        first = self.create_record(client, auth_headers, 'First Report')
+        second = self.create_record(client, auth_headers, 'Second Report')
+        
+        client.patch(f'/records/{first}/status', headers=admin_headers, json={'status': 'under-investigation'})
+        client.patch(f'/records/{first}/status', headers=admin_headers, json={'status': 'resolved'})
+        client.patch(f'/records/{second}/status', headers=admin_headers, json={'status': 'rejected'})
+        
+        assert sent_emails == []
+        assert flush_due_digests() == 0
+        
+        later = datetime.utcnow() + timedelta(seconds=app.config['DIGEST_WINDOW_SECONDS'] + 1)
+        assert flush_due_digests(now=later) == 1
+        
+        to, subject, body = sent_emails[0]
+        assert subject == 'Status Update: 2 of your reports'
+        assert 'UNDER-INVESTIGATION ➝ RESOLVED' in body
+        assert Notification.query.filter_by(delivery_status='pending').count() == 0
+    
+    def test_urgent_transition_bypasses_window(self, client, auth_headers, admin_headers, sent_emails):
+        """Test an urgent change sends immediately, including earlier pending changes"""
+        record_id = self.create_record(client, auth_headers, 'Urgent Report')
+        
+        client.patch(f'/records/{record_id}/status', headers=admin_headers, json={'status': 'under-investigation'})
+        client.patch(f'/records/{record_id}/status', headers=admin_headers, json={'status': 'resolved', 'urgent': True})
+        
+        assert len(sent_emails) == 1
+        assert sent_emails[0][1] == 'Status Update: Urgent Report'
+
+class TestBulkStatusUpdate:
+    """Test bulk admin status updates"""
+    
+    def create_records(self, client, auth_headers, count):
+        ids = []
+        for i in range(count):
+            response = client.post('/records', headers=auth_headers, json={
+                'title': f'Bulk Record {i}', 'description': 'Bulk status test', 'type': 'red-flag'})
+            ids.append(json.loads(response.data)['record']['id'])
+        return ids
+    
+    def test_update_by_ids(self, client, auth_headers, admin_headers):
+        """Test listed records are updated with history and per-record results"""
+        ids = self.create_records(client, auth_headers, 3)
+        client.patch(f'/records/{ids[0]}/status', headers=admin_headers, json={'status': 'resolved'})
+        
+        response = client.patch('/admin/records/status', headers=admin_headers, json={
+            'ids': ids + [99999], 'status': 'resolved', 'reason': 'Batch triage'})
+        
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data['updated'] == 2
+        assert [r['result'] for r in data['results']] == ['unchanged', 'updated', 'updated', 'not_found']
+        assert Record.query.filter_by(status='resolved').count() == 3
+        assert StatusHistory.query.filter_by(change_reason='Batch triage').count() == 2
+        assert Notification.query.filter_by(delivery_status='pending').count() == 3
+        assert all(r.assigned_admin_id for r in Record.query.all())
+    
+    def test_update_by_filter(self, client, auth_headers, admin_headers):
+        """Test a filter selects the records to update"""
+        self.create_records(client, auth_headers, 2)
+        
+        response = client.patch('/admin/records/status', headers=admin_headers, json={
+            'filter': {'status': 'draft'}, 'status': 'under-investigation'})
+        
+        assert json.loads(response.data)['updated'] == 2
+        assert Record.query.filter_by(status='draft').count() == 0
+    
+    def test_requires_admin_and_target(self, client, auth_headers, admin_headers):
+        """Test non-admins are rejected and a target is required"""
+        response = client.patch('/admin/records/status', headers=auth_headers, json={
+            'ids': [1], 'status': 'resolved'})
+        assert response.status_code == 403
+        
+        response = client.patch('/admin/records/status', headers=admin_headers, json={'status': 'resolved'})
+        assert response.status_code == 400
+
+class TestBulkImport:
+    """Test streamed bulk record import"""
+    
+    def test_json_array_parsed_across_chunks(self, monkeypatch):
+        """Test array elements split across read boundaries are parsed"""
+        monkeypatch.setattr('utils.importer.READ_SIZE', 7)
+        body = json.dumps([{'title': 'A "quoted" title'}, 12345, [1, 2], {'title': 'Kisumu'}]).encode()
+        
+        assert list(iter_json_array(io.BytesIO(body))) == [{'title': 'A "quoted" title'}, 12345, [1, 2], {'title': 'Kisumu'}]
+    
+    def test_import_json_with_row_errors(self, client, auth_headers):
+        """Test valid rows are imported and invalid rows reported by number"""
+        rows = [
+            {'title': 'Imported One', 'description': 'Offline report', 'type': 'incident'},
+            {'description': 'Missing title'},
+            {'title': 'Imported Two', 'latitude': 100, 'longitude': 36.8},
+            {'title': 'Imported Three', 'image_url': 'https://example.com/evidence.jpg'}
+        ]
+        
+        response = client.post('/records/import', headers=auth_headers, json=rows)
+        
+        assert response.status_code == 201
+        data = json.loads(response.data)
+        assert data['imported'] == 2
+        assert [e['row'] for e in data['errors']] == [2, 3]
+        record = Record.query.filter_by(title='Imported Three').first()
+        assert record.status == 'draft'
+        assert record.media[0].media_url == 'https://example.com/evidence.jpg'
+
+    def test_import_rejects_invalid_location_name(self, client, auth_headers):
+        """Test bad location names are row errors rather than failing the chunk"""
+        rows = [
+            {'title': 'Located', 'location_name': 'Nairobi CBD'},
+            {'title': 'Numeric Location', 'location_name': 42},
+            {'title': 'Long Location', 'location_name': 'x' * 256}
+        ]
+
+        response = client.post('/records/import', headers=auth_headers, json=rows)
+
+        assert response.status_code == 201
+        data = json.loads(response.data)
+        assert data['imported'] == 1
+        assert [e['row'] for e in data['errors']] == [2, 3]
+        assert Record.query.filter_by(title='Located').first().location_name == 'Nairobi CBD'
+
+    def test_import_ndjson_in_chunks(self, app, client, auth_headers):
+        """Test NDJSON bodies are inserted in chunks"""
+        app.config['IMPORT_CHUNK_SIZE'] = 3
+        body = '\n'.join(json.dumps({'title': f'NDJSON {i}'}) for i in range(10)) + '\nnot json\n'
+        
+        response = client.post('/records/import', headers={**auth_headers, 'Content-Type': 'application/x-ndjson'},
+                               data=body)
+        
+        data = json.loads(response.data)
+        assert data['imported'] == 10
+        assert data['errors'][0]['row'] == 11
+        assert Record.query.filter(Record.title.like('NDJSON %')).count() == 10
+    
+    def test_import_csv_upload(self, client, auth_headers):
+        """Test CSV file uploads are imported"""
+        csv_body = b"title,description,type,latitude,longitude\nCSV Report,From a partner,red-flag,-1.29,36.82\n"
+        
+        response = client.post('/records/import', headers=auth_headers, content_type='multipart/form-data',
+                               data={'file': (io.BytesIO(csv_body), 'reports.csv')})
+        
+        assert response.status_code == 201
+        assert Record.query.filter_by(title='CSV Report').first().latitude == -1.29
 
 # Run tests with: python -m pytest tests/ -v
+
+class TestChangeFeed:
+    """Test the record change feed and its event stream"""
+    
+    def other_user_headers(self, client):
+        response = client.post('/auth/signup', json={'name': 'Other User', 'email': 'other@gmail.com', 'password': 'password123'})
+        return {'Authorization': f"Bearer {json.loads(response.data)['access_token']}"}
+    
+    def test_incremental_sync(self, client, auth_headers, admin_headers):
+        """Test creates, votes and status changes appear in order and sync from the cursor"""
+        head = json.loads(client.get('/changes', headers=auth_headers).data)['next_since']
+        record_id = json.loads(client.post('/records', headers=auth_headers, json={
+            'title': 'Feed Record', 'description': 'Change feed test'}).data)['record']['id']
+        client.post(f'/records/{record_id}/vote', headers=auth_headers, json={})
+        client.patch(f'/records/{record_id}/status', headers=admin_headers, json={'status': 'resolved'})
+        
+        data = json.loads(client.get(f'/changes?since={head}', headers=auth_headers).data)
+        assert [(c['change_type'], c['status'], c['vote_count']) for c in data['changes']] == [
+            ('created', 'draft', 0), ('vote', 'draft', 1), ('status', 'resolved', 1)]
+        assert data['next_since'] == data['changes'][-1]['seq']
+        
+        data = json.loads(client.get(f"/changes?since={data['next_since']}", headers=auth_headers).data)
+        assert data['changes'] == [] and not data['has_more']
+    
+    def test_changes_are_scoped_to_owner(self, client, auth_headers, admin_headers):
+        """Test users only see their own records while admins see everything"""
+        client.post('/records', headers=auth_headers, json={'title': 'Mine'})
+        client.post('/public/report', json={'title': 'Anonymous', 'description': 'Tip', 'type': 'incident'})
+        
+        assert json.loads(client.get('/changes?since=0', headers=self.other_user_headers(client)).data)['changes'] == []
+        assert len(json.loads(client.get('/changes?since=0', headers=auth_headers).data)['changes']) == 1
+        assert len(json.loads(client.get('/changes?since=0', headers=admin_headers).data)['changes']) == 2
+        assert client.get('/changes?since=abc', headers=auth_headers).status_code == 400
+    
+    def test_bulk_writes_and_paging(self, client, auth_headers, admin_headers):
+        """Test bulk updates are recorded and pages follow has_more"""
+        ids = [json.loads(client.post('/records', headers=auth_headers, json={'title': f'Page {i}'}).data)['record']['id']
+               for i in range(3)]
+        client.patch('/admin/records/status', headers=admin_headers, json={'ids': ids, 'status': 'rejected'})
+        
+        seen, since = [], 0
+        while True:
+            data = json.loads(client.get(f'/changes?since={since}&limit=2', headers=auth_headers).data)
+            seen += data['changes']
+            since = data['next_since']
+            if not data['has_more']:
+                break
+        assert [c['change_type'] for c in seen] == ['created'] * 3 + ['status'] * 3
+    
+    def test_unsettled_gap_caps_head(self, app):
+        """Test a recent sequence gap holds the head back until it settles"""
+        now = datetime.utcnow()
+        for seq in (1, 2, 4):
+            db.session.add(RecordChange(id=seq, record_id=1, change_type='updated', changed_at=now))
+        db.session.commit()
+        
+        assert settled_head(10, now=now) == 2
+        assert settled_head(10, now=now + timedelta(seconds=30)) == 4
+    
+    def test_stream_resumes_from_last_event_id(self, app, client, auth_headers):
+        """Test the event stream replays changes after Last-Event-ID and then closes"""
+        app.config['CHANGES_STREAM_MAX_SECONDS'] = 0
+        client.post('/records', headers=auth_headers, json={'title': 'First'})
+        client.post('/records', headers=auth_headers, json={'title': 'Second'})
+        
+        response = client.get('/changes/stream', headers={**auth_headers, 'Last-Event-ID': '1'})
+        body = response.get_data(as_text=True)
+        
+        assert response.mimetype == 'text/event-stream'
+        assert body.count('event: change') == 1
+        assert 'id: 2\n' in body
+    
+    def test_stream_limit(self, app, client, auth_headers):
+        """Test streams beyond the per-process limit are turned away"""
+        streams = app.extensions['jiseti_change_streams']
+        for _ in range(app.config['CHANGES_MAX_STREAMS']):
+            streams.acquire()
+        
+        response = client.get('/changes/stream', headers=auth_headers)
+        assert response.status_code == 503
+        assert 'Retry-After' in response.headers
+
+class TestAnonymousTracking:
+    """Test tracking anonymous reports by token"""
+    
+    def submit_report(self, client):
+        response = client.post('/public/report', json={
+            'title': 'Tracked Report', 'description': 'Submitted anonymously', 'type': 'incident'})
+        data = json.loads(response.data)
+        return data['tracking_token'], data['record_id']
+    
+    def test_token_is_stored_hashed(self, client):
+        """Test only the token's hash is persisted"""
+        token, record_id = self.submit_report(client)
+        
+        record = db.session.get(Record, record_id)
+        assert record.tracking_token_hash == hash_tracking_token(token)
+        assert token not in record.tracking_token_hash
+    
+    def test_track_report_with_history(self, client, admin_headers):
+        """Test the token resolves to a status projection with history"""
+        token, record_id = self.submit_report(client)
+        client.patch(f'/records/{record_id}/status', headers=admin_headers, json={
+            'status': 'resolved', 'reason': 'Officer suspended', 'resolution_notes': 'Case closed'})
+        
+        response = client.get(f'/public/track/{token.lower()}')
+        
+        assert response.status_code == 200
+        assert 'max-age' in response.headers['Cache-Control']
+        report = json.loads(response.data)['report']
+        assert report['status'] == 'resolved'
+        assert report['resolution_notes'] == 'Case closed'
+        assert [h['new_status'] for h in report['history']] == ['resolved']
+        assert 'changed_by' not in report['history'][0]
+        assert client.get('/public/track/ANON-NOTAREALTOKEN').status_code == 404
+    
+    def test_projection_is_cached_until_status_changes(self, client, admin_headers):
+        """Test repeated lookups are served from cache and a status change refreshes it"""
+        token, record_id = self.submit_report(client)
+        client.get(f'/public/track/{token}')
+        db.session.get(Record, record_id).title = 'Edited directly'
+        db.session.commit()
+        
+        assert json.loads(client.get(f'/public/track/{token}').data)['report']['title'] == 'Tracked Report'
+        
+        client.patch(f'/records/{record_id}/status', headers=admin_headers, json={'status': 'rejected'})
+        report = json.loads(client.get(f'/public/track/{token}').data)['report']
+        assert report['status'] == 'rejected'
+        assert report['title'] == 'Edited directly'
+
+class TestMediaUploads:
+    """Test presigned direct uploads against the local storage stand-in"""
+    
+    @pytest.fixture(autouse=True)
+    def storage_root(self, app, tmp_path):
+        app.extensions['jiseti_storage'].root = str(tmp_path)
+        return tmp_path
+    
+    def create_record(self, client, auth_headers):
+        response = client.post('/records', headers=auth_headers, json={'title': 'Evidence Record'})
+        return json.loads(response.data)['record']['id']
+    
+    def request_upload(self, client, auth_headers, record_id, **overrides):
+        body = {'filename': 'road block.jpg', 'content_type': 'image/jpeg', 'size': 11, **overrides}
+        return client.post(f'/records/{record_id}/uploads', headers=auth_headers, json=body)
+    
+    def test_upload_and_complete(self, client, auth_headers, storage_root):
+        """Test a file uploaded to the presigned URL is registered as media"""
+        record_id = self.create_record(client, auth_headers)
+        grant = json.loads(self.request_upload(client, auth_headers, record_id).data)
+        upload = grant['upload']
+        
+        response = client.put(upload['url'], data=b'jpeg-bytes!', headers=upload['headers'])
+        assert response.status_code == 201
+        
+        response = client.post(f'/records/{record_id}/uploads/complete', headers=auth_headers,
+                               json={'upload_id': grant['upload_id']})
+        assert response.status_code == 201
+        media = json.loads(response.data)['media']
+        assert media['file_size'] == 11
+        assert media['filename'] == 'road_block.jpg'
+        assert media['media_type'] == 'image' and media['media_url'].endswith('.jpg')
+        assert client.get(media['media_url']).data == b'jpeg-bytes!'
+        
+        # Retried completion is idempotent
+        response = client.post(f'/records/{record_id}/uploads/complete', headers=auth_headers,
+                               json={'upload_id': grant['upload_id']})
+        assert response.status_code == 200
+        assert len(db.session.get(Record, record_id).media) == 1
+    
+    def test_size_limits(self, app, client, auth_headers, storage_root):
+        """Test declared and actual sizes are held to the per-type limit"""
+        app.config['UPLOAD_MAX_IMAGE_BYTES'] = 8
+        record_id = self.create_record(client, auth_headers)
+        assert self.request_upload(client, auth_headers, record_id).status_code == 413
+        
+        upload = json.loads(self.request_upload(client, auth_headers, record_id, size=4).data)['upload']
+        response = client.put(upload['url'], data=b'way more than eight bytes', headers=upload['headers'])
+        assert response.status_code == 413
+        assert not any(path.is_file() for path in storage_root.rglob('*'))
+    
+    def test_rejects_tampering_and_early_completion(self, client, auth_headers):
+        """Test forged URLs, foreign upload ids and missing files are refused"""
+        record_id = self.create_record(client, auth_headers)
+        grant = json.loads(self.request_upload(client, auth_headers, record_id).data)
+        
+        forged = grant['upload']['url'].replace('max_bytes=', 'max_bytes=9')
+        assert client.put(forged, data=b'x', headers=grant['upload']['headers']).status_code == 403
+        
+        response = client.post(f'/records/{record_id}/uploads/complete', headers=auth_headers,
+                               json={'upload_id': grant['upload_id']})
+        assert response.status_code == 409
+        
+        other = client.post('/auth/signup', json={'name': 'Other', 'email': 'other@gmail.com', 'password': 'password123'})
+        other_headers = {'Authorization': f"Bearer {json.loads(other.data)['access_token']}"}
+        response = client.post(f'/records/{record_id}/uploads/complete', headers=other_headers,
+                               json={'upload_id': grant['upload_id']})
+        assert response.status_code == 400
+        assert self.request_upload(client, auth_headers, record_id, content_type='application/pdf').status_code == 400
+
+    def test_completion_requires_draft_record(self, client, auth_headers):
+        """Test an upload_id cannot attach media once the record has left draft"""
+        record_id = self.create_record(client, auth_headers)
+        grant = json.loads(self.request_upload(client, auth_headers, record_id).data)
+        client.put(grant['upload']['url'], data=b'jpeg-bytes!', headers=grant['upload']['headers'])
+        db.session.get(Record, record_id).status = 'under-investigation'
+        db.session.commit()
+
+        response = client.post(f'/records/{record_id}/uploads/complete', headers=auth_headers,
+                               json={'upload_id': grant['upload_id']})
+        assert response.status_code == 400
+        assert db.session.get(Record, record_id).media == []
+
+class TestMediaProcessing:
+    """Test the media pipeline and variant selection in listings"""
+    
+    @pytest.fixture(autouse=True)
+    def storage_root(self, app, tmp_path):
+        app.extensions['jiseti_storage'].root = str(tmp_path)
+        app.config['MEDIA_PROCESSING'] = 'inline'
+        return tmp_path
+    
+    def upload(self, client, auth_headers, data, filename, content_type):
+        record_id = json.loads(client.post('/records', headers=auth_headers, json={'title': 'Processed'}).data)['record']['id']
+        grant = json.loads(client.post(f'/records/{record_id}/uploads', headers=auth_headers, json={
+            'filename': filename, 'content_type': content_type, 'size': len(data)}).data)
+        client.put(grant['upload']['url'], data=data, headers=grant['upload']['headers'])
+        response = client.post(f'/records/{record_id}/uploads/complete', headers=auth_headers,
+                               json={'upload_id': grant['upload_id']})
+        return record_id, json.loads(response.data)['media']['id']
+    
+    def test_listing_serves_smallest_suitable_variant(self, client, auth_headers, admin_headers):
+        """Test listings swap the original for a variant while the detail view keeps it"""
+        response = client.post('/records', headers=auth_headers, json={
+            'title': 'Listed', 'image_url': 'https://cdn.example.com/original.jpg'})
+        record = db.session.get(Record, json.loads(response.data)['record']['id'])
+        blob = MediaBlob(content_hash='0' * 64, media_type='image', storage_key='original.jpg',
+                         url='https://cdn.example.com/original.jpg', processing_status='ready')
+        for name, width in (('thumb', 160), ('small', 480), ('large', 1600)):
+            blob.variants.append(MediaVariant(name=name, url=f'https://cdn.example.com/{name}.webp',
+                                              storage_key=f'{name}.webp', content_type='image/webp', width=width,
+                                              height=width, file_size=100))
+        record.media[0].blob = blob
+        db.session.flush()
+        # What the pipeline does once the blob is processed
+        refresh_summaries([record.id], columns=('thumbnail_url',))
+        db.session.commit()
+        client.patch(f'/records/{record.id}/status', headers=admin_headers, json={'status': 'under-investigation'})
+        
+        listed = json.loads(client.get('/public/records').data)['records'][0]
+        assert listed['image_url'] == 'https://cdn.example.com/small.webp'
+        assert listed['thumbnail_url'] == 'https://cdn.example.com/thumb.webp'
+        listed = json.loads(client.get('/public/records?image_width=1000').data)['records'][0]
+        assert listed['image_url'] == 'https://cdn.example.com/large.webp'
+        detail = json.loads(client.get(f'/public/records/{record.id}').data)['record']
+        assert detail['image_url'] == 'https://cdn.example.com/original.jpg'
+    
+    def test_video_skipped_without_ffmpeg(self, app, client, auth_headers):
+        """Test videos are left unprocessed rather than failing when ffmpeg is missing"""
+        app.config['MEDIA_FFMPEG'] = 'jiseti-missing-ffmpeg'
+        _, media_id = self.upload(client, auth_headers, b'not really a video', 'clip.mp4', 'video/mp4')
+        
+        assert db.session.get(Media, media_id).processing_status == 'skipped'
+    
+    def test_duplicate_uploads_share_one_blob(self, app, client, auth_headers, storage_root):
+        """Test identical uploads are stored and processed once"""
+        app.config['MEDIA_FFMPEG'] = 'jiseti-missing-ffmpeg'
+        _, first_id = self.upload(client, auth_headers, b'same evidence clip', 'clip.mp4', 'video/mp4')
+        _, second_id = self.upload(client, auth_headers, b'same evidence clip', 'copy.mp4', 'video/mp4')
+        
+        first, second = db.session.get(Media, first_id), db.session.get(Media, second_id)
+        assert MediaBlob.query.count() == 1
+        assert second.blob_id == first.blob_id
+        assert second.media_url == first.media_url
+        assert second.processing_status == 'skipped'
+        assert (storage_root / first.storage_key).is_file()
+        assert not (storage_root / second.storage_key).exists()
+    
+    def test_image_variants_and_exif_stripping(self, client, auth_headers, storage_root):
+        """Test uploaded images get variants, dimensions and lose their GPS metadata"""
+        Image = pytest.importorskip('PIL.Image')
+        exif = Image.Exif()
+        exif[0x8825] = {1: 'S', 2: (1.0, 17.0, 30.0)}  # GPSInfo
+        original = io.BytesIO()
+        Image.new('RGB', (1200, 800), 'red').save(original, 'JPEG', exif=exif)
+        
+        record_id, media_id = self.upload(client, auth_headers, original.getvalue(), 'scene.jpg', 'image/jpeg')
+        
+        media = db.session.get(Media, media_id)
+        assert media.processing_status == 'ready'
+        assert (media.width, media.height) == (1200, 800)
+        assert [v.name for v in media.variants] == ['thumb', 'small', 'medium']
+        assert media.variants[0].width == 160
+        with Image.open(storage_root / media.storage_key) as stored:
+            assert not stored.getexif().get_ifd(0x8825)
+        assert client.get(media.variants[0].url).status_code == 200
+    
+    def test_stale_processing_claims_are_retaken(self, app, client, auth_headers):
+        """Test rows left processing by a dead worker are reclaimed once the claim times out"""
+        app.config['MEDIA_PROCESSING'] = 'off'
+        app.config['MEDIA_FFMPEG'] = 'jiseti-missing-ffmpeg'
+        _, media_id = self.upload(client, auth_headers, b'abandoned clip', 'clip.mp4', 'video/mp4')
+        media = db.session.get(Media, media_id)
+        media.processing_status, media.claimed_at = 'processing', datetime.utcnow()
+        db.session.commit()
+        
+        assert process_media(media_id) is None
+        
+        media.claimed_at = datetime.utcnow() - timedelta(seconds=app.config['MEDIA_CLAIM_TIMEOUT_SECONDS'] + 1)
+        db.session.commit()
+        
+        assert process_media(media_id) == 'skipped'
+
+class TestDuplicateDetection:
+    """Test MinHash/LSH duplicate report detection"""
+    
+    REPORT = {
+        'title': 'Police officer demanding bribes at Kenol roadblock',
+        'description': 'An officer at the Kenol roadblock stops matatus and demands 200 shillings from every driver',
+        'type': 'red-flag',
+        'latitude': -0.9020,
+        'longitude': 37.1282
+    }
+    
+    def test_signature_estimates_similarity(self):
+        """Test signatures rank reworded reports above unrelated ones"""
+        report = minhash(self.REPORT['title'], self.REPORT['description'])
+        reworded = minhash(self.REPORT['title'], self.REPORT['description'] + ' this morning')
+        unrelated = minhash('Burst water pipe flooding Moi Avenue', 'Water has been running for two days')
+        assert estimate_similarity(report, report) == 1.0
+        assert estimate_similarity(report, reworded) >= 0.7
+        assert estimate_similarity(report, unrelated) < 0.2
+    
+    def test_creation_returns_nearby_public_duplicates(self, client, auth_headers):
+        """Test new reports list earlier public copies nearby, but not distant or private ones"""
+        earlier = json.loads(client.post('/public/report', json=self.REPORT).data)['record_id']
+        client.post('/public/report', json={**self.REPORT, 'latitude': 0.5143, 'longitude': 35.2698})  # Eldoret
+        other = client.post('/auth/signup', json={'name': 'Other', 'email': 'other@gmail.com', 'password': 'password123'})
+        other_headers = {'Authorization': f"Bearer {json.loads(other.data)['access_token']}"}
+        client.post('/records', headers=other_headers, json=self.REPORT)  # someone else's draft
+        
+        response = client.post('/records', headers=auth_headers, json={
+            **self.REPORT, 'description': self.REPORT['description'] + ' this morning', 'latitude': -0.9035})
+        
+        assert response.status_code == 201
+        duplicates = json.loads(response.data)['possible_duplicates']
+        assert [d['id'] for d in duplicates] == [earlier]
+        assert duplicates[0]['similarity'] >= 0.7
+        assert duplicates[0]['distance_meters'] < 500
+        
+        unrelated = client.post('/records', headers=auth_headers, json={'title': 'Burst water pipe on Moi Avenue'})
+        assert json.loads(unrelated.data)['possible_duplicates'] == []
+    
+    def test_admin_similar_endpoint_follows_edits(self, client, auth_headers, admin_headers):
+        """Test /admin/records/<id>/similar is admin-only and sees edited text"""
+        first = json.loads(client.post('/records', headers=auth_headers, json=self.REPORT).data)['record']['id']
+        second = json.loads(client.post('/records', headers=auth_headers, json={
+            'title': 'Broken streetlights on Ngong Road'}).data)['record']['id']
+        
+        assert client.get(f'/admin/records/{first}/similar', headers=auth_headers).status_code == 403
+        response = client.get(f'/admin/records/{first}/similar', headers=admin_headers)
+        assert json.loads(response.data)['similar'] == []
+        
+        client.patch(f'/records/{second}', headers=auth_headers, json={
+            'title': self.REPORT['title'], 'description': self.REPORT['description']})
+        response = client.get(f'/admin/records/{first}/similar', headers=admin_headers)
+        assert [r['id'] for r in json.loads(response.data)['similar']] == [second]
+        assert client.get('/admin/records/9999/similar', headers=admin_headers).status_code == 404
+
+class TestTriageQueue:
+    """Test the admin triage queue and claims"""
+    
+    def report(self, client, **fields):
+        return json.loads(client.post('/public/report', json={
+            'title': 'Report', 'description': 'Details', 'type': 'incident', **fields}).data)['record_id']
+    
+    def queue(self, client, admin_headers):
+        return [r['id'] for r in json.loads(client.get('/admin/queue', headers=admin_headers).data)['records']]
+    
+    def test_queue_orders_by_priority(self, client, auth_headers, admin_headers):
+        """Test urgency, emergencies, votes and waiting time all raise priority"""
+        low = self.report(client, urgency_level='low')
+        critical = self.report(client, urgency_level='critical')
+        emergency = self.report(client, type='emergency')
+        voted = self.report(client, urgency_level='low')
+        client.post(f'/records/{voted}/vote', headers=auth_headers, json={})
+        
+        assert self.queue(client, admin_headers) == [critical, emergency, voted, low]
+        
+        # Four days of waiting outweighs critical urgency
+        record = db.session.get(Record, low)
+        record.created_at = datetime.utcnow() - timedelta(days=4)
+        refresh_priority(record)
+        db.session.commit()
+        queue = json.loads(client.get('/admin/queue', headers=admin_headers).data)['records']
+        assert queue[0]['id'] == low and queue[0]['priority'] >= 96
+        assert client.get('/admin/queue', headers=auth_headers).status_code == 403
+    
+    def test_claims_do_not_collide(self, client, admin_headers):
+        """Test claimed reports go to one admin and leave the queue"""
+        first, second, third = (self.report(client, urgency_level=level) for level in ('critical', 'high', 'medium'))
+        other = client.post('/admin/signup', json={'name': 'Other Admin', 'email': 'other.admin@gmail.com',
+                                                   'password': 'admin123'})
+        other_headers = {'Authorization': f"Bearer {json.loads(other.data)['access_token']}"}
+        
+        response = client.post('/admin/queue/claim', headers=admin_headers, json={'count': 2})
+        assert [r['id'] for r in json.loads(response.data)['records']] == [first, second]
+        
+        response = client.post('/admin/queue/claim', headers=other_headers, json={'ids': [second, third]})
+        data = json.loads(response.data)
+        assert [r['id'] for r in data['records']] == [third]
+        assert data['unavailable'] == [second]
+        assert db.session.get(Record, second).assigned_admin_id != db.session.get(Record, third).assigned_admin_id
+        assert self.queue(client, admin_headers) == []
+    
+    def test_status_change_leaves_queue(self, client, auth_headers, admin_headers):
+        """Test drafts are queued until an admin acts on them"""
+        record_id = json.loads(client.post('/records', headers=auth_headers, json={'title': 'Draft'}).data)['record']['id']
+        assert self.queue(client, admin_headers) == [record_id]
+        
+        client.patch(f'/records/{record_id}/status', headers=admin_headers, json={'status': 'under-investigation'})
+        assert self.queue(client, admin_headers) == []
+        assert db.session.get(Record, record_id).triage_priority is None
+
+class TestArchive:
+    """Test archiving of closed records"""
+    
+    def close(self, client, admin_headers, record_id, status, days_ago):
+        client.patch(f'/records/{record_id}/status', headers=admin_headers, json={'status': status, 'reason': 'Done'})
+        record = db.session.get(Record, record_id)
+        record.updated_at = datetime.utcnow() - timedelta(days=days_ago)
+        db.session.commit()
+    
+    def test_archived_record_stays_readable(self, client, auth_headers, admin_headers):
+        """Test old closed records leave the hot tables but keep their details"""
+        old = json.loads(client.post('/records', headers=auth_headers, json={
+            'title': 'Old report', 'image_url': 'https://example.com/a.jpg'}).data)['record']['id']
+        recent = json.loads(client.post('/records', headers=auth_headers, json={'title': 'Recent'}).data)['record']['id']
+        client.post(f'/records/{old}/vote', headers=auth_headers, json={})
+        self.close(client, admin_headers, old, 'resolved', days_ago=200)
+        self.close(client, admin_headers, recent, 'resolved', days_ago=10)
+        
+        assert archive_records(180) == 1
+        assert db.session.get(Record, old) is None and db.session.get(Record, recent) is not None
+        assert Vote.query.filter_by(record_id=old).count() == 0
+        assert StatusHistory.query.filter_by(record_id=old).count() == 0
+        assert RecordChange.query.filter_by(record_id=old, change_type='archived').count() == 1
+        
+        data = json.loads(client.get(f'/public/records/{old}').data)
+        assert data['record']['status'] == 'resolved' and data['record']['vote_count'] == 1
+        assert data['record']['image_url'] == 'https://example.com/a.jpg'
+        assert data['status_history'][-1]['new_status'] == 'resolved'
+        
+        history = json.loads(client.get(f'/records/{old}/history', headers=auth_headers).data)['history']
+        assert history[0]['new_status'] == 'resolved'
+        
+        listed = json.loads(client.get('/admin/records', headers=admin_headers).data)['records']
+        assert [r['id'] for r in listed] == [recent]
+        stats = json.loads(client.get('/admin/stats', headers=admin_headers).data)
+        assert stats['status_distribution']['resolved'] == 2 and stats['archived_records'] == 1
+        assert client.get('/public/records/9999').status_code == 404
+    
+    def test_tracking_finds_archived_report(self, client, admin_headers):
+        """Test anonymous reporters can still track archived reports"""
+        report = json.loads(client.post('/public/report', json={
+            'title': 'Report', 'description': 'Details', 'type': 'incident'}).data)
+        self.close(client, admin_headers, report['record_id'], 'rejected', days_ago=365)
+        
+        assert archive_records(180) == 1
+        assert ArchivedRecord.query.one().tracking_token_hash == hash_tracking_token(report['tracking_token'])
+        tracking_cache.clear()
+        
+        response = client.get(f"/public/track/{report['tracking_token']}")
+        assert response.status_code == 200
+        assert json.loads(response.data)['report']['status'] == 'rejected'
+
+class TestBatchGet:
+    """Test batched record detail reads"""
+    
+    def create(self, client, auth_headers, count, admin_headers=None):
+        ids = []
+        for i in range(count):
+            record = json.loads(client.post('/records', headers=auth_headers, json={
+                'title': f'Report {i}', 'image_url': f'https://example.com/{i}.jpg'}).data)['record']
+            if admin_headers:
+                client.patch(f"/records/{record['id']}/status", headers=admin_headers,
+                             json={'status': 'under-investigation', 'reason': 'Checking'})
+            ids.append(record['id'])
+        return ids
+    
+    def query_count(self, response):
+        return int(response.headers['Server-Timing'].split('desc="')[1].split(' ')[0])
+    
+    def test_public_batch_keeps_order_and_reports_missing(self, client, auth_headers, admin_headers):
+        """Test drafts and unknown ids are reported missing"""
+        first, second = self.create(client, auth_headers, 2, admin_headers)
+        draft, = self.create(client, auth_headers, 1)
+        
+        response = client.get(f'/public/records?ids={second},9999,{draft},{first},{second}')
+        data = json.loads(response.data)
+        assert [entry['record']['id'] for entry in data['records']] == [second, first]
+        assert data['missing'] == [9999, draft]
+        assert data['records'][0]['status_history'][0]['new_status'] == 'under-investigation'
+        assert 'normal_user_id' not in data['records'][0]['record']
+        
+        assert client.get('/public/records?ids=1,x').status_code == 400
+        assert client.get('/public/records?ids=' + ','.join(['1'] * 101)).status_code == 400
+    
+    def test_batch_get_uses_constant_queries(self, client, auth_headers, admin_headers):
+        """Test the number of queries does not grow with the number of records"""
+        ids = self.create(client, auth_headers, 6, admin_headers)
+        draft, = self.create(client, auth_headers, 1)
+        
+        small = client.post('/records/batch-get', headers=auth_headers, json={'ids': ids[:2]})
+        large = client.post('/records/batch-get', headers=auth_headers, json={'ids': ids + [draft]})
+        assert self.query_count(small) == self.query_count(large)
+        
+        data = json.loads(large.data)
+        assert [entry['record']['id'] for entry in data['records']] == ids + [draft]
+        assert data['records'][-1]['record']['normal_user_id'] is not None
+        assert client.post('/records/batch-get', headers=auth_headers, json={'ids': []}).status_code == 400
+
+class TestRecordSummaries:
+    """Test the denormalized record summary columns"""
+    
+    def test_summaries_follow_writes(self, client, auth_headers, admin_headers):
+        """Test creator name, media count and status time stay current"""
+        record = json.loads(client.post('/records', headers=auth_headers, json={
+            'title': 'Summarized', 'image_url': 'https://example.com/a.jpg',
+            'video_url': 'https://example.com/a.mp4'}).data)['record']
+        assert record['creator_name'] == 'Test User' and record['media_count'] == 2
+        
+        client.patch(f"/records/{record['id']}", headers=auth_headers, json={'video_url': ''})
+        client.patch('/user/profile', headers=auth_headers, json={'name': 'Renamed User'})
+        client.patch(f"/records/{record['id']}/status", headers=admin_headers, json={'status': 'resolved'})
+        
+        listed = json.loads(client.get('/my-records', headers=auth_headers).data)['records'][0]
+        assert listed['creator_name'] == 'Renamed User'
+        assert listed['media_count'] == 1
+        assert listed['status_changed_at'] > record['status_changed_at']
+    
+    def test_refresh_recomputes_from_tables(self, client, auth_headers, admin_headers):
+        """Test the back-fill matches what the write paths maintain"""
+        ids = [json.loads(client.post('/records', headers=auth_headers, json={
+            'title': f'Report {i}', 'image_url': f'https://example.com/{i}.jpg'}).data)['record']['id'] for i in range(3)]
+        client.patch(f'/records/{ids[0]}/status', headers=admin_headers, json={'status': 'rejected'})
+        expected = {r.id: (r.creator_name, r.thumbnail_url, r.media_count, r.status_changed_at) for r in Record.query}
+        
+        db.session.execute(db.update(Record).values(creator_name=None, media_count=0, status_changed_at=None))
+        db.session.commit()
+        assert refresh_summaries(batch_size=2) == 3
+        db.session.expire_all()
+        assert {r.id: (r.creator_name, r.thumbnail_url, r.media_count, r.status_changed_at)
+                for r in Record.query} == expected
@@ -0,0 +1,129 @@
+# utils/archive.py
+import os
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from models import (db, Record, Media, Vote, StatusHistory, Notification, ArchivedRecord,
+                    RecordFingerprint, RecordLshBucket)
+from utils.changes import record_changes, CHANGE_ARCHIVED
+
+# Closed reports: no endpoint changes them any more
+ARCHIVE_STATUSES = ('resolved', 'rejected')
+ARCHIVE_BATCH_SIZE = 500
+
+def init_archive(app):
+    """Read ARCHIVE_AFTER_DAYS and register the archive-records command"""
+    app.config.setdefault('ARCHIVE_AFTER_DAYS', int(os.getenv('ARCHIVE_AFTER_DAYS', 180)))
+    app.cli.add_command(archive_records_command)
+
+def ensure_partitions(years):
+    """
+    Create the yearly PostgreSQL partitions rows closed in these years go to (caller commits)
+
+    There is deliberately no default partition: a year's partition could not be
+    created later while the default held rows for it. Other backends keep the
+    archive in one plain table.
+    """
+    if db.engine.dialect.name != 'postgresql':
+        return
+    for year in sorted(years):
+        db.session.execute(db.text(
+            f"CREATE TABLE IF NOT EXISTS archived_records_{year:d} PARTITION OF archived_records "
+            f"FOR VALUES FROM ('{year:d}-01-01') TO ('{year + 1:d}-01-01')"
+        ))
+
+def archive_row(record, now):
+    """ArchivedRecord column values for a loaded record, with its votes, media and history"""
+    history = sorted(record.status_history, key=lambda h: (h.changed_at, h.id))
+    return {
+        'id': record.id,
+        'closed_at': record.status_changed_at or record.updated_at,
+        'archived_at': now,
+        'type': record.type,
+        'title': record.title,
+        'description': record.description,
+        'status': record.status,
+        'latitude': record.latitude,
+        'longitude': record.longitude,
+        'location_name': record.location_name,
+        'created_at': record.created_at,
+        'updated_at': record.updated_at,
+        'resolution_notes': record.resolution_notes,
+        'is_anonymous': record.is_anonymous,
+        'vote_count': record.vote_count,
+        'urgency_level': record.urgency_level,
+        'tracking_token_hash': record.tracking_token_hash,
+        'normal_user_id': record.normal_user_id,
+        'assigned_admin_id': record.assigned_admin_id,
+        'creator_name': record.creator_name,
+        'media': [media.to_summary() for media in record.media],
+        'votes': [{'user_id': vote.user_id, 'vote_type': vote.vote_type, 'created_at': vote.created_at.isoformat()}
+                  for vote in record.votes],
+        'status_history': [entry.to_dict() for entry in history],
+    }
+
+def archive_records(days, batch_size=ARCHIVE_BATCH_SIZE):
+    """
+    Move records resolved or rejected more than `days` ago into archived_records
+
+    Each batch is copied and deleted from the hot tables (votes, media, status
+    history, duplicate index) in one transaction, so a record is always in
+    exactly one place. Rows are locked with SKIP LOCKED on PostgreSQL, so a
+    status change in flight just defers that record to the next run.
+    Notifications are kept with their record_id cleared.
+
+    Returns:
+        int: Number of records archived
+    """
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    archived = 0
+    while True:
+        ids = [row.id for row in db.session.query(Record.id)
+               .filter(Record.status.in_(ARCHIVE_STATUSES), Record.updated_at < cutoff)
+               .order_by(Record.updated_at)
+               .limit(batch_size)
+               .with_for_update(skip_locked=True)]
+        if not ids:
+            return archived
+
+        records = (Record.query
+                   .filter(Record.id.in_(ids))
+                   .options(db.selectinload(Record.media).selectinload(Media.variants),
+                            db.selectinload(Record.votes),
+                            db.selectinload(Record.status_history).joinedload(StatusHistory.admin))
+                   .all())
+        rows = [archive_row(record, datetime.utcnow()) for record in records]
+        ensure_partitions({row['closed_at'].year for row in rows})
+        db.session.execute(db.insert(ArchivedRecord), rows)
+        record_changes([{
+            'record_id': row['id'],
+            'user_id': row['normal_user_id'],
+            'status': row['status'],
+            'vote_count': row['vote_count'],
+        } for row in rows], CHANGE_ARCHIVED)
+
+        options = {'synchronize_session': False}
+        for model in (RecordLshBucket, RecordFingerprint, Vote, StatusHistory, Media):
+            db.session.execute(db.delete(model).where(model.record_id.in_(ids)), execution_options=options)
+        db.session.execute(db.update(Notification).where(Notification.record_id.in_(ids)).values(record_id=None),
+                           execution_options=options)
+        db.session.execute(db.delete(Record).where(Record.id.in_(ids)), execution_options=options)
+        db.session.commit()
+        db.session.expunge_all()
+        archived += len(rows)
+
+def find_archived_record(record_id):
+    """The archived copy of a record no longer in `records`, or None"""
+    return ArchivedRecord.query.filter_by(id=record_id).first()
+
+@click.command('archive-records')
+@click.option('--days', type=int, default=None,
+              help='Archive records closed more than this many days ago (default ARCHIVE_AFTER_DAYS)')
+@with_appcontext
+def archive_records_command(days):
+    """Move old resolved and rejected records out of the hot tables"""
+    archived = archive_records(days if days is not None else current_app.config['ARCHIVE_AFTER_DAYS'])
+    click.echo(f"Archived {archived} record(s)")
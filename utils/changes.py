@@ -0,0 +1,212 @@
+# utils/changes.py
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import event
+
+from models import db, RecordChange
+from utils.database import RoutingSession
+
+CHANGE_CREATED = 'created'
+CHANGE_UPDATED = 'updated'
+CHANGE_STATUS = 'status'
+CHANGE_VOTE = 'vote'
+CHANGE_DELETED = 'deleted'
+# Moved to the archive: still readable by id, no longer listed
+CHANGE_ARCHIVED = 'archived'
+
+# Recent changes inspected for sequence gaps left by transactions still in flight
+GAP_SCAN_ROWS = 500
+
+def init_changes(app):
+    """Read change feed settings and register the prune-changes command"""
+    app.config.setdefault('CHANGES_PAGE_LIMIT', int(os.getenv('CHANGES_PAGE_LIMIT', 500)))
+    app.config.setdefault('CHANGES_SETTLE_SECONDS', float(os.getenv('CHANGES_SETTLE_SECONDS', 10)))
+    app.config.setdefault('CHANGES_POLL_SECONDS', float(os.getenv('CHANGES_POLL_SECONDS', 2)))
+    app.config.setdefault('CHANGES_HEARTBEAT_SECONDS', float(os.getenv('CHANGES_HEARTBEAT_SECONDS', 15)))
+    app.config.setdefault('CHANGES_STREAM_MAX_SECONDS', float(os.getenv('CHANGES_STREAM_MAX_SECONDS', 300)))
+    app.config.setdefault('CHANGES_MAX_STREAMS', int(os.getenv('CHANGES_MAX_STREAMS', 4)))
+    app.config.setdefault('CHANGES_RETENTION_DAYS', int(os.getenv('CHANGES_RETENTION_DAYS', 30)))
+    app.extensions['jiseti_change_streams'] = threading.BoundedSemaphore(app.config['CHANGES_MAX_STREAMS'])
+    app.cli.add_command(prune_changes_command)
+
+def record_change(record, change_type):
+    """Append one change for a record to the feed (caller commits)"""
+    record_changes([{
+        'record_id': record.id,
+        'user_id': record.normal_user_id,
+        'status': record.status,
+        'vote_count': record.vote_count,
+    }], change_type)
+
+def record_changes(rows, change_type):
+    """
+    Append changes for many records with one bulk insert (caller commits)
+
+    Args:
+        rows (list): [{'record_id', 'user_id', 'status', 'vote_count'}]
+        change_type (str): CHANGE_CREATED, CHANGE_UPDATED, CHANGE_STATUS, CHANGE_VOTE, CHANGE_DELETED
+            or CHANGE_ARCHIVED
+    """
+    if not rows:
+        return
+    now = datetime.utcnow()
+    db.session.execute(db.insert(RecordChange), [
+        {**row, 'change_type': change_type, 'changed_at': now} for row in rows
+    ])
+    db.session.info['record_changes'] = True
+
+def settled_head(settle_seconds, now=None):
+    """
+    Highest sequence number clients can safely sync up to
+
+    Sequence values are handed out at insert but become visible at commit, so a
+    slow transaction can commit a lower number after a higher one was read. A gap
+    followed by a change younger than the settle window may still be filled and
+    caps the head just below it; older gaps are rollbacks and are skipped.
+
+    Returns:
+        int: Sequence number (0 if the feed is empty)
+    """
+    recent = (db.session.query(RecordChange.id, RecordChange.changed_at)
+              .order_by(RecordChange.id.desc())
+              .limit(GAP_SCAN_ROWS)
+              .all())
+    if not recent:
+        return 0
+
+    cutoff = (now or datetime.utcnow()) - timedelta(seconds=settle_seconds)
+    recent.reverse()
+    head = recent[0].id
+    for row in recent[1:]:
+        if row.id != head + 1 and row.changed_at > cutoff:
+            break
+        head = row.id
+    return head
+
+def changes_since(since, user_id=None, limit=500, settle_seconds=10):
+    """
+    Changes after a sequence number, oldest first
+
+    Args:
+        since (int): Last sequence number the client has seen
+        user_id (int): Only changes to this user's records (None for all)
+        limit (int): Maximum changes returned
+        settle_seconds (float): See settled_head()
+
+    Returns:
+        tuple: (list of RecordChange, next `since` for the client, has_more)
+    """
+    head = settled_head(settle_seconds)
+    if head <= since:
+        return [], since, False
+
+    query = RecordChange.query.filter(RecordChange.id > since, RecordChange.id <= head)
+    if user_id is not None:
+        query = query.filter(RecordChange.user_id == user_id)
+    changes = query.order_by(RecordChange.id).limit(limit + 1).all()
+
+    if len(changes) > limit:
+        changes = changes[:limit]
+        return changes, changes[-1].id, True
+    # Nothing else up to the head concerns this client, so it can resume from there
+    return changes, head, False
+
+def history_starts_after(since):
+    """True if changes after `since` may already have been pruned"""
+    oldest = db.session.query(db.func.min(RecordChange.id)).scalar()
+    return oldest is not None and since + 1 < oldest
+
+class ChangeNotifier:
+    """Wakes this process's change streams as soon as a change is committed"""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._version = 0
+
+    @property
+    def version(self):
+        return self._version
+
+    def notify(self):
+        with self._condition:
+            self._version += 1
+            self._condition.notify_all()
+
+    def wait(self, version, timeout):
+        """Block until a commit after `version` or the timeout; returns the current version"""
+        with self._condition:
+            self._condition.wait_for(lambda: self._version != version, timeout)
+            return self._version
+
+change_notifier = ChangeNotifier()
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _notify_streams(session):
+    if session.info.pop('record_changes', False):
+        change_notifier.notify()
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _discard_changes(session):
+    session.info.pop('record_changes', None)
+
+def format_event(change):
+    """One server-sent event; the id lets EventSource resume with Last-Event-ID"""
+    return f"id: {change.id}\nevent: change\ndata: {json.dumps(change.to_dict())}\n\n"
+
+def stream_changes(config, since, user_id=None):
+    """
+    Yield server-sent events for changes after `since`
+
+    Other workers' commits are picked up by polling every CHANGES_POLL_SECONDS;
+    commits in this process wake the stream immediately. The connection is closed
+    after CHANGES_STREAM_MAX_SECONDS so clients reconnect (resuming from the
+    Last-Event-ID) and worker threads are not held indefinitely.
+    """
+    poll = config['CHANGES_POLL_SECONDS']
+    heartbeat = config['CHANGES_HEARTBEAT_SECONDS']
+    started = last_sent = time.monotonic()
+    version = change_notifier.version
+
+    yield f"retry: {int(poll * 1000)}\n\n"
+    while True:
+        changes, since, has_more = changes_since(
+            since, user_id, config['CHANGES_PAGE_LIMIT'], config['CHANGES_SETTLE_SECONDS']
+        )
+        # Don't hold a pooled connection while waiting
+        db.session.close()
+
+        if changes:
+            yield ''.join(format_event(change) for change in changes)
+            last_sent = time.monotonic()
+            if has_more:
+                continue
+        elif time.monotonic() - last_sent >= heartbeat:
+            yield ": keepalive\n\n"
+            last_sent = time.monotonic()
+
+        remaining = config['CHANGES_STREAM_MAX_SECONDS'] - (time.monotonic() - started)
+        if remaining <= 0:
+            return
+        version = change_notifier.wait(version, min(poll, remaining))
+
+def prune_changes(days):
+    """Delete changes older than `days`; returns the number deleted"""
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    deleted = RecordChange.query.filter(RecordChange.changed_at < cutoff).delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
+
+@click.command('prune-changes')
+@click.option('--days', type=int, default=None, help='Keep this many days of changes (default CHANGES_RETENTION_DAYS)')
+@with_appcontext
+def prune_changes_command(days):
+    """Delete old change feed entries (clients further behind must resync)"""
+    deleted = prune_changes(days if days is not None else current_app.config['CHANGES_RETENTION_DAYS'])
+    click.echo(f"Deleted {deleted} change(s)")
@@ -0,0 +1,102 @@
+# utils/cors.py
+import os
+import re
+
+DEFAULT_ORIGINS = (
+    'http://localhost:5173',    # Vite dev server
+    'http://127.0.0.1:5173',    # Alternative localhost
+    'http://localhost:3000',    # Alternative React dev server
+    'http://localhost:5174',    # Alternative Vite port
+    'https://jiseti.go.ke',     # Production domain
+)
+ALLOW_METHODS = 'GET, POST, PUT, DELETE, PATCH, OPTIONS'
+ALLOW_HEADERS = 'Content-Type, Authorization, X-Requested-With, Accept, Origin, X-Consistency'
+EXPOSE_HEADERS = 'Content-Range, X-Content-Range'
+
+class CorsPolicy:
+    """
+    Allowed origins compiled once: exact origins in a frozenset and wildcard
+    subdomain patterns (e.g. https://*.jiseti.go.ke) in a single regex
+    """
+
+    def __init__(self, origins, max_age=86400):
+        exact, wildcards = set(), []
+        for origin in origins:
+            origin = origin.strip().rstrip('/')
+            if not origin:
+                continue
+            if '*' in origin:
+                wildcards.append(re.escape(origin).replace(r'\*', r'[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*'))
+            else:
+                exact.add(origin)
+
+        self.exact = frozenset(exact)
+        self.pattern = re.compile('^(?:' + '|'.join(wildcards) + ')$') if wildcards else None
+        self.max_age = str(max_age)
+
+        # Header values shared by every response
+        self.preflight_headers = [
+            ('Access-Control-Allow-Credentials', 'true'),
+            ('Access-Control-Allow-Methods', ALLOW_METHODS),
+            ('Access-Control-Allow-Headers', ALLOW_HEADERS),
+            ('Access-Control-Max-Age', self.max_age),
+            ('Vary', 'Origin'),
+        ]
+        self.response_headers = [
+            ('Access-Control-Allow-Credentials', 'true'),
+            ('Access-Control-Expose-Headers', EXPOSE_HEADERS),
+            ('Vary', 'Origin'),
+        ]
+
+    def allows(self, origin):
+        if not origin:
+            return False
+        if origin in self.exact:
+            return True
+        return self.pattern is not None and self.pattern.match(origin) is not None
+
+class CorsMiddleware:
+    """
+    WSGI middleware applying a CorsPolicy
+
+    Preflight requests from allowed origins are answered here, before Flask
+    routing, JWT checks or any before_request hooks run. Other responses to
+    allowed origins get the precomputed CORS headers appended.
+    """
+
+    def __init__(self, wsgi_app, policy):
+        self.wsgi_app = wsgi_app
+        self.policy = policy
+
+    def __call__(self, environ, start_response):
+        origin = environ.get('HTTP_ORIGIN')
+        if not self.policy.allows(origin):
+            return self.wsgi_app(environ, start_response)
+
+        if environ.get('REQUEST_METHOD') == 'OPTIONS' and 'HTTP_ACCESS_CONTROL_REQUEST_METHOD' in environ:
+            start_response('204 No Content', [('Access-Control-Allow-Origin', origin)] + self.policy.preflight_headers)
+            return [b'']
+
+        cors_headers = [('Access-Control-Allow-Origin', origin)] + self.policy.response_headers
+
+        def start_response_with_cors(status, headers, exc_info=None):
+            return start_response(status, headers + cors_headers, exc_info)
+
+        return self.wsgi_app(environ, start_response_with_cors)
+
+def init_cors(app):
+    """
+    Install the CORS middleware on a Flask app
+
+    Origins come from CORS_ORIGINS (comma-separated, `*` allowed as a subdomain
+    wildcard) and preflight caching from CORS_MAX_AGE, in the app config or
+    environment.
+    """
+    configured = os.getenv('CORS_ORIGINS')
+    app.config.setdefault('CORS_ORIGINS', configured.split(',') if configured else list(DEFAULT_ORIGINS))
+    app.config.setdefault('CORS_MAX_AGE', int(os.getenv('CORS_MAX_AGE', 86400)))
+
+    policy = CorsPolicy(app.config['CORS_ORIGINS'], max_age=app.config['CORS_MAX_AGE'])
+    app.extensions['jiseti_cors'] = policy
+    app.wsgi_app = CorsMiddleware(app.wsgi_app, policy)
+    return policy
@@ -0,0 +1,202 @@
+# utils/database.py
+import itertools
+import logging
+import os
+import threading
+import time
+from functools import wraps
+
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+
+logger = logging.getLogger(__name__)
+
+# Pool defaults per FLASK_ENV; each value can be overridden with the DB_POOL_* variables
+POOL_PROFILES = {
+    'development': {'pool_size': 5, 'max_overflow': 5, 'pool_timeout': 10, 'pool_recycle': 300},
+    'testing': {'pool_size': 2, 'max_overflow': 2, 'pool_timeout': 5, 'pool_recycle': 300},
+    'production': {'pool_size': 10, 'max_overflow': 20, 'pool_timeout': 30, 'pool_recycle': 1800},
+}
+
+POOL_ENV_VARS = {
+    'pool_size': 'DB_POOL_SIZE',
+    'max_overflow': 'DB_MAX_OVERFLOW',
+    'pool_timeout': 'DB_POOL_TIMEOUT',
+    'pool_recycle': 'DB_POOL_RECYCLE',
+}
+
+REPLICA_NAME_PREFIX = 'replica_'
+PRIMARY_COOKIE = 'jiseti_primary_until'
+WRITE_METHODS = frozenset(['POST', 'PUT', 'PATCH', 'DELETE'])
+
+def pool_limits(environment=None):
+    """Pool profile for an environment (defaults to FLASK_ENV) with DB_POOL_* overrides applied"""
+    environment = environment or os.getenv('FLASK_ENV') or 'production'
+    profile = dict(POOL_PROFILES.get(environment, POOL_PROFILES['production']))
+
+    for option, env_var in POOL_ENV_VARS.items():
+        if os.getenv(env_var):
+            profile[option] = int(os.getenv(env_var))
+    return profile
+
+def engine_options_for(database_url, environment=None):
+    """
+    Build SQLALCHEMY_ENGINE_OPTIONS for a database URL
+
+    Args:
+        database_url (str): SQLAlchemy database URL
+        environment (str): Pool profile name, defaults to FLASK_ENV (or production)
+
+    Returns:
+        dict: Engine options. Queue sizing is skipped for SQLite, which uses
+        single-connection pools that reject those arguments.
+    """
+    profile = pool_limits(environment)
+
+    options = {
+        'pool_pre_ping': os.getenv('DB_POOL_PRE_PING', 'true').lower() == 'true',
+        'pool_recycle': profile['pool_recycle'],
+    }
+    if not database_url.startswith('sqlite'):
+        options.update(
+            pool_size=profile['pool_size'],
+            max_overflow=profile['max_overflow'],
+            pool_timeout=profile['pool_timeout'],
+        )
+    return options
+
+class ReplicaRouter:
+    """Chooses a healthy read replica, skipping replicas that lag too far behind"""
+
+    def __init__(self, engines, max_lag, check_interval):
+        self.engines = dict(engines)  # name -> Engine
+        self.names = list(self.engines)
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._lag = {}  # replica name -> (lag seconds or None if unreachable, checked_at)
+        self._lock = threading.Lock()
+        self._round_robin = itertools.count()
+
+    def record_lag(self, name, lag):
+        """Store a replica's measured lag (None marks it unreachable)"""
+        with self._lock:
+            self._lag[name] = (lag, time.monotonic())
+
+    def _measure_lag(self, engine):
+        from sqlalchemy import text
+
+        with engine.connect() as conn:
+            if engine.dialect.name == 'postgresql':
+                return conn.execute(text(
+                    "SELECT CASE WHEN pg_is_in_recovery() "
+                    "THEN COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) "
+                    "ELSE 0 END"
+                )).scalar()
+            conn.execute(text('SELECT 1'))
+            return 0.0
+
+    def lag(self, name):
+        """Replica lag in seconds, re-measured at most once per check interval"""
+        cached = self._lag.get(name)
+        if cached and time.monotonic() - cached[1] < self.check_interval:
+            return cached[0]
+        try:
+            lag = float(self._measure_lag(self.engines[name]))
+        except Exception as e:
+            logger.warning(f"Replica {name} unavailable, falling back to primary: {str(e)}")
+            lag = None
+        self.record_lag(name, lag)
+        return lag
+
+    def choose(self):
+        """Return a replica engine within the lag budget, or None to use the primary"""
+        if not self.names:
+            return None
+        start = next(self._round_robin)
+        for offset in range(len(self.names)):
+            name = self.names[(start + offset) % len(self.names)]
+            lag = self.lag(name)
+            if lag is not None and lag <= self.max_lag:
+                return self.engines[name]
+        return None
+
+def current_replica():
+    """Replica engine for the active request, or None when it must use the primary"""
+    if not has_request_context() or not g.get('db_read_only') or g.get('db_use_primary'):
+        return None
+    if '_db_replica' not in g:
+        router = current_app.extensions.get('jiseti_replicas')
+        g._db_replica = router.choose() if router else None
+    return g._db_replica
+
+class RoutingSession(Session):
+    """Session that sends reads from read-only endpoints to a replica"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing:
+            replica = current_replica()
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+def read_only(view):
+    """Mark a view as safe to serve from a read replica"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        g.db_read_only = True
+        return view(*args, **kwargs)
+    return wrapper
+
+def configure_database(app):
+    """
+    Apply pool options to the app config, create read-replica engines and
+    register the read-your-writes hooks. Must run before db.init_app(app).
+
+    Replica engines are owned by the router rather than declared as
+    SQLALCHEMY_BINDS, so they never take part in db.create_all().
+    """
+    database_url = app.config['SQLALCHEMY_DATABASE_URI']
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options_for(database_url))
+
+    replica_urls = app.config.setdefault('SQLALCHEMY_REPLICA_URIS', [
+        url.strip() for url in os.getenv('SQLALCHEMY_REPLICA_URIS', '').split(',') if url.strip()
+    ])
+    app.config.setdefault('DB_REPLICA_MAX_LAG_SECONDS', float(os.getenv('DB_REPLICA_MAX_LAG_SECONDS', 5)))
+    app.config.setdefault('DB_REPLICA_LAG_CHECK_SECONDS', float(os.getenv('DB_REPLICA_LAG_CHECK_SECONDS', 2)))
+    app.config.setdefault('READ_YOUR_WRITES_SECONDS', int(os.getenv('READ_YOUR_WRITES_SECONDS', 5)))
+
+    if not replica_urls:
+        return
+
+    from sqlalchemy import create_engine
+
+    engines = {
+        f'{REPLICA_NAME_PREFIX}{index}': create_engine(url, **engine_options_for(url))
+        for index, url in enumerate(replica_urls)
+    }
+
+    app.extensions['jiseti_replicas'] = ReplicaRouter(
+        engines,
+        max_lag=app.config['DB_REPLICA_MAX_LAG_SECONDS'],
+        check_interval=app.config['DB_REPLICA_LAG_CHECK_SECONDS'],
+    )
+    logger.info(f"Read replica routing enabled with {len(engines)} replica(s)")
+
+    @app.before_request
+    def pin_recent_writers_to_primary():
+        primary_until = request.cookies.get(PRIMARY_COOKIE)
+        try:
+            recently_wrote = primary_until is not None and float(primary_until) > time.time()
+        except ValueError:
+            recently_wrote = False
+        if recently_wrote or request.headers.get('X-Consistency') == 'primary':
+            g.db_use_primary = True
+
+    @app.after_request
+    def remember_writes(response):
+        # Read-only POSTs (e.g. /records/batch-get) wrote nothing worth pinning the client for
+        if request.method in WRITE_METHODS and not g.get('db_read_only') and response.status_code < 400:
+            window = app.config['READ_YOUR_WRITES_SECONDS']
+            response.set_cookie(PRIMARY_COOKIE, str(time.time() + window), max_age=window,
+                                httponly=True, samesite='Lax')
+        return response
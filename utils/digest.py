@@ -0,0 +1,255 @@
+# utils/digest.py
+import logging
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from models import db, Notification, NormalUser, Record
+from utils.emailer import submit_status_email, submit_sms_notification
+
+logger = logging.getLogger(__name__)
+
+# Pending status changes are Notification rows of this type with delivery_status
+# 'pending'; sent_at holds the time they were queued until the digest goes out.
+STATUS_CHANGE = 'status_change'
+
+STATUS_MESSAGES = {
+    'under-investigation': '🔍 Your report is now being actively investigated by our team.',
+    'resolved': '✅ Great news! Your report has been resolved.',
+    'rejected': '❌ Your report has been reviewed and rejected.'
+}
+
+def init_digests(app):
+    """Read digest settings; the flush thread starts on the first queued notification"""
+    app.config.setdefault('DIGEST_WINDOW_SECONDS', int(os.getenv('DIGEST_WINDOW_SECONDS', 300)))
+    app.config.setdefault('DIGEST_URGENT_STATUSES', [
+        s.strip() for s in os.getenv('DIGEST_URGENT_STATUSES', '').split(',') if s.strip()
+    ])
+    app.config.setdefault('DIGEST_FLUSH_INTERVAL_SECONDS', int(os.getenv('DIGEST_FLUSH_INTERVAL_SECONDS', 30)))
+    app.config.setdefault('DIGEST_SCHEDULER', not app.testing)
+    app.cli.add_command(send_digests_command)
+
+def queue_status_notification(record, old_status, new_status, reason=None, urgent=False):
+    """
+    Queue a status change for the record owner's next digest (caller commits)
+
+    Args:
+        record (Record): Record whose status changed
+        old_status (str): Previous status
+        new_status (str): New status
+        reason (str): Reason for change (optional)
+        urgent (bool): Send without waiting for the digest window
+
+    Returns:
+        bool: True if the owner's digest should be flushed right after commit
+    """
+    return bool(queue_status_notifications([{
+        'record_id': record.id,
+        'user_id': record.normal_user_id,
+        'old_status': old_status,
+        'new_status': new_status,
+    }], reason=reason, urgent=urgent))
+
+def queue_status_notifications(changes, reason=None, urgent=False):
+    """
+    Queue many status changes with one bulk insert (caller commits)
+
+    Args:
+        changes (list): [{'record_id', 'user_id', 'old_status', 'new_status'}];
+            changes without a user (anonymous reports) are skipped
+        reason (str): Reason for change (optional)
+        urgent (bool): Send without waiting for the digest window
+
+    Returns:
+        set: User ids whose digests should be flushed right after commit
+    """
+    changes = [c for c in changes if c['user_id']]
+    if not changes:
+        return set()
+
+    rows = []
+    for change in changes:
+        message = f"{change['old_status'].upper()} ➝ {change['new_status'].upper()}"
+        if reason:
+            message += f" (Reason: {reason})"
+        rows.append({
+            'record_id': change['record_id'],
+            'user_id': change['user_id'],
+            'notification_type': STATUS_CHANGE,
+            'message': message,
+            'delivery_status': 'pending',
+        })
+    db.session.execute(db.insert(Notification), rows)
+
+    config = current_app.config
+    if config['DIGEST_SCHEDULER']:
+        digest_scheduler.ensure_started(current_app._get_current_object())
+
+    if urgent or config['DIGEST_WINDOW_SECONDS'] <= 0:
+        return {c['user_id'] for c in changes}
+    return {c['user_id'] for c in changes if c['new_status'] in config['DIGEST_URGENT_STATUSES']}
+
+def build_digest(user, pending):
+    """
+    Summarize a user's pending status changes in one email and one SMS
+
+    Args:
+        user (NormalUser): Recipient
+        pending (list): Pending Notification rows in queue order
+
+    Returns:
+        tuple: (email subject, email body, SMS text)
+    """
+    changes = OrderedDict()
+    for notification in pending:
+        changes.setdefault(notification.record_id, []).append(notification.message)
+
+    records = {r.id: r for r in Record.query.filter(Record.id.in_(list(changes))).all()}
+
+    sections = []
+    for record_id, messages in changes.items():
+        record = records.get(record_id)
+        if record is None:
+            continue
+        section = f'📋 "{record.title}"\nCurrent Status: {record.status.upper()}\n' + '\n'.join(f'• {m}' for m in messages)
+        if record.status == 'resolved' and record.resolution_notes:
+            section += f'\nResolution Details: {record.resolution_notes}'
+        sections.append(section)
+
+    if len(records) == 1:
+        record = next(iter(records.values()))
+        subject = f"Status Update: {record.title}"
+        intro = STATUS_MESSAGES.get(record.status, f'Your report status has changed to {record.status}.')
+        sms = f"Jiseti Update: Your report '{record.title}' is now {record.status.upper()}. Check your email for details."
+    else:
+        subject = f"Status Update: {len(records)} of your reports"
+        intro = f'{len(records)} of your reports have been updated.'
+        sms = f"Jiseti Update: {len(records)} of your reports have new statuses. Check your email for details."
+
+    body = f"""Hello {user.name},
+
+{intro}
+
+""" + '\n\n'.join(sections) + """
+
+You can view your full report details in your Jiseti dashboard.
+
+Thank you for using Jiseti!
+
+Best regards,
+The Jiseti Admin Team"""
+
+    return subject, body, sms
+
+def flush_user_digest(user_id):
+    """
+    Send one digest covering all of a user's pending status changes
+
+    Returns:
+        bool: True if a digest was sent
+    """
+    pending = (Notification.query
+               .filter_by(user_id=user_id, notification_type=STATUS_CHANGE, delivery_status='pending')
+               .order_by(Notification.id)
+               .with_for_update(skip_locked=True)
+               .all())
+    if not pending:
+        db.session.rollback()
+        return False
+
+    user = db.session.get(NormalUser, user_id)
+    now = datetime.utcnow()
+    for notification in pending:
+        notification.delivery_status = 'sent' if user else 'skipped'
+        notification.sent_at = now
+    db.session.commit()
+
+    if not user:
+        return False
+
+    subject, body, sms = build_digest(user, pending)
+    submit_status_email(user.email, subject, body)
+    if user.phone_number:
+        submit_sms_notification(user.phone_number, sms)
+    return True
+
+def flush_due_digests(now=None, force=False):
+    """
+    Send digests for every user whose oldest pending change has waited a full window
+
+    Args:
+        now (datetime): Current time, defaults to utcnow
+        force (bool): Flush all pending changes regardless of the window
+
+    Returns:
+        int: Number of digests sent
+    """
+    cutoff = (now or datetime.utcnow()) - timedelta(seconds=current_app.config['DIGEST_WINDOW_SECONDS'])
+
+    query = (db.session.query(Notification.user_id)
+             .filter(Notification.notification_type == STATUS_CHANGE,
+                     Notification.delivery_status == 'pending')
+             .group_by(Notification.user_id))
+    if not force:
+        query = query.having(db.func.min(Notification.sent_at) <= cutoff)
+    user_ids = [row[0] for row in query.all()]
+
+    sent = 0
+    for user_id in user_ids:
+        try:
+            sent += flush_user_digest(user_id)
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Failed to send digest to user {user_id}: {str(e)}")
+    return sent
+
+class DigestScheduler:
+    """Daemon thread flushing due digests every DIGEST_FLUSH_INTERVAL_SECONDS"""
+
+    def __init__(self):
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def ensure_started(self, app):
+        # Started lazily (and again after a fork) so each gunicorn worker runs one
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, args=(app,), name='digest-scheduler', daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def _run(self, app):
+        interval = app.config['DIGEST_FLUSH_INTERVAL_SECONDS']
+        while not self._stop.wait(interval):
+            with app.app_context():
+                try:
+                    sent = flush_due_digests()
+                    if sent:
+                        logger.info(f"Sent {sent} status digest(s)")
+                except Exception as e:
+                    db.session.rollback()
+                    logger.error(f"Digest flush failed: {str(e)}")
+                finally:
+                    db.session.remove()
+
+    def stop(self):
+        self._stop.set()
+
+digest_scheduler = DigestScheduler()
+
+@click.command('send-digests')
+@click.option('--all', 'force', is_flag=True, help='Send every pending change, ignoring the digest window')
+@with_appcontext
+def send_digests_command(force):
+    """Send due status-change digests (for cron when the in-process scheduler is off)"""
+    sent = flush_due_digests(force=force)
+    click.echo(f"Sent {sent} digest(s)")
@@ -1,14 +1,17 @@
 # utils/emailer.py
 import os
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail
-from twilio.rest import Client
+import asyncio
+import atexit
 import logging
+import threading
+
+from utils.metrics import track_notification
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@track_notification('email')
 def send_status_email(to_email, subject, message):
     """
     Send email notification using SendGrid
@@ -29,6 +32,10 @@ def send_status_email(to_email, subject, message):
             logger.error("SENDGRID_API_KEY environment variable not set")
             return False
         
+        # Imported on first send - the SDK is slow to import and most workers rarely need it
+        from sendgrid import SendGridAPIClient
+        from sendgrid.helpers.mail import Mail
+        
         # Create the email message
         mail = Mail(
             from_email=from_email,
@@ -48,6 +55,7 @@ def send_status_email(to_email, subject, message):
         logger.error(f"Error sending email to {to_email}: {str(e)}")
         return False
 
+@track_notification('sms')
 def send_sms_notification(phone_number, message):
     """
     Send SMS notification using Twilio
@@ -68,12 +76,11 @@ def send_sms_notification(phone_number, message):
             logger.error("Twilio credentials not properly configured")
             return False
         
-        client = Client(account_sid, auth_token)
+        # Imported on first send - the SDK is slow to import and most workers rarely need it
+        from twilio.rest import Client
         
-        # Ensure phone number has country code
-        if not phone_number.startswith('+'):
-            # Assume Kenya country code if not provided
-            phone_number = '+254' + phone_number.lstrip('0')
+        client = Client(account_sid, auth_token)
+        phone_number = normalize_phone_number(phone_number)
         
         # Send SMS
         message_instance = client.messages.create(
@@ -89,6 +96,228 @@ def send_sms_notification(phone_number, message):
         logger.error(f"Error sending SMS to {phone_number}: {str(e)}")
         return False
 
+def normalize_phone_number(phone_number):
+    """Ensure a phone number has a country code, assuming Kenya (+254) if none is given"""
+    if not phone_number.startswith('+'):
+        return '+254' + phone_number.lstrip('0')
+    return phone_number
+
+# ------------------ Async Providers ------------------
+# SendGrid and Twilio REST calls made directly with aiohttp, so many sends can
+# share one event loop and connection pool instead of blocking a worker each.
+# The API base URLs can be pointed at a local server for testing.
+
+def _sendgrid_url():
+    return os.getenv('SENDGRID_API_URL', 'https://api.sendgrid.com/v3/mail/send')
+
+def _twilio_messages_url(account_sid):
+    base_url = os.getenv('TWILIO_API_URL', 'https://api.twilio.com').rstrip('/')
+    return f"{base_url}/2010-04-01/Accounts/{account_sid}/Messages.json"
+
+def _client_timeout():
+    import aiohttp
+    return aiohttp.ClientTimeout(total=float(os.getenv('NOTIFICATION_TIMEOUT_SECONDS', 10)))
+
+@track_notification('email')
+async def send_status_email_async(to_email, subject, message, session=None):
+    """
+    Send email notification through the SendGrid REST API without blocking
+    
+    Args:
+        to_email (str): Recipient's email address
+        subject (str): Email subject
+        message (str): Email body content
+        session (aiohttp.ClientSession): Session to reuse, a one-off session is used if omitted
+    
+    Returns:
+        bool: True if email sent successfully, False otherwise
+    """
+    sendgrid_api_key = os.getenv('SENDGRID_API_KEY')
+    from_email = os.getenv('FROM_EMAIL', 'noreply@jiseti.go.ke')
+    
+    if not sendgrid_api_key:
+        logger.error("SENDGRID_API_KEY environment variable not set")
+        return False
+    
+    payload = {
+        'personalizations': [{'to': [{'email': to_email}]}],
+        'from': {'email': from_email},
+        'subject': subject,
+        'content': [{'type': 'text/html', 'value': format_email_html(message)}]
+    }
+    headers = {'Authorization': f'Bearer {sendgrid_api_key}'}
+    
+    try:
+        import aiohttp
+        
+        if session is None:
+            async with aiohttp.ClientSession(timeout=_client_timeout()) as one_off:
+                return await _send_email_request(one_off, to_email, payload, headers)
+        return await _send_email_request(session, to_email, payload, headers)
+        
+    except Exception as e:
+        logger.error(f"Error sending email to {to_email}: {str(e)}")
+        return False
+
+async def _send_email_request(session, to_email, payload, headers):
+    """POST one SendGrid mail payload on `session`, kept undecorated so a send is tracked once"""
+    async with session.post(_sendgrid_url(), json=payload, headers=headers) as response:
+        if response.status >= 400:
+            logger.error(f"Error sending email to {to_email}: SendGrid returned {response.status}: {await response.text()}")
+            return False
+        logger.info(f"Email sent successfully to {to_email}. Status code: {response.status}")
+        return True
+
+@track_notification('sms')
+async def send_sms_notification_async(phone_number, message, session=None):
+    """
+    Send SMS notification through the Twilio REST API without blocking
+    
+    Args:
+        phone_number (str): Recipient's phone number
+        message (str): SMS message content
+        session (aiohttp.ClientSession): Session to reuse, a one-off session is used if omitted
+    
+    Returns:
+        bool: True if SMS sent successfully, False otherwise
+    """
+    account_sid = os.getenv('TWILIO_ACCOUNT_SID')
+    auth_token = os.getenv('TWILIO_AUTH_TOKEN')
+    from_number = os.getenv('TWILIO_PHONE_NUMBER')
+    
+    if not all([account_sid, auth_token, from_number]):
+        logger.error("Twilio credentials not properly configured")
+        return False
+    
+    phone_number = normalize_phone_number(phone_number)
+    
+    try:
+        import aiohttp
+        
+        auth = aiohttp.BasicAuth(account_sid, auth_token)
+        data = {'From': from_number, 'To': phone_number, 'Body': message}
+        if session is None:
+            async with aiohttp.ClientSession(timeout=_client_timeout()) as one_off:
+                return await _send_sms_request(one_off, account_sid, auth, phone_number, data)
+        return await _send_sms_request(session, account_sid, auth, phone_number, data)
+        
+    except Exception as e:
+        logger.error(f"Error sending SMS to {phone_number}: {str(e)}")
+        return False
+
+async def _send_sms_request(session, account_sid, auth, phone_number, data):
+    """POST one Twilio message on `session`, kept undecorated so a send is tracked once"""
+    async with session.post(_twilio_messages_url(account_sid), data=data, auth=auth) as response:
+        if response.status >= 400:
+            logger.error(f"Error sending SMS to {phone_number}: Twilio returned {response.status}: {await response.text()}")
+            return False
+        result = await response.json(content_type=None)
+        logger.info(f"SMS sent successfully to {phone_number}. Message SID: {result.get('sid')}")
+        return True
+
+class NotificationLoop:
+    """
+    Event loop running in a daemon thread for async notification sends
+    
+    All sends share one aiohttp session, whose connector caps concurrent
+    provider connections at NOTIFICATION_MAX_CONNECTIONS. The thread starts on
+    first use and is recreated after a fork (e.g. in gunicorn workers).
+    """
+    
+    def __init__(self, max_connections=None):
+        self.max_connections = max_connections or int(os.getenv('NOTIFICATION_MAX_CONNECTIONS', 200))
+        self._loop = None
+        self._thread = None
+        self._session = None
+        self._pid = None
+        self._lock = threading.Lock()
+    
+    def _ensure_started(self):
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid():
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name='notification-loop', daemon=True)
+                self._thread.start()
+                self._session = None
+                self._pid = os.getpid()
+            return self._loop
+    
+    async def _get_session(self):
+        # Only called on the loop thread, so no locking is needed
+        if self._session is None:
+            import aiohttp
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections),
+                timeout=_client_timeout()
+            )
+        return self._session
+    
+    def submit(self, sender, *args, **kwargs):
+        """
+        Schedule an async sender on the loop with the shared session
+        
+        Returns:
+            concurrent.futures.Future: Resolves to the sender's result
+        """
+        async def run():
+            return await sender(*args, session=await self._get_session(), **kwargs)
+        return asyncio.run_coroutine_threadsafe(run(), self._ensure_started())
+    
+    def shutdown(self, timeout=5):
+        """Wait up to `timeout` seconds for in-flight sends, then close the session and stop the loop"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            if loop is None or self._pid != os.getpid():
+                return
+            self._loop = self._thread = None
+        
+        async def drain():
+            pending = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            if pending:
+                await asyncio.wait(pending, timeout=timeout)
+            if self._session is not None:
+                await self._session.close()
+                self._session = None
+        
+        try:
+            asyncio.run_coroutine_threadsafe(drain(), loop).result(timeout + 1)
+        except Exception as e:
+            logger.warning(f"Notification loop did not drain cleanly: {str(e)}")
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout=1)
+
+notification_loop = NotificationLoop()
+atexit.register(notification_loop.shutdown)
+
+def submit_status_email(to_email, subject, message, wait=False, timeout=None):
+    """
+    Send an email on the notification loop from synchronous code
+    
+    Args:
+        wait (bool): Block until sent and return the result instead of a Future
+        timeout (float): Seconds to wait when `wait` is set
+    
+    Returns:
+        concurrent.futures.Future or bool: Future resolving to the send result, or the result itself
+    """
+    future = notification_loop.submit(send_status_email_async, to_email, subject, message)
+    return future.result(timeout) if wait else future
+
+def submit_sms_notification(phone_number, message, wait=False, timeout=None):
+    """
+    Send an SMS on the notification loop from synchronous code
+    
+    Args:
+        wait (bool): Block until sent and return the result instead of a Future
+        timeout (float): Seconds to wait when `wait` is set
+    
+    Returns:
+        concurrent.futures.Future or bool: Future resolving to the send result, or the result itself
+    """
+    future = notification_loop.submit(send_sms_notification_async, phone_number, message)
+    return future.result(timeout) if wait else future
+
 def format_email_html(message):
     """
     Format plain text message into HTML for better email presentation
@@ -257,6 +486,42 @@ The Jiseti Admin Team"""
 
     return send_status_email(to_email, subject, message)
 
+def send_import_summary_email(to_email, user_name, summary):
+    """
+    Send one summary email after a bulk import, on the notification loop
+    
+    Args:
+        to_email (str): Importing user's email address
+        user_name (str): Importing user's name
+        summary (dict): Result of utils.importer.import_records
+    
+    Returns:
+        concurrent.futures.Future: Resolves to True if the email was sent
+    """
+    subject = f"Bulk Import Complete: {summary['imported']} Reports Added - Jiseti"
+    error_lines = '\n'.join(f"• Row {e['row']}: {e['error']}" for e in summary['errors'][:20])
+    more_errors = summary['failed'] - min(len(summary['errors']), 20)
+    message = f"""Hello {user_name},
+
+Your bulk import has finished. ✅
+
+📋 Import Summary:
+Rows received: {summary['total']}
+Reports imported: {summary['imported']}
+Rows with errors: {summary['failed']}
+
+{f'Rows that could not be imported:{chr(10)}{error_lines}' if error_lines else ''}
+{f'...and {more_errors} more (see the import response for details)' if more_errors > 0 else ''}
+
+Imported reports are saved as drafts in your dashboard, where you can review them before submission.
+
+Thank you for helping build a more transparent Africa!
+
+Best regards,
+The Jiseti Admin Team"""
+
+    return submit_status_email(to_email, subject, message)
+
 def send_anonymous_report_confirmation(email, tracking_token, record_title):
     """
     Send confirmation for anonymous reports
@@ -0,0 +1,49 @@
+# utils/health.py
+import threading
+import time
+
+from utils.metrics import record_cache_lookup
+
+class CachedProbe:
+    """
+    Run an expensive health check at most once per `ttl` seconds
+
+    The check callable should raise on failure. Results (including failures)
+    are cached so that frequent readiness probes do not hit the database.
+    """
+
+    def __init__(self, name, check, ttl=5.0):
+        self.name = name
+        self.check = check
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._result = None
+        self._expires = 0.0
+
+    def __call__(self):
+        """
+        Returns:
+            dict: {'ok': bool, 'error': str or None, 'checked_at': epoch seconds}
+        """
+        now = time.monotonic()
+        result = self._result
+        if result is not None and now < self._expires:
+            record_cache_lookup(self.name, hit=True)
+            return result
+
+        with self._lock:
+            # Another thread may have refreshed while we waited
+            if self._result is not None and time.monotonic() < self._expires:
+                record_cache_lookup(self.name, hit=True)
+                return self._result
+
+            record_cache_lookup(self.name, hit=False)
+            try:
+                self.check()
+                result = {'ok': True, 'error': None, 'checked_at': time.time()}
+            except Exception as e:
+                result = {'ok': False, 'error': str(e), 'checked_at': time.time()}
+
+            self._result = result
+            self._expires = time.monotonic() + self.ttl
+            return result
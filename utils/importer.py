@@ -0,0 +1,309 @@
+# utils/importer.py
+import codecs
+import csv
+import io
+import json
+import logging
+from datetime import datetime
+
+from models import db, Record, Media, NormalUser
+from utils.changes import record_changes, CHANGE_CREATED
+from utils.similarity import index_records
+from utils.triage import triage_priority
+from utils.validators import validate_coordinates_batch, validate_media_urls, mask_errors
+
+logger = logging.getLogger(__name__)
+
+VALID_TYPES = ['red-flag', 'intervention', 'incident', 'complaint', 'suggestion', 'emergency']
+VALID_URGENCY_LEVELS = ['low', 'medium', 'high', 'critical']
+FORMATS = ('json', 'ndjson', 'csv')
+
+READ_SIZE = 64 * 1024
+
+def detect_format(content_type, filename=None):
+    """Pick the import format from a filename extension or content type, or None if unsupported"""
+    if filename:
+        extension = filename.rsplit('.', 1)[-1].lower()
+        if extension in ('ndjson', 'jsonl'):
+            return 'ndjson'
+        if extension in ('json', 'csv'):
+            return extension
+    content_type = (content_type or '').split(';')[0].strip().lower()
+    if content_type in ('application/x-ndjson', 'application/ndjson', 'application/jsonl'):
+        return 'ndjson'
+    if content_type == 'application/json':
+        return 'json'
+    if content_type in ('text/csv', 'application/csv'):
+        return 'csv'
+    return None
+
+def _iter_text(stream):
+    """Decode a binary stream in chunks without reading it all"""
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    while True:
+        chunk = stream.read(READ_SIZE)
+        if not chunk:
+            tail = decoder.decode(b'', final=True)
+            if tail:
+                yield tail
+            return
+        yield decoder.decode(chunk)
+
+def iter_json_array(stream):
+    """
+    Yield the elements of a top-level JSON array incrementally
+
+    Raises:
+        ValueError: If the body is not a well-formed JSON array
+    """
+    decoder = json.JSONDecoder()
+    chunks = _iter_text(stream)
+    buffer, position, started = '', 0, False
+
+    def fill():
+        nonlocal buffer, position
+        chunk = next(chunks, None)
+        if chunk is None:
+            return False
+        buffer = buffer[position:] + chunk
+        position = 0
+        return True
+
+    while True:
+        # Skip whitespace and separators up to the next element
+        while True:
+            while position < len(buffer) and buffer[position] in ' \t\r\n':
+                position += 1
+            if position < len(buffer):
+                break
+            if not fill():
+                raise ValueError('Unexpected end of JSON array')
+
+        char = buffer[position]
+        if not started:
+            if char != '[':
+                raise ValueError('Expected a JSON array')
+            started = True
+            position += 1
+            continue
+        if char == ']':
+            return
+        if char == ',':
+            position += 1
+            continue
+
+        while True:
+            try:
+                element, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # Element spans beyond the buffer - read more, or fail at end of input
+                if not fill():
+                    raise ValueError('Malformed JSON array')
+                continue
+            # A number at the buffer edge may continue in the next chunk
+            if end == len(buffer) and not isinstance(element, (dict, list, str)) and fill():
+                continue
+            break
+        position = end
+        yield element
+
+def iter_ndjson(stream):
+    """Yield one parsed value per non-blank line; unparseable lines yield a ValueError"""
+    for line in io.TextIOWrapper(stream, encoding='utf-8-sig'):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            yield ValueError(f'Invalid JSON: {e.msg}')
+
+def iter_csv(stream):
+    """Yield one dict per CSV row, keyed by the header row"""
+    for row in csv.DictReader(io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')):
+        yield {key.strip(): value.strip() if isinstance(value, str) else value
+               for key, value in row.items() if key}
+
+def iter_rows(stream, fmt):
+    """Yield raw rows from an upload stream in the given format"""
+    if fmt == 'json':
+        return iter_json_array(stream)
+    if fmt == 'ndjson':
+        return iter_ndjson(stream)
+    return iter_csv(stream)
+
+def _optional(value):
+    """Treat empty CSV cells as missing"""
+    return None if value == '' else value
+
+def validate_rows(rows):
+    """
+    Validate a chunk of import rows column by column with the batch validators
+
+    Args:
+        rows (list): Raw rows from JSON, NDJSON or CSV
+
+    Returns:
+        tuple: ([(index, values dict)] for valid rows, [(index, error message)] for invalid rows),
+        indexes being positions in `rows`
+    """
+    errors = {}
+    candidates = []
+    for index, row in enumerate(rows):
+        if isinstance(row, Exception):
+            errors[index] = str(row)
+        elif not isinstance(row, dict):
+            errors[index] = 'Row must be an object'
+        else:
+            candidates.append((index, row))
+
+    indexes = [index for index, _ in candidates]
+    titles = [str(row.get('title') or '').strip() for _, row in candidates]
+    types = [row.get('type') or 'red-flag' for _, row in candidates]
+    urgencies = [row.get('urgency_level') or 'medium' for _, row in candidates]
+    latitudes = [_optional(row.get('latitude')) for _, row in candidates]
+    longitudes = [_optional(row.get('longitude')) for _, row in candidates]
+    image_urls = [_optional(row.get('image_url')) for _, row in candidates]
+    video_urls = [_optional(row.get('video_url')) for _, row in candidates]
+    locations = [_optional(row.get('location_name')) for _, row in candidates]
+
+    # Checks in priority order - a row reports the first one it fails
+    coordinates_ok = validate_coordinates_batch(latitudes, longitudes)
+    checks = [
+        ([bool(t) for t in titles], 'Title is required'),
+        ([len(t) <= 200 for t in titles], 'Title must be at most 200 characters'),
+        ([t in VALID_TYPES for t in types], f'Type must be one of: {", ".join(VALID_TYPES)}'),
+        ([u in VALID_URGENCY_LEVELS for u in urgencies], f'Urgency level must be one of: {", ".join(VALID_URGENCY_LEVELS)}'),
+        ([ok and (lat is None) == (lng is None) for ok, lat, lng in zip(coordinates_ok, latitudes, longitudes)],
+         'Invalid coordinates provided'),
+        (validate_media_urls(image_urls, 'image'), 'Invalid image URL format'),
+        (validate_media_urls(video_urls, 'video'), 'Invalid video URL format'),
+        ([loc is None or isinstance(loc, str) for loc in locations], 'Location name must be a string'),
+        ([not isinstance(loc, str) or len(loc) <= 255 for loc in locations],
+         'Location name must be at most 255 characters'),
+    ]
+    for mask, message in checks:
+        for position, _ in mask_errors(mask, message):
+            errors.setdefault(indexes[position], message)
+
+    valid = []
+    for position, (index, row) in enumerate(candidates):
+        if index in errors:
+            continue
+        valid.append((index, {
+            'title': titles[position],
+            'description': str(row.get('description') or '').strip(),
+            'type': types[position],
+            'urgency_level': urgencies[position],
+            'latitude': float(latitudes[position]) if latitudes[position] is not None else None,
+            'longitude': float(longitudes[position]) if longitudes[position] is not None else None,
+            'location_name': locations[position],
+            'image_url': image_urls[position],
+            'video_url': video_urls[position],
+        }))
+
+    return valid, sorted(errors.items())
+
+def _insert_chunk(chunk, user_id, creator_name):
+    """Bulk insert a chunk of validated rows and their media, then commit"""
+    now = datetime.utcnow()
+    record_rows = [{
+        'title': values['title'],
+        'description': values['description'],
+        'type': values['type'],
+        'urgency_level': values['urgency_level'],
+        'latitude': values['latitude'],
+        'longitude': values['longitude'],
+        'location_name': values['location_name'],
+        'status': 'draft',
+        'normal_user_id': user_id,
+        'creator_name': creator_name,
+        'is_anonymous': False,
+        'vote_count': 0,
+        'triage_priority': triage_priority(values['urgency_level'], values['type'], 0, now, 'draft', None),
+        # External URLs are never processed, so imported records have no thumbnail
+        'media_count': bool(values['image_url']) + bool(values['video_url']),
+        'created_at': now,
+        'updated_at': now,
+    } for values in chunk]
+
+    record_ids = db.session.execute(
+        db.insert(Record).returning(Record.id, sort_by_parameter_order=True), record_rows
+    ).scalars().all()
+
+    # One row per asset: the image first, then the video
+    media_rows = [{
+        'record_id': record_id,
+        'media_type': media_type,
+        'media_url': values[f'{media_type}_url'],
+        'position': position,
+        'uploaded_at': now,
+    } for record_id, values in zip(record_ids, chunk)
+        for position, media_type in enumerate(('image', 'video')) if values[f'{media_type}_url']]
+    if media_rows:
+        db.session.execute(db.insert(Media), media_rows)
+
+    record_changes([{
+        'record_id': record_id,
+        'user_id': user_id,
+        'status': 'draft',
+        'vote_count': 0,
+    } for record_id in record_ids], CHANGE_CREATED)
+
+    index_records([(record_id, values['title'], values['description'])
+                   for record_id, values in zip(record_ids, chunk)])
+
+    db.session.commit()
+
+def import_records(rows, user_id, chunk_size=1000, max_errors=1000):
+    """
+    Validate and insert rows in chunks, one commit per chunk
+
+    Rows are consumed lazily, so memory use is bounded by the chunk size.
+
+    Args:
+        rows (iterable): Raw rows, e.g. from iter_rows()
+        user_id (int): Owner of the imported records
+        chunk_size (int): Rows per bulk insert and commit
+        max_errors (int): Per-row errors kept for the response
+
+    Returns:
+        dict: {'total', 'imported', 'failed', 'errors': [{'row', 'error'}], 'errors_truncated'}
+    """
+    summary = {'total': 0, 'imported': 0, 'failed': 0, 'errors': [], 'errors_truncated': False}
+    creator_name = db.session.query(NormalUser.name).filter_by(id=user_id).scalar()
+
+    def fail(row_number, message):
+        summary['failed'] += 1
+        if len(summary['errors']) < max_errors:
+            summary['errors'].append({'row': row_number, 'error': message})
+        else:
+            summary['errors_truncated'] = True
+
+    def process(batch):
+        first_row = summary['total'] + 1
+        summary['total'] += len(batch)
+        valid, errors = validate_rows(batch)
+        for index, message in errors:
+            fail(first_row + index, message)
+        if valid:
+            _insert_chunk([values for _, values in valid], user_id, creator_name)
+            summary['imported'] += len(valid)
+
+    batch = []
+    try:
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= chunk_size:
+                process(batch)
+                batch = []
+    except (ValueError, csv.Error, UnicodeDecodeError) as e:
+        # The stream itself is unreadable past this point
+        process(batch)
+        batch = []
+        fail(summary['total'] + 1, f'Could not parse upload: {str(e)}')
+
+    if batch:
+        process(batch)
+
+    return summary
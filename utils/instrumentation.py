@@ -0,0 +1,156 @@
+# utils/instrumentation.py
+import json
+import logging
+import os
+import re
+import time
+from collections import Counter, deque
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Statement shape normalization - literals and IN lists collapsed so that
+# "SELECT ... WHERE id = 1" and "... WHERE id = 2" count as the same shape
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\((?:[^()]*)\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+_recent_requests = deque(maxlen=100)
+_listeners_installed = False
+
+def normalize_statement(statement):
+    """Reduce a SQL statement to its shape for repeat detection"""
+    shape = _STRING_LITERAL.sub('?', statement)
+    shape = _NUMBER_LITERAL.sub('?', shape)
+    shape = _IN_LIST.sub('IN (?)', shape)
+    return _WHITESPACE.sub(' ', shape).strip()
+
+def detect_n_plus_one(statements, threshold=5):
+    """
+    Find statement shapes repeated within a single request
+
+    Args:
+        statements (list): SQL statements executed during the request
+        threshold (int): Minimum repetitions to report a shape
+
+    Returns:
+        list: [{'statement': shape, 'count': n}] sorted by count, highest first
+    """
+    counts = Counter(normalize_statement(s) for s in statements)
+    return [
+        {'statement': shape, 'count': count}
+        for shape, count in counts.most_common()
+        if count >= threshold
+    ]
+
+class RequestQueryStats:
+    """SQL statements and timings collected for one request"""
+
+    __slots__ = ('started', 'query_count', 'db_time', 'slowest', 'slowest_time', 'statements')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.query_count = 0
+        self.db_time = 0.0
+        self.slowest = None
+        self.slowest_time = 0.0
+        self.statements = []
+
+    def record(self, statement, duration):
+        self.query_count += 1
+        self.db_time += duration
+        self.statements.append(statement)
+        if duration > self.slowest_time:
+            self.slowest_time = duration
+            self.slowest = statement
+
+def current_stats():
+    """Stats for the active request, or None outside a request"""
+    if not has_request_context():
+        return None
+    return g.get('_query_stats')
+
+def recent_requests():
+    """Summaries of the most recent instrumented requests, newest first"""
+    return list(reversed(_recent_requests))
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('_query_start', []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('_query_start')
+    if not starts:
+        return
+    duration = time.perf_counter() - starts.pop()
+    stats = current_stats()
+    if stats is not None:
+        stats.record(statement, duration)
+
+def _install_engine_listeners():
+    """Listen on every Engine once, so replicas and test engines are covered too"""
+    global _listeners_installed
+    if _listeners_installed:
+        return
+    event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+    _listeners_installed = True
+
+def init_instrumentation(app):
+    """
+    Record per-request SQL query count, DB time, slowest statement and N+1 suspects
+
+    Results are exposed through the Server-Timing response header, a structured
+    log line per request and recent_requests() for the admin debug endpoint.
+    """
+    app.config.setdefault('SQL_INSTRUMENTATION', os.getenv('SQL_INSTRUMENTATION', 'true').lower() == 'true')
+    app.config.setdefault('SQL_N_PLUS_ONE_THRESHOLD', int(os.getenv('SQL_N_PLUS_ONE_THRESHOLD', 5)))
+    app.config.setdefault('SQL_SLOW_REQUEST_MS', float(os.getenv('SQL_SLOW_REQUEST_MS', 500)))
+
+    if not app.config['SQL_INSTRUMENTATION']:
+        return
+
+    _install_engine_listeners()
+
+    @app.before_request
+    def start_query_stats():
+        g._query_stats = RequestQueryStats()
+
+    @app.after_request
+    def finish_query_stats(response):
+        stats = g.pop('_query_stats', None)
+        if stats is None:
+            return response
+
+        total_ms = (time.perf_counter() - stats.started) * 1000
+        db_ms = stats.db_time * 1000
+        suspects = detect_n_plus_one(stats.statements, app.config['SQL_N_PLUS_ONE_THRESHOLD'])
+
+        response.headers.add(
+            'Server-Timing',
+            f'db;dur={db_ms:.2f};desc="{stats.query_count} queries", app;dur={total_ms:.2f}'
+        )
+
+        summary = {
+            'method': request.method,
+            'path': request.path,
+            'endpoint': request.endpoint,
+            'status': response.status_code,
+            'duration_ms': round(total_ms, 2),
+            'query_count': stats.query_count,
+            'db_time_ms': round(db_ms, 2),
+            'slowest_statement': normalize_statement(stats.slowest) if stats.slowest else None,
+            'slowest_ms': round(stats.slowest_time * 1000, 2),
+            'n_plus_one': suspects,
+        }
+        _recent_requests.append(summary)
+
+        if suspects or total_ms >= app.config['SQL_SLOW_REQUEST_MS']:
+            logger.warning(json.dumps(summary))
+        else:
+            logger.debug(json.dumps(summary))
+
+        return response
@@ -0,0 +1,439 @@
+# utils/media.py
+import hashlib
+import io
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy.exc import IntegrityError
+
+from models import db, Media, MediaBlob, MediaVariant, Record
+from utils.changes import record_changes, CHANGE_UPDATED
+from utils.summaries import refresh_summaries
+from utils.storage import get_storage
+
+logger = logging.getLogger(__name__)
+
+PENDING = 'pending'
+PROCESSING = 'processing'
+READY = 'ready'
+FAILED = 'failed'
+SKIPPED = 'skipped'  # e.g. a video when ffmpeg is not installed
+
+# (name, longest edge in pixels); larger sizes are skipped for smaller originals
+IMAGE_VARIANTS = (('thumb', 160), ('small', 480), ('medium', 960), ('large', 1600))
+POSTER_VARIANTS = (('thumb', 160), ('poster', 960))
+VARIANT_FORMAT = ('WEBP', 'image/webp', '.webp')
+VARIANT_QUALITY = 80
+ORIGINAL_QUALITY = 95
+# Formats whose metadata may carry EXIF (including GPS location)
+EXIF_FORMATS = {'JPEG': 'image/jpeg', 'PNG': 'image/png', 'WEBP': 'image/webp'}
+
+def init_media_processing(app):
+    """Read media pipeline settings and register the process-media command"""
+    app.config.setdefault('MEDIA_PROCESSING', os.getenv('MEDIA_PROCESSING', 'off' if app.testing else 'pool'))
+    app.config.setdefault('MEDIA_PROCESS_WORKERS', int(os.getenv('MEDIA_PROCESS_WORKERS', max(1, (os.cpu_count() or 2) // 2))))
+    app.config.setdefault('MEDIA_FFMPEG', os.getenv('MEDIA_FFMPEG', 'ffmpeg'))
+    app.config.setdefault('MEDIA_FFPROBE', os.getenv('MEDIA_FFPROBE', 'ffprobe'))
+    app.config.setdefault('MEDIA_VIDEO_HEIGHT', int(os.getenv('MEDIA_VIDEO_HEIGHT', 720)))
+    app.config.setdefault('MEDIA_LISTING_IMAGE_WIDTH', int(os.getenv('MEDIA_LISTING_IMAGE_WIDTH', 480)))
+    # A worker that died mid-job leaves its rows in processing; they are retaken after this long
+    app.config.setdefault('MEDIA_CLAIM_TIMEOUT_SECONDS', int(os.getenv('MEDIA_CLAIM_TIMEOUT_SECONDS', 3600)))
+    app.cli.add_command(process_media_command)
+
+# ------------------ CPU Work (worker processes, no app or database access) ------------------
+
+def render_image(data, sizes=IMAGE_VARIANTS):
+    """
+    Measure an image, strip its metadata and render resized WebP variants
+
+    Args:
+        data (bytes): Original image
+        sizes (tuple): (name, longest edge) pairs; the first is always rendered
+
+    Returns:
+        dict: {'width', 'height', 'clean': original re-encoded without EXIF (None if it had
+        none), 'content_type', 'variants': [{'name', 'data', 'width', 'height'}]}
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(data)) as original:
+        image_format = original.format
+        has_exif = bool(original.getexif()) or 'exif' in original.info
+        # Apply the EXIF orientation before the metadata is dropped
+        image = ImageOps.exif_transpose(original)
+
+        clean = None
+        if has_exif and image_format in EXIF_FORMATS:
+            # Saving without exif= drops all EXIF tags, GPS location included
+            out = io.BytesIO()
+            image.save(out, format=image_format, quality=ORIGINAL_QUALITY)
+            clean = out.getvalue()
+
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+
+        longest = max(image.size)
+        variants = []
+        for index, (name, edge) in enumerate(sizes):
+            if index and edge >= longest:
+                break
+            resized = image.copy()
+            resized.thumbnail((edge, edge), Image.LANCZOS)
+            out = io.BytesIO()
+            resized.save(out, format=VARIANT_FORMAT[0], quality=VARIANT_QUALITY, method=4)
+            variants.append({'name': name, 'data': out.getvalue(), 'width': resized.width, 'height': resized.height})
+
+        return {
+            'width': image.width,
+            'height': image.height,
+            'clean': clean,
+            'content_type': EXIF_FORMATS.get(image_format),
+            'variants': variants,
+        }
+
+def render_video(source, workdir, ffmpeg, ffprobe, height):
+    """
+    Probe a video, transcode a metadata-free H.264 copy and render poster variants
+
+    Returns:
+        dict: {'width', 'height', 'duration', 'transcode': path, 'transcode_width',
+        'transcode_height', 'variants': poster variants as from render_image()}
+    """
+    def probe(path):
+        output = subprocess.run(
+            [ffprobe, '-v', 'error', '-select_streams', 'v:0', '-show_entries',
+             'stream=width,height:format=duration', '-of', 'json', path],
+            capture_output=True, check=True, timeout=60
+        ).stdout
+        info = json.loads(output)
+        stream = info['streams'][0]
+        return stream['width'], stream['height'], float(info.get('format', {}).get('duration') or 0)
+
+    width, height_in, duration = probe(source)
+
+    transcode = os.path.join(workdir, 'transcode.mp4')
+    subprocess.run(
+        [ffmpeg, '-y', '-v', 'error', '-i', source, '-map_metadata', '-1',
+         '-vf', f"scale=-2:'min({height},ih)'", '-c:v', 'libx264', '-preset', 'veryfast', '-crf', '28',
+         '-c:a', 'aac', '-b:a', '96k', '-movflags', '+faststart', transcode],
+        check=True, timeout=3600
+    )
+    transcode_width, transcode_height, _ = probe(transcode)
+
+    poster = os.path.join(workdir, 'poster.jpg')
+    subprocess.run(
+        [ffmpeg, '-y', '-v', 'error', '-ss', f'{min(1.0, duration / 2):.2f}', '-i', source,
+         '-frames:v', '1', poster],
+        check=True, timeout=120
+    )
+    with open(poster, 'rb') as f:
+        rendered = render_image(f.read(), POSTER_VARIANTS)
+
+    return {
+        'width': width,
+        'height': height_in,
+        'duration': duration,
+        'transcode': transcode,
+        'transcode_width': transcode_width,
+        'transcode_height': transcode_height,
+        'variants': rendered['variants'],
+    }
+
+# ------------------ Pipeline ------------------
+
+def variant_key(storage_key, name, extension):
+    """records/12/abc.jpg -> records/12/abc/thumb.webp"""
+    return f"{os.path.splitext(storage_key)[0]}/{name}{extension}"
+
+def _sibling_url(blob, key):
+    # Public URLs end with the storage key, whatever the backend
+    return blob.url[:len(blob.url) - len(blob.storage_key)] + key
+
+def _claimable(model, statuses):
+    """Filter for rows in `statuses`, or in processing with a claim older than MEDIA_CLAIM_TIMEOUT_SECONDS"""
+    stale_before = datetime.utcnow() - timedelta(seconds=current_app.config['MEDIA_CLAIM_TIMEOUT_SECONDS'])
+    return db.or_(
+        model.processing_status.in_(statuses),
+        db.and_(model.processing_status == PROCESSING,
+                db.or_(model.claimed_at.is_(None), model.claimed_at < stale_before))
+    )
+
+def _claim(model, row_id, statuses):
+    """Move a media or blob row to processing unless another worker has a live claim on it"""
+    claimed = db.session.execute(
+        db.update(model)
+        .where(model.id == row_id, _claimable(model, statuses))
+        .values(processing_status=PROCESSING, claimed_at=datetime.utcnow()),
+        execution_options={'synchronize_session': False}
+    ).rowcount
+    db.session.commit()
+    return bool(claimed)
+
+def _attach_blob(media, content_hash):
+    """
+    Link a Media row to the blob for its content, creating the blob for the first copy
+
+    A duplicate upload is repointed at the stored copy and its own object deleted.
+
+    Returns:
+        MediaBlob: The linked blob
+    """
+    upload_key = media.storage_key
+
+    def link(blob):
+        media.blob = blob
+        if blob.storage_key != upload_key:
+            media.media_url = blob.url
+
+    blob = MediaBlob.query.filter_by(content_hash=content_hash).first()
+    try:
+        if blob is None:
+            blob = MediaBlob(content_hash=content_hash, media_type=media.media_type, storage_key=upload_key,
+                             url=media.media_url, file_size=media.file_size, processing_status=PENDING)
+            db.session.add(blob)
+        link(blob)
+        db.session.commit()
+    except IntegrityError:
+        # A concurrent job registered the same content first
+        db.session.rollback()
+        blob = MediaBlob.query.filter_by(content_hash=content_hash).one()
+        link(blob)
+        db.session.commit()
+
+    if blob.storage_key != upload_key:
+        get_storage().delete(upload_key)
+    return blob
+
+def _settle(blob, status, media_id=None):
+    """
+    Record a blob's outcome on every Media row sharing it, or only on `media_id` (caller commits)
+
+    The blob row is written first: a job linking another copy reads its status
+    under a row lock, so it either sees this outcome or is already visible to
+    the media update below.
+    """
+    blob.processing_status = status
+    if status == READY and blob.processed_at is None:
+        blob.processed_at = datetime.utcnow()
+    db.session.flush()
+
+    linked = Media.blob_id == blob.id if media_id is None else Media.id == media_id
+    db.session.execute(
+        db.update(Media).where(linked).values(
+            processing_status=status, processed_at=blob.processed_at, width=blob.width, height=blob.height,
+            duration_seconds=blob.duration_seconds, file_size=blob.file_size
+        ),
+        execution_options={'synchronize_session': False}
+    )
+    if status == READY:
+        # Listings now serve the variants, so feed clients should refresh the records
+        rows = (db.session.query(Record.id, Record.normal_user_id, Record.status, Record.vote_count)
+                .join(Media, Media.record_id == Record.id)
+                .filter(linked)
+                .distinct()
+                .all())
+        refresh_summaries([row.id for row in rows], columns=('thumbnail_url',))
+        record_changes([{'record_id': row.id, 'user_id': row.normal_user_id, 'status': row.status,
+                         'vote_count': row.vote_count} for row in rows], CHANGE_UPDATED)
+
+def process_media(media_id, executor=None, retry_failed=False):
+    """
+    Run the pipeline for one uploaded Media row
+
+    The stored file is hashed first. Content seen before reuses its blob, so
+    duplicates are neither stored twice nor rendered again; otherwise the blob
+    is rendered and its variants recorded. CPU-heavy rendering runs in
+    `executor` (a process pool) when given, otherwise inline. Storage
+    reads/writes and database updates happen here.
+
+    Returns:
+        str: Processing status after this job, or None if the row was not claimable
+    """
+    statuses = [PENDING, FAILED] if retry_failed else [PENDING]
+    if not _claim(Media, media_id, statuses):
+        return None
+
+    def run(func, *args):
+        return executor.submit(func, *args).result() if executor else func(*args)
+
+    media = db.session.get(Media, media_id)
+    store = get_storage()
+    config = current_app.config
+    blob = media.blob
+    blob_id = media.blob_id
+    data = None
+    variants = []
+
+    try:
+        if blob is None:
+            if media.media_type == 'image':
+                # Images are read whole for rendering anyway, so hash the same bytes
+                data = store.read(media.storage_key)
+                blob = _attach_blob(media, hashlib.sha256(data).hexdigest())
+            else:
+                blob = _attach_blob(media, store.sha256(media.storage_key))
+            blob_id = blob.id
+
+        if not _claim(MediaBlob, blob_id, statuses):
+            # Another copy of this content was processed first, or is being processed
+            # and will settle this row when it finishes
+            blob = MediaBlob.query.filter_by(id=blob_id).with_for_update().one()
+            if blob.processing_status != PROCESSING:
+                _settle(blob, blob.processing_status, media_id)
+            db.session.commit()
+            return media.processing_status
+
+        if blob.media_type == 'image':
+            result = run(render_image, data if data is not None else store.read(blob.storage_key))
+            if result['clean'] is not None:
+                # Replace the original so the stored file no longer carries EXIF location
+                store.save(blob.storage_key, result['clean'], result['content_type'])
+                blob.file_size = len(result['clean'])
+            blob.width, blob.height = result['width'], result['height']
+
+        else:
+            if not (shutil.which(config['MEDIA_FFMPEG']) and shutil.which(config['MEDIA_FFPROBE'])):
+                logger.warning(f"ffmpeg not available, media {media_id} left unprocessed")
+                _settle(blob, SKIPPED)
+                db.session.commit()
+                return SKIPPED
+
+            with tempfile.TemporaryDirectory(prefix='jiseti-media-') as workdir:
+                source = os.path.join(workdir, 'source' + os.path.splitext(blob.storage_key)[1])
+                store.download(blob.storage_key, source)
+                result = run(render_video, source, workdir, config['MEDIA_FFMPEG'], config['MEDIA_FFPROBE'],
+                             config['MEDIA_VIDEO_HEIGHT'])
+                key = variant_key(blob.storage_key, f"{config['MEDIA_VIDEO_HEIGHT']}p", '.mp4')
+                store.save(key, result['transcode'], 'video/mp4')
+                variants.append({
+                    'name': f"{config['MEDIA_VIDEO_HEIGHT']}p", 'storage_key': key, 'content_type': 'video/mp4',
+                    'width': result['transcode_width'], 'height': result['transcode_height'],
+                    'file_size': os.path.getsize(result['transcode']),
+                })
+            blob.width, blob.height, blob.duration_seconds = result['width'], result['height'], result['duration']
+
+        for rendered in result['variants']:
+            key = variant_key(blob.storage_key, rendered['name'], VARIANT_FORMAT[2])
+            store.save(key, rendered['data'], VARIANT_FORMAT[1])
+            variants.append({
+                'name': rendered['name'], 'storage_key': key, 'content_type': VARIANT_FORMAT[1],
+                'width': rendered['width'], 'height': rendered['height'], 'file_size': len(rendered['data']),
+            })
+
+        MediaVariant.query.filter_by(blob_id=blob.id).delete(synchronize_session=False)
+        db.session.execute(db.insert(MediaVariant), [
+            {**variant, 'blob_id': blob.id, 'url': _sibling_url(blob, variant['storage_key'])}
+            for variant in variants
+        ])
+        _settle(blob, READY)
+        db.session.commit()
+        return READY
+
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Media processing failed for media {media_id}: {str(e)}")
+        failed = Media.id == media_id
+        if blob_id is not None:
+            db.session.execute(
+                db.update(MediaBlob).where(MediaBlob.id == blob_id).values(processing_status=FAILED),
+                execution_options={'synchronize_session': False}
+            )
+            failed = db.or_(failed, Media.blob_id == blob_id)
+        db.session.execute(
+            db.update(Media).where(failed).values(processing_status=FAILED),
+            execution_options={'synchronize_session': False}
+        )
+        db.session.commit()
+        return FAILED
+
+class MediaProcessor:
+    """
+    Background media jobs for one process
+
+    A few coordinator threads handle storage and database work while a process
+    pool does the CPU-bound rendering, so image resizing never competes with
+    request threads for the GIL. Both pools are created lazily and again after
+    a fork.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = None
+        self._threads = None
+        self._processes = None
+
+    def _ensure_started(self, workers):
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._threads = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='media')
+            # spawn: forking a process that already runs threads can copy held locks
+            self._processes = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            self._pid = os.getpid()
+
+    def submit(self, app, media_id):
+        self._ensure_started(app.config['MEDIA_PROCESS_WORKERS'])
+        return self._threads.submit(self._run, app, media_id)
+
+    def _run(self, app, media_id):
+        with app.app_context():
+            try:
+                return process_media(media_id, self._processes)
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Media job {media_id} crashed: {str(e)}")
+            finally:
+                db.session.remove()
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            if self._pid == os.getpid():
+                self._threads.shutdown(wait=wait)
+                self._processes.shutdown(wait=wait)
+            self._pid = None
+
+media_processor = MediaProcessor()
+
+def submit_media_processing(media_id):
+    """Queue a freshly uploaded Media row according to MEDIA_PROCESSING (pool, inline or off)"""
+    mode = current_app.config['MEDIA_PROCESSING']
+    if mode == 'pool':
+        media_processor.submit(current_app._get_current_object(), media_id)
+    elif mode == 'inline':
+        process_media(media_id)
+
+@click.command('process-media')
+@click.option('--retry-failed', is_flag=True, help='Also retry media whose processing failed')
+@with_appcontext
+def process_media_command(retry_failed):
+    """Process uploaded media still waiting (e.g. queued before a restart, abandoned by a dead worker or with MEDIA_PROCESSING=off)"""
+    statuses = [PENDING, FAILED] if retry_failed else [PENDING]
+    media_ids = [row.id for row in db.session.query(Media.id)
+                 .filter(_claimable(Media, statuses)).order_by(Media.id)]
+
+    app = current_app._get_current_object()
+    workers = app.config['MEDIA_PROCESS_WORKERS']
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as processes:
+        def run(media_id):
+            with app.app_context():
+                try:
+                    return process_media(media_id, processes, retry_failed)
+                finally:
+                    db.session.remove()
+
+        with ThreadPoolExecutor(max_workers=workers) as threads:
+            results = list(threads.map(run, media_ids))
+    click.echo(f"Processed {results.count(READY)} of {len(media_ids)} media item(s); "
+               f"{results.count(FAILED)} failed, {results.count(SKIPPED)} skipped")
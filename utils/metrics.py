@@ -0,0 +1,225 @@
+# utils/metrics.py
+import inspect
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+
+from flask import g, request
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class _Metric:
+    """Base for label-keyed metrics kept in plain dicts behind one lock"""
+
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(labels.get(n, '') for n in self.labelnames)
+
+    def header(self):
+        return [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}'
+                for key, value in items]
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, amount, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, amount)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket (non-cumulative) counts, then sum and total count
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += amount
+            state[2] += 1
+
+    def value(self, **labels):
+        state = self._values.get(self._key(labels))
+        return state[2] if state else 0
+
+    def samples(self):
+        with self._lock:
+            items = [(key, (list(state[0]), state[1], state[2])) for key, state in self._values.items()]
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = 'le="+Inf"' if bound == float('inf') else f'le="{bound!r}"'
+                lines.append(f'{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(self.labelnames, key)} {total!r}')
+            lines.append(f'{self.name}_count{_format_labels(self.labelnames, key)} {count}')
+        return lines
+
+class Registry:
+    """Holds metrics and renders them in the Prometheus text exposition format"""
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = {}
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, name, collector):
+        """Register a callable run just before each scrape (e.g. to refresh pool gauges)"""
+        self._collectors[name] = collector
+
+    def render(self):
+        for collector in list(self._collectors.values()):
+            collector()
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.header())
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+registry = Registry()
+
+REQUEST_LATENCY = registry.register(Histogram(
+    'jiseti_http_request_duration_seconds', 'HTTP request latency by route', ('method', 'route')))
+REQUESTS_TOTAL = registry.register(Counter(
+    'jiseti_http_requests_total', 'HTTP requests by route and status code', ('method', 'route', 'status')))
+REQUESTS_IN_FLIGHT = registry.register(Gauge(
+    'jiseti_http_requests_in_flight', 'HTTP requests currently being served'))
+DB_POOL = registry.register(Gauge(
+    'jiseti_db_pool_connections', 'Database pool connections by state', ('engine', 'state')))
+DB_POOL_CHECKOUTS = registry.register(Counter(
+    'jiseti_db_pool_checkouts_total', 'Connections checked out of the database pool', ('engine',)))
+NOTIFICATION_LATENCY = registry.register(Histogram(
+    'jiseti_notification_send_seconds', 'Notification provider round-trip time', ('channel',)))
+NOTIFICATIONS_TOTAL = registry.register(Counter(
+    'jiseti_notifications_total', 'Notifications sent by channel and outcome', ('channel', 'outcome')))
+CACHE_REQUESTS = registry.register(Counter(
+    'jiseti_cache_requests_total', 'Cache lookups by cache and result', ('cache', 'result')))
+
+def record_cache_lookup(cache, hit):
+    """Count a cache hit or miss for the hit-ratio metrics"""
+    CACHE_REQUESTS.inc(cache=cache, result='hit' if hit else 'miss')
+
+def track_notification(channel):
+    """Decorator timing a notification sender (sync or async) and counting its boolean outcome"""
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                ok = False
+                try:
+                    ok = await func(*args, **kwargs)
+                    return ok
+                finally:
+                    NOTIFICATION_LATENCY.observe(time.perf_counter() - started, channel=channel)
+                    NOTIFICATIONS_TOTAL.inc(channel=channel, outcome='sent' if ok else 'failed')
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            ok = False
+            try:
+                ok = func(*args, **kwargs)
+                return ok
+            finally:
+                NOTIFICATION_LATENCY.observe(time.perf_counter() - started, channel=channel)
+                NOTIFICATIONS_TOTAL.inc(channel=channel, outcome='sent' if ok else 'failed')
+        return wrapper
+    return decorator
+
+def _pool_collector(name, engine):
+    """Build a scrape-time collector reading the engine's pool state"""
+    def collect():
+        pool = engine.pool
+        for state, reader in (('size', 'size'), ('checked_out', 'checkedout'),
+                              ('checked_in', 'checkedin'), ('overflow', 'overflow')):
+            method = getattr(pool, reader, None)
+            if method is not None:
+                DB_POOL.set(method(), engine=name, state=state)
+    return collect
+
+def watch_engine(engine, name='primary'):
+    """Expose pool gauges and checkout counts for an engine"""
+    from sqlalchemy import event
+
+    event.listen(engine, 'checkout', lambda *args: DB_POOL_CHECKOUTS.inc(engine=name))
+    registry.add_collector(f'db_pool:{name}', _pool_collector(name, engine))
+
+def init_metrics(app):
+    """Record request latency, status and in-flight gauges for every request"""
+
+    @app.before_request
+    def start_request_metrics():
+        g._metrics_started = time.perf_counter()
+        REQUESTS_IN_FLIGHT.inc()
+
+    @app.after_request
+    def record_request_metrics(response):
+        started = g.get('_metrics_started')
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        if started is not None:
+            REQUEST_LATENCY.observe(time.perf_counter() - started, method=request.method, route=route)
+        REQUESTS_TOTAL.inc(method=request.method, route=route, status=response.status_code)
+        return response
+
+    @app.teardown_request
+    def finish_request_metrics(exc):
+        if g.pop('_metrics_started', None) is not None:
+            REQUESTS_IN_FLIGHT.dec()
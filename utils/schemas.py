@@ -0,0 +1,311 @@
+# utils/schemas.py
+from functools import wraps
+
+from flask import make_response, request
+
+from utils.validators import (
+    GMAIL_PATTERN, MEDIA_URL_PATTERN, MEDIA_EXTENSIONS, MEDIA_CONTENT_TYPES, PHONE_PATTERN, PHONE_SEPARATORS,
+)
+
+MISSING = object()
+
+RECORD_TYPES = ('red-flag', 'intervention', 'incident', 'complaint', 'suggestion', 'emergency')
+URGENCY_LEVELS = ('low', 'medium', 'high', 'critical')
+ADMIN_STATUSES = ('under-investigation', 'rejected', 'resolved')
+VOTE_TYPES = ('support', 'urgent')
+BULK_STATUS_FILTERS = frozenset(['status', 'type', 'urgency_level'])
+
+class Field:
+    """
+    One payload field, checked in a fixed order: presence, type, choices,
+    length and finally a custom check
+
+    Args:
+        kind (type): str, int, float, bool, list or dict; numbers and numeric
+            strings are converted for float fields
+        required (bool): Missing, null and empty values are rejected
+        default: Value used when the field is absent (not applied to partial schemas)
+        choices (iterable): Allowed values
+        fallback (bool): Replace values outside `choices` with `default` instead of failing
+        max_length (int): Maximum string length
+        items (type): Type every list element must have
+        check (callable): Extra predicate on the converted value
+        message (str): Error for an invalid value
+        required_message (str): Error for a missing value
+    """
+
+    __slots__ = ('name', 'kind', 'required', 'default', 'choices', 'fallback', 'max_length', 'items',
+                 'check', 'message', 'required_message')
+
+    def __init__(self, kind=str, required=False, default=MISSING, choices=None, fallback=False,
+                 max_length=None, items=None, check=None, message=None, required_message=None):
+        self.name = None
+        self.kind = kind
+        self.required = required
+        self.default = default
+        self.choices = frozenset(choices) if choices is not None else None
+        self.fallback = fallback
+        self.max_length = max_length
+        self.items = items
+        self.check = check
+        self.message = message
+        self.required_message = required_message
+
+    def compile(self, name):
+        """
+        Build this field's cleaning function once, with only the steps it uses
+
+        Returns:
+            callable: value -> (converted value, None) or (None, error message)
+        """
+        self.name = name
+        invalid = self.message or f'Invalid {name}'
+        kind, choices, fallback, default = self.kind, self.choices, self.fallback, self.default
+        max_length, items, check = self.max_length, self.items, self.check
+
+        def finish(value):
+            if choices is not None and value not in choices:
+                return (default, None) if fallback else (None, invalid)
+            if max_length is not None and len(value) > max_length:
+                return None, invalid
+            if items is not None and not all(v.__class__ is items for v in value):
+                return None, invalid
+            if check is not None and not check(value):
+                return None, invalid
+            return value, None
+
+        if kind is float:
+            # Numbers and numeric strings convert; bools are rejected
+            def clean(value):
+                if value.__class__ is bool:
+                    return None, invalid
+                try:
+                    value = float(value)
+                except (ValueError, TypeError):
+                    return None, invalid
+                return finish(value)
+        elif kind is int:
+            def clean(value):
+                return finish(value) if value.__class__ is int else (None, invalid)
+        elif choices is None and max_length is None and items is None:
+            # Common case: a type check plus at most one predicate
+            def clean(value):
+                if value.__class__ is not kind and not isinstance(value, kind):
+                    return None, invalid
+                if check is not None and not check(value):
+                    return None, invalid
+                return value, None
+        else:
+            def clean(value):
+                if value.__class__ is not kind and not isinstance(value, kind):
+                    return None, invalid
+                return finish(value)
+
+        return clean
+
+class Schema:
+    """
+    Declarative JSON payload schema, built once at import
+
+    Args:
+        fields (dict): Field name -> Field
+        checks (list): (predicate on the cleaned payload, error message) pairs
+            run after every field passes
+        partial (bool): Only validate and return fields present in the payload
+            (for PATCH endpoints); defaults are not applied
+    """
+
+    def __init__(self, fields, checks=(), partial=False):
+        self.fields = dict(fields)
+        self._steps = tuple(
+            (name, field.compile(name), field.required, field.required_message or f'{name} is required',
+             field.default, field.kind is str)
+            for name, field in self.fields.items()
+        )
+        self.checks = tuple(checks)
+        self.partial = partial
+
+    def validate(self, data):
+        """
+        Validate and convert a payload in a single pass
+
+        Returns:
+            tuple: (cleaned payload dict, None) or (None, first error message)
+        """
+        if not isinstance(data, dict):
+            return None, 'Request body must be a JSON object'
+
+        clean = {}
+        apply_defaults = not self.partial
+        for name, clean_value, required, required_message, default, is_str in self._steps:
+            value = data.get(name)
+
+            if value is None or value == '':
+                if required:
+                    return None, required_message
+                if name not in data:
+                    if apply_defaults and default is not MISSING:
+                        clean[name] = default
+                    continue
+                # Explicit null / empty clears an optional field
+                clean[name] = '' if value == '' and is_str else None
+                continue
+
+            value, error = clean_value(value)
+            if error:
+                return None, error
+            clean[name] = value
+
+        for check, message in self.checks:
+            if not check(clean):
+                return None, message
+        return clean, None
+
+def use_schema(schema):
+    """
+    Validate the JSON body against a schema before the view runs
+
+    The view receives the cleaned payload as the `payload` keyword argument;
+    invalid bodies get a 400 with a single `error` message.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            payload, error = schema.validate(request.get_json(silent=True))
+            if error:
+                return make_response({'error': error}, 400)
+            return view(*args, payload=payload, **kwargs)
+        return wrapper
+    return decorator
+
+# ------------------ Field Checks ------------------
+
+def is_gmail(value):
+    return GMAIL_PATTERN.match(value) is not None
+
+def is_phone_number(value):
+    return PHONE_PATTERN.match(PHONE_SEPARATORS.sub('', value)) is not None
+
+def is_media_url(media_type):
+    extensions = MEDIA_EXTENSIONS[media_type]
+    return lambda value: MEDIA_URL_PATTERN.match(value) is not None and value.lower().endswith(extensions)
+
+def in_range(low, high):
+    return lambda value: low <= value <= high
+
+# ------------------ Endpoint Schemas ------------------
+
+SIGNUP = Schema({
+    'name': Field(str, required=True, required_message='Name, email, and password are required'),
+    'email': Field(str, required=True, check=is_gmail,
+                   required_message='Name, email, and password are required',
+                   message='Email must be a valid Gmail address (@gmail.com)'),
+    'password': Field(str, required=True, check=lambda p: len(p) >= 6,
+                      required_message='Name, email, and password are required',
+                      message='Password must be at least 6 characters long'),
+    'phone_number': Field(str, check=is_phone_number, message='Invalid phone number'),
+})
+
+ADMIN_SIGNUP = Schema({
+    'name': Field(str, required=True, required_message='Name, email, and password are required'),
+    'email': Field(str, required=True, required_message='Name, email, and password are required'),
+    'password': Field(str, required=True, required_message='Name, email, and password are required'),
+})
+
+LOGIN = Schema({
+    'email': Field(str, required=True, required_message='Email and password are required'),
+    'password': Field(str, required=True, required_message='Email and password are required'),
+})
+
+_RECORD_LOCATION_FIELDS = {
+    'latitude': Field(float, check=in_range(-90, 90), message='Invalid coordinates provided'),
+    'longitude': Field(float, check=in_range(-180, 180), message='Invalid coordinates provided'),
+    'location_name': Field(str, max_length=255),
+    'urgency_level': Field(str, default='medium', choices=URGENCY_LEVELS,
+                           message=f'Urgency level must be one of: {", ".join(URGENCY_LEVELS)}'),
+    'image_url': Field(str, check=is_media_url('image'), message='Invalid image URL format'),
+    'video_url': Field(str, check=is_media_url('video'), message='Invalid video URL format'),
+}
+
+ANONYMOUS_REPORT = Schema({
+    'title': Field(str, required=True, max_length=200, required_message='Title and description are required'),
+    'description': Field(str, required=True, required_message='Title and description are required'),
+    'type': Field(str, required=True, choices=RECORD_TYPES,
+                  required_message=f'Type must be one of: {", ".join(RECORD_TYPES)}',
+                  message=f'Type must be one of: {", ".join(RECORD_TYPES)}'),
+    **_RECORD_LOCATION_FIELDS,
+})
+
+CREATE_RECORD = Schema({
+    'title': Field(str, required=True, max_length=200, required_message='Title is required'),
+    'description': Field(str, default=''),
+    # Unknown types fall back to red-flag rather than failing
+    'type': Field(str, default='red-flag', choices=RECORD_TYPES, fallback=True),
+    **_RECORD_LOCATION_FIELDS,
+})
+
+UPDATE_RECORD = Schema({
+    'title': Field(str, max_length=200),
+    'description': Field(str),
+    'type': Field(str, choices=RECORD_TYPES, message=f'Type must be one of: {", ".join(RECORD_TYPES)}'),
+    'latitude': Field(float, check=in_range(-90, 90), message='Invalid coordinates'),
+    'longitude': Field(float, check=in_range(-180, 180), message='Invalid coordinates'),
+    'location_name': Field(str, max_length=255),
+    'urgency_level': Field(str, choices=URGENCY_LEVELS,
+                           message=f'Urgency level must be one of: {", ".join(URGENCY_LEVELS)}'),
+    'image_url': Field(str, check=is_media_url('image'), message='Invalid image URL'),
+    'video_url': Field(str, check=is_media_url('video'), message='Invalid video URL'),
+}, partial=True)
+
+VOTE = Schema({
+    'vote_type': Field(str, default='support', choices=VOTE_TYPES, message='Vote type must be "support" or "urgent"'),
+})
+
+UPDATE_STATUS = Schema({
+    'status': Field(str, required=True, choices=ADMIN_STATUSES, required_message='Invalid status', message='Invalid status'),
+    'reason': Field(str, default=''),
+    'resolution_notes': Field(str),
+    'urgent': Field(bool, default=False, message='urgent must be true or false'),
+})
+
+BULK_UPDATE_STATUS = Schema({
+    **UPDATE_STATUS.fields,
+    'ids': Field(list, items=int, message='ids must be a list of integers'),
+    'filter': Field(dict, check=lambda f: set(f) <= BULK_STATUS_FILTERS,
+                    message=f'Unsupported filter; use {", ".join(sorted(BULK_STATUS_FILTERS))}'),
+}, checks=[
+    (lambda p: p.get('ids') or p.get('filter'), 'Provide a list of ids or a filter'),
+])
+
+CLAIM_QUEUE = Schema({
+    'count': Field(int, default=1, check=in_range(1, 50), message='count must be between 1 and 50'),
+    'ids': Field(list, items=int, check=lambda ids: 0 < len(ids) <= 50,
+                 message='ids must be a list of 1 to 50 integers'),
+})
+
+# Records per batch read (POST /records/batch-get, GET /public/records?ids=)
+MAX_BATCH_IDS = 100
+
+BATCH_GET = Schema({
+    'ids': Field(list, required=True, items=int, check=lambda ids: 0 < len(ids) <= MAX_BATCH_IDS,
+                 required_message='ids is required',
+                 message=f'ids must be a list of 1 to {MAX_BATCH_IDS} integers'),
+})
+
+UPLOAD_REQUEST = Schema({
+    'filename': Field(str, required=True, max_length=255, required_message='filename is required'),
+    'content_type': Field(str, required=True, choices=MEDIA_CONTENT_TYPES,
+                          required_message='content_type is required',
+                          message=f'content_type must be one of: {", ".join(MEDIA_CONTENT_TYPES)}'),
+    'size': Field(int, required=True, check=lambda n: n > 0, required_message='size is required',
+                  message='size must be a positive number of bytes'),
+})
+
+UPLOAD_COMPLETE = Schema({
+    'upload_id': Field(str, required=True, required_message='upload_id is required'),
+})
+
+UPDATE_PROFILE = Schema({
+    'name': Field(str, max_length=80),
+    'phone_number': Field(str, check=is_phone_number, message='Invalid phone number'),
+}, partial=True)
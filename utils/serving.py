@@ -0,0 +1,46 @@
+# utils/serving.py
+import os
+
+from utils.database import pool_limits
+
+def worker_settings(cpu_count=None, environment=None, max_db_connections=None):
+    """
+    Derive gunicorn worker and thread counts from CPU count and DB pool size
+
+    Each worker process owns a pool of pool_size + max_overflow connections and
+    runs one thread per pooled connection, so requests never queue on the pool.
+    Workers default to 2 * CPUs + 1, capped so that every worker's pool fits
+    within the database's connection budget.
+
+    Args:
+        cpu_count (int): CPUs available, defaults to os.cpu_count()
+        environment (str): Pool profile name, defaults to FLASK_ENV
+        max_db_connections (int): Connections the database allows this service,
+            defaults to DB_MAX_CONNECTIONS (100)
+
+    Returns:
+        dict: {'workers', 'threads', 'connections_per_worker', 'max_connections'}
+        WEB_CONCURRENCY and GUNICORN_THREADS override the derived values.
+    """
+    cpu_count = cpu_count or os.cpu_count() or 1
+    if max_db_connections is None:
+        max_db_connections = int(os.getenv('DB_MAX_CONNECTIONS', 100))
+
+    limits = pool_limits(environment)
+    connections_per_worker = limits['pool_size'] + limits['max_overflow']
+
+    workers = 2 * cpu_count + 1
+    workers = max(1, min(workers, max_db_connections // connections_per_worker))
+    threads = limits['pool_size']
+
+    if os.getenv('WEB_CONCURRENCY'):
+        workers = int(os.getenv('WEB_CONCURRENCY'))
+    if os.getenv('GUNICORN_THREADS'):
+        threads = int(os.getenv('GUNICORN_THREADS'))
+
+    return {
+        'workers': workers,
+        'threads': threads,
+        'connections_per_worker': connections_per_worker,
+        'max_connections': workers * connections_per_worker,
+    }
@@ -0,0 +1,192 @@
+# utils/similarity.py
+import hashlib
+import math
+import os
+import random
+import re
+import struct
+from datetime import datetime
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from models import db, Record, RecordFingerprint, RecordLshBucket
+
+# 20 bands of 3 rows: pairs with Jaccard similarity 0.6 share a band ~99% of the
+# time, 0.4 ~73% and 0.2 ~15%, so candidates are filtered by the estimate below
+NUM_PERMUTATIONS = 60
+BANDS = 20
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+# Bound on candidates scored per lookup (largest band overlap first), so viral
+# incidents with thousands of copies stay cheap
+MAX_CANDIDATES = 200
+INDEX_BATCH_SIZE = 1000
+
+_PRIME = (1 << 61) - 1
+_SIGNATURE = struct.Struct(f'<{NUM_PERMUTATIONS}Q')
+_BAND = struct.Struct(f'<{ROWS_PER_BAND}Q')
+_WORD = re.compile(r'\w+')
+EARTH_RADIUS_METERS = 6371000
+
+def init_similarity(app):
+    """Read duplicate detection settings and register the index-duplicates command"""
+    app.config.setdefault('DUPLICATE_SIMILARITY', float(os.getenv('DUPLICATE_SIMILARITY', 0.6)))
+    app.config.setdefault('DUPLICATE_RADIUS_METERS', float(os.getenv('DUPLICATE_RADIUS_METERS', 1000)))
+    app.config.setdefault('DUPLICATE_MAX_RESULTS', int(os.getenv('DUPLICATE_MAX_RESULTS', 5)))
+    app.cli.add_command(index_duplicates_command)
+
+# ------------------ Signatures ------------------
+
+def _permutations(seed):
+    # Fixed seed: signatures are stored, so every process must hash the same way
+    rng = random.Random(seed)
+    return [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(NUM_PERMUTATIONS)]
+
+_PERMUTATIONS = _permutations(20240611)
+
+def _hash64(data):
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'little')
+
+def shingles(text):
+    """Word bigrams of the lowercased text (the single word for one-word texts)"""
+    words = _WORD.findall(text.lower())
+    if len(words) < 2:
+        return set(words)
+    return {f'{first} {second}' for first, second in zip(words, words[1:])}
+
+def minhash(title, description=''):
+    """MinHash signature of a report's title and description"""
+    hashes = [_hash64(shingle.encode()) for shingle in shingles(f'{title}\n{description or ""}')]
+    if not hashes:
+        return (_PRIME,) * NUM_PERMUTATIONS
+    return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS)
+
+def band_buckets(signature):
+    """(band, bucket) keys for LSH; buckets fit a signed 64-bit column"""
+    return [(band, _hash64(_BAND.pack(*signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND])) >> 1)
+            for band in range(BANDS)]
+
+def estimate_similarity(first, second):
+    """Estimated Jaccard similarity of two signatures"""
+    return sum(a == b for a, b in zip(first, second)) / NUM_PERMUTATIONS
+
+def distance_meters(lat1, lng1, lat2, lng2):
+    """Great-circle (haversine) distance"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = (math.sin((phi2 - phi1) / 2) ** 2
+         + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lng2 - lng1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_METERS * math.asin(math.sqrt(a))
+
+# ------------------ Index Maintenance ------------------
+
+def index_records(rows):
+    """
+    Add fingerprints and LSH buckets for new records with bulk inserts (caller commits)
+
+    Args:
+        rows (list): (record_id, title, description) tuples
+    """
+    if not rows:
+        return
+    now = datetime.utcnow()
+    fingerprints, buckets = [], []
+    for record_id, title, description in rows:
+        signature = minhash(title, description)
+        fingerprints.append({'record_id': record_id, 'signature': _SIGNATURE.pack(*signature), 'updated_at': now})
+        buckets.extend({'record_id': record_id, 'band': band, 'bucket': bucket}
+                       for band, bucket in band_buckets(signature))
+    db.session.execute(db.insert(RecordFingerprint), fingerprints)
+    db.session.execute(db.insert(RecordLshBucket), buckets)
+
+def index_record(record, replace=False):
+    """Fingerprint one record; replace=True after its title or description changed (caller commits)"""
+    if replace:
+        RecordLshBucket.query.filter_by(record_id=record.id).delete(synchronize_session=False)
+        RecordFingerprint.query.filter_by(record_id=record.id).delete(synchronize_session=False)
+    index_records([(record.id, record.title, record.description)])
+
+# ------------------ Lookup ------------------
+
+def find_similar(record, threshold, radius_meters, limit, visible=None):
+    """
+    Likely duplicates of a record, most similar first
+
+    Candidates come from LSH bucket matches (an indexed lookup, independent of
+    table size), are scored by estimated text similarity, and are dropped when
+    both reports have coordinates further apart than radius_meters.
+
+    Args:
+        visible: Optional filter clause on Record limiting which reports may be returned
+
+    Returns:
+        list: [{'id', 'title', 'type', 'status', 'created_at', 'similarity', 'distance_meters'}]
+    """
+    signature = minhash(record.title, record.description)
+    candidates = (db.session.query(RecordLshBucket.record_id)
+                  .filter(db.tuple_(RecordLshBucket.band, RecordLshBucket.bucket).in_(band_buckets(signature)),
+                          RecordLshBucket.record_id != record.id)
+                  .group_by(RecordLshBucket.record_id)
+                  .order_by(db.func.count().desc(), RecordLshBucket.record_id.desc())
+                  .limit(MAX_CANDIDATES))
+
+    query = (db.session.query(Record.id, Record.title, Record.type, Record.status, Record.created_at,
+                              Record.latitude, Record.longitude, RecordFingerprint.signature)
+             .join(RecordFingerprint, RecordFingerprint.record_id == Record.id)
+             .filter(Record.id.in_(candidates.scalar_subquery())))
+    if visible is not None:
+        query = query.filter(visible)
+
+    located = record.latitude is not None and record.longitude is not None
+    matches = []
+    for row in query:
+        similarity = estimate_similarity(signature, _SIGNATURE.unpack(row.signature))
+        if similarity < threshold:
+            continue
+        distance = None
+        if located and row.latitude is not None and row.longitude is not None:
+            distance = distance_meters(record.latitude, record.longitude, row.latitude, row.longitude)
+            if distance > radius_meters:
+                continue
+        matches.append({
+            'id': row.id,
+            'title': row.title,
+            'type': row.type,
+            'status': row.status,
+            'created_at': row.created_at.isoformat(),
+            'similarity': round(similarity, 2),
+            'distance_meters': round(distance) if distance is not None else None,
+        })
+
+    # Nearby reports win ties; unlocated ones sort after located ones
+    matches.sort(key=lambda m: (-m['similarity'], m['distance_meters'] is None, m['distance_meters'] or 0))
+    return matches[:limit]
+
+def find_duplicates(record, visible=None, limit=None):
+    """find_similar() with the configured DUPLICATE_* settings"""
+    config = current_app.config
+    return find_similar(record, config['DUPLICATE_SIMILARITY'], config['DUPLICATE_RADIUS_METERS'],
+                        limit or config['DUPLICATE_MAX_RESULTS'], visible)
+
+def index_missing_records(batch_size=INDEX_BATCH_SIZE):
+    """Fingerprint records that have no fingerprint yet, committing per batch; returns the number indexed"""
+    indexed, last_id = 0, 0
+    while True:
+        rows = (db.session.query(Record.id, Record.title, Record.description)
+                .outerjoin(RecordFingerprint, RecordFingerprint.record_id == Record.id)
+                .filter(RecordFingerprint.record_id.is_(None), Record.id > last_id)
+                .order_by(Record.id)
+                .limit(batch_size)
+                .all())
+        if not rows:
+            return indexed
+        index_records([tuple(row) for row in rows])
+        db.session.commit()
+        indexed += len(rows)
+        last_id = rows[-1].id
+
+@click.command('index-duplicates')
+@with_appcontext
+def index_duplicates_command():
+    """Fingerprint records created before duplicate detection was enabled"""
+    click.echo(f"Indexed {index_missing_records()} record(s)")
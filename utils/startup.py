@@ -0,0 +1,129 @@
+# utils/startup.py
+import os
+import re
+import subprocess
+import sys
+
+import click
+from flask.cli import with_appcontext
+
+_IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$')
+
+class LazyGroup(click.Group):
+    """
+    Click command group whose real implementation is imported on first use
+
+    Lets create_app register CLI groups (e.g. `flask db`) without importing
+    heavy packages such as alembic for every web worker and test run.
+    """
+
+    def __init__(self, name, load, **kwargs):
+        super().__init__(name, **kwargs)
+        self._load = load
+        self._group = None
+
+    def _impl(self):
+        if self._group is None:
+            self._group = self._load()
+        return self._group
+
+    def list_commands(self, ctx):
+        return self._impl().list_commands(ctx)
+
+    def get_command(self, ctx, name):
+        return self._impl().get_command(ctx, name)
+
+    def make_context(self, info_name, args, parent=None, **extra):
+        # Hand parsing and invocation to the real group so its own options apply
+        return self._impl().make_context(info_name, args, parent=parent, **extra)
+
+def parse_importtime(output):
+    """
+    Parse `python -X importtime` stderr output
+
+    Returns:
+        list: [{'module', 'self_us', 'cumulative_us', 'depth'}] in import order
+    """
+    entries = []
+    for line in output.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            entries.append({
+                'module': module,
+                'self_us': int(self_us),
+                'cumulative_us': int(cumulative_us),
+                'depth': len(indent) // 2,
+            })
+    return entries
+
+def summarize_importtime(output, top=15):
+    """
+    Summarize importtime output into total, slowest top-level imports and
+    slowest individual modules
+
+    Returns:
+        dict: {'total_ms', 'top_level': [...], 'self': [...]}
+    """
+    entries = parse_importtime(output)
+    top_level = [e for e in entries if e['depth'] == 0]
+    return {
+        'total_ms': sum(e['cumulative_us'] for e in top_level) / 1000,
+        'top_level': sorted(top_level, key=lambda e: e['cumulative_us'], reverse=True)[:top],
+        'self': sorted(entries, key=lambda e: e['self_us'], reverse=True)[:top],
+    }
+
+def profile_startup(root_path, statement='import app; app.create_app()'):
+    """Run `statement` in a fresh interpreter with -X importtime and return its stderr"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        cwd=root_path,
+        capture_output=True,
+        text=True,
+        env={**os.environ, 'PYTHONDONTWRITEBYTECODE': '1'},
+    )
+    return result.stderr
+
+@click.command('import-profile')
+@click.option('--top', default=15, show_default=True, help='Number of modules to list')
+@click.option('--statement', default='import app; app.create_app()', show_default=True,
+              help='Python statement to profile')
+def import_profile_command(top, statement):
+    """Report where interpreter start-up time goes (python -X importtime)"""
+    root_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    summary = summarize_importtime(profile_startup(root_path, statement), top=top)
+
+    click.echo(f"Total import time: {summary['total_ms']:.1f} ms")
+    click.echo("\nSlowest top-level imports (cumulative):")
+    for entry in summary['top_level']:
+        click.echo(f"  {entry['cumulative_us'] / 1000:>9.1f} ms  {entry['module']}")
+    click.echo("\nSlowest modules (self):")
+    for entry in summary['self']:
+        click.echo(f"  {entry['self_us'] / 1000:>9.1f} ms  {entry['module']}")
+
+@click.command('init-db')
+@click.option('--admin-email', default=lambda: os.getenv('DEFAULT_ADMIN_EMAIL', 'admin@jiseti.go.ke'),
+              show_default='DEFAULT_ADMIN_EMAIL or admin@jiseti.go.ke', help='Email for the default admin')
+@click.option('--admin-password', default=lambda: os.getenv('DEFAULT_ADMIN_PASSWORD', 'admin123'),
+              show_default='DEFAULT_ADMIN_PASSWORD or admin123', help='Password for the default admin')
+@with_appcontext
+def init_db_command(admin_email, admin_password):
+    """Create database tables and a default admin if none exists (run once per deploy)"""
+    from werkzeug.security import generate_password_hash
+    from models import db, Administrator
+
+    db.create_all()
+    click.echo("Database tables created successfully")
+
+    if Administrator.query.first():
+        click.echo("Admin account already exists, skipping default admin")
+        return
+
+    db.session.add(Administrator(
+        name="Default Admin",
+        email=admin_email,
+        password=generate_password_hash(admin_password),
+        admin_number="ADM-DEFAULT-001"
+    ))
+    db.session.commit()
+    click.echo(f"Default admin created: {admin_email}")
@@ -0,0 +1,304 @@
+# utils/storage.py
+import hashlib
+import hmac
+import os
+import re
+import shutil
+import tempfile
+import time
+from urllib.parse import urlencode
+
+from flask import current_app, has_request_context, make_response, request, send_file
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+from werkzeug.security import safe_join
+
+KEY_PATTERN = re.compile(r'^[A-Za-z0-9][A-Za-z0-9/_.-]*$')
+COPY_CHUNK_SIZE = 1024 * 1024
+UPLOAD_TICKET_SALT = 'jiseti-media-upload'
+
+class LocalStore:
+    """
+    Filesystem stand-in for an S3-compatible bucket (development and tests)
+
+    Presigned URLs point at this app's /storage/<key> endpoint and carry an
+    HMAC over the key, content type, size limit and expiry, so clients follow
+    the same flow as with S3. Uploads do pass through the API process here;
+    deployments use S3Store so large files never touch the workers.
+    """
+
+    def __init__(self, root, secret, base_url=''):
+        self.root = root
+        self.secret = secret.encode()
+        self.base_url = base_url
+
+    def _base_url(self):
+        if self.base_url:
+            return self.base_url.rstrip('/')
+        return request.host_url.rstrip('/') if has_request_context() else ''
+
+    def path_for(self, key):
+        """Filesystem path for a key, or None if the key is not a safe relative path"""
+        if not KEY_PATTERN.match(key) or '..' in key.split('/'):
+            return None
+        return safe_join(self.root, key)
+
+    def _signature(self, key, content_type, max_bytes, expires):
+        message = f"PUT\n{key}\n{content_type}\n{max_bytes}\n{expires}".encode()
+        return hmac.new(self.secret, message, hashlib.sha256).hexdigest()
+
+    def presign_upload(self, key, content_type, max_bytes, expires_in):
+        expires = int(time.time()) + expires_in
+        query = urlencode({
+            'content_type': content_type,
+            'max_bytes': max_bytes,
+            'expires': expires,
+            'signature': self._signature(key, content_type, max_bytes, expires),
+        })
+        return {
+            'method': 'PUT',
+            'url': f"{self._base_url()}/storage/{key}?{query}",
+            'headers': {'Content-Type': content_type},
+        }
+
+    def verify_upload(self, key, args):
+        """
+        Check a presigned upload URL's query arguments
+
+        Returns:
+            tuple: (content type, max bytes), or None if invalid or expired
+        """
+        try:
+            content_type = args['content_type']
+            max_bytes = int(args['max_bytes'])
+            expires = int(args['expires'])
+            signature = args['signature']
+        except (KeyError, ValueError):
+            return None
+        if expires < time.time():
+            return None
+        if not hmac.compare_digest(signature, self._signature(key, content_type, max_bytes, expires)):
+            return None
+        return content_type, max_bytes
+
+    def write(self, key, stream, max_bytes):
+        """
+        Stream an upload to disk in chunks
+
+        Returns:
+            int: Bytes written, or None if the upload exceeded max_bytes (nothing is kept)
+        """
+        path = self.path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, partial = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.upload-')
+        size = 0
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                while True:
+                    chunk = stream.read(COPY_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if size > max_bytes:
+                        return None
+                    out.write(chunk)
+            os.replace(partial, path)
+            return size
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
+
+    def stat(self, key):
+        path = self.path_for(key)
+        if not path or not os.path.isfile(path):
+            return None
+        return {'size': os.path.getsize(path), 'content_type': None}
+
+    def read(self, key):
+        with open(self.path_for(key), 'rb') as f:
+            return f.read()
+
+    def download(self, key, path):
+        shutil.copyfile(self.path_for(key), path)
+
+    def sha256(self, key):
+        """Hex SHA-256 of a stored object, read in chunks"""
+        digest = hashlib.sha256()
+        with open(self.path_for(key), 'rb') as f:
+            for chunk in iter(lambda: f.read(COPY_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def save(self, key, data, content_type):
+        """Store bytes, or the file at a path, under key (replacing any existing object)"""
+        path = self.path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, partial = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                if isinstance(data, bytes):
+                    out.write(data)
+                else:
+                    with open(data, 'rb') as source:
+                        shutil.copyfileobj(source, out, COPY_CHUNK_SIZE)
+            os.replace(partial, path)
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
+
+    def public_url(self, key):
+        return f"{self._base_url()}/storage/{key}"
+
+    def delete(self, key):
+        path = self.path_for(key)
+        if path and os.path.isfile(path):
+            os.remove(path)
+
+class S3Store:
+    """
+    S3-compatible bucket (AWS S3, MinIO, ...) through boto3, imported on first use
+
+    Uploads use presigned POST policies, which unlike presigned PUTs make the
+    store itself enforce the content type and maximum size.
+    """
+
+    def __init__(self, bucket, endpoint_url=None, region=None, public_url=None):
+        self.bucket = bucket
+        self.endpoint_url = endpoint_url
+        self.region = region
+        self.public_base = public_url
+        self._client = None
+
+    @property
+    def client(self):
+        # Created on first use, i.e. after gunicorn forks its workers
+        if self._client is None:
+            import boto3
+            self._client = boto3.client('s3', endpoint_url=self.endpoint_url, region_name=self.region)
+        return self._client
+
+    def presign_upload(self, key, content_type, max_bytes, expires_in):
+        post = self.client.generate_presigned_post(
+            Bucket=self.bucket,
+            Key=key,
+            Fields={'Content-Type': content_type},
+            Conditions=[{'Content-Type': content_type}, ['content-length-range', 1, max_bytes]],
+            ExpiresIn=expires_in
+        )
+        return {'method': 'POST', 'url': post['url'], 'fields': post['fields']}
+
+    def stat(self, key):
+        from botocore.exceptions import ClientError
+        try:
+            head = self.client.head_object(Bucket=self.bucket, Key=key)
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return None
+            raise
+        return {'size': head['ContentLength'], 'content_type': head.get('ContentType')}
+
+    def read(self, key):
+        return self.client.get_object(Bucket=self.bucket, Key=key)['Body'].read()
+
+    def download(self, key, path):
+        self.client.download_file(self.bucket, key, path)
+
+    def sha256(self, key):
+        """Hex SHA-256 of a stored object, streamed from the bucket"""
+        digest = hashlib.sha256()
+        for chunk in self.client.get_object(Bucket=self.bucket, Key=key)['Body'].iter_chunks(COPY_CHUNK_SIZE):
+            digest.update(chunk)
+        return digest.hexdigest()
+
+    def save(self, key, data, content_type):
+        """Store bytes, or the file at a path, under key (replacing any existing object)"""
+        if isinstance(data, bytes):
+            self.client.put_object(Bucket=self.bucket, Key=key, Body=data, ContentType=content_type)
+        else:
+            self.client.upload_file(data, self.bucket, key, ExtraArgs={'ContentType': content_type})
+
+    def public_url(self, key):
+        if self.public_base:
+            return f"{self.public_base.rstrip('/')}/{key}"
+        if self.endpoint_url:
+            return f"{self.endpoint_url.rstrip('/')}/{self.bucket}/{key}"
+        return f"https://{self.bucket}.s3.amazonaws.com/{key}"
+
+    def delete(self, key):
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+
+def init_storage(app):
+    """
+    Configure the media object store (STORAGE_BACKEND=local or s3)
+
+    The local backend also registers the /storage/<key> endpoints its
+    presigned URLs point at.
+    """
+    config = app.config
+    config.setdefault('STORAGE_BACKEND', os.getenv('STORAGE_BACKEND', 'local'))
+    config.setdefault('STORAGE_LOCAL_PATH', os.getenv('STORAGE_LOCAL_PATH', os.path.join(app.instance_path, 'uploads')))
+    config.setdefault('STORAGE_PUBLIC_URL', os.getenv('STORAGE_PUBLIC_URL', ''))
+    config.setdefault('STORAGE_BUCKET', os.getenv('STORAGE_BUCKET', 'jiseti-media'))
+    config.setdefault('STORAGE_ENDPOINT_URL', os.getenv('STORAGE_ENDPOINT_URL') or None)
+    config.setdefault('STORAGE_REGION', os.getenv('STORAGE_REGION') or None)
+    config.setdefault('UPLOAD_URL_EXPIRES_SECONDS', int(os.getenv('UPLOAD_URL_EXPIRES_SECONDS', 900)))
+    config.setdefault('UPLOAD_COMPLETE_SECONDS', int(os.getenv('UPLOAD_COMPLETE_SECONDS', 86400)))
+    config.setdefault('UPLOAD_MAX_IMAGE_BYTES', int(os.getenv('UPLOAD_MAX_IMAGE_BYTES', 10 * 1024 * 1024)))
+    config.setdefault('UPLOAD_MAX_VIDEO_BYTES', int(os.getenv('UPLOAD_MAX_VIDEO_BYTES', 500 * 1024 * 1024)))
+
+    if config['STORAGE_BACKEND'] == 's3':
+        store = S3Store(config['STORAGE_BUCKET'], config['STORAGE_ENDPOINT_URL'], config['STORAGE_REGION'],
+                        config['STORAGE_PUBLIC_URL'] or None)
+    else:
+        store = LocalStore(config['STORAGE_LOCAL_PATH'], config['JWT_SECRET_KEY'], config['STORAGE_PUBLIC_URL'])
+        app.add_url_rule('/storage/<path:key>', 'storage_put', put_local_object, methods=['PUT'])
+        app.add_url_rule('/storage/<path:key>', 'storage_get', get_local_object, methods=['GET'])
+
+    app.extensions['jiseti_storage'] = store
+
+def get_storage():
+    return current_app.extensions['jiseti_storage']
+
+def upload_limit(media_type):
+    """Maximum upload size in bytes for 'image' or 'video'"""
+    return current_app.config['UPLOAD_MAX_VIDEO_BYTES' if media_type == 'video' else 'UPLOAD_MAX_IMAGE_BYTES']
+
+def _ticket_serializer():
+    return URLSafeTimedSerializer(current_app.config['JWT_SECRET_KEY'], salt=UPLOAD_TICKET_SALT)
+
+def sign_upload_ticket(ticket):
+    """Signed, stateless upload_id carrying what completion needs to register the Media row"""
+    return _ticket_serializer().dumps(ticket)
+
+def load_upload_ticket(upload_id):
+    """The ticket behind an upload_id, or None if tampered with or older than UPLOAD_COMPLETE_SECONDS"""
+    try:
+        return _ticket_serializer().loads(upload_id, max_age=current_app.config['UPLOAD_COMPLETE_SECONDS'])
+    except BadSignature:
+        return None
+
+# ------------------ Local Stand-in Endpoints ------------------
+
+def put_local_object(key):
+    """Receive an upload sent to a LocalStore presigned URL"""
+    store = get_storage()
+    grant = store.verify_upload(key, request.args) if store.path_for(key) else None
+    if grant is None:
+        return make_response({'error': 'Invalid or expired upload URL'}, 403)
+
+    content_type, max_bytes = grant
+    if request.mimetype != content_type:
+        return make_response({'error': f'Content-Type must be {content_type}'}, 400)
+    if request.content_length is not None and request.content_length > max_bytes:
+        return make_response({'error': 'Upload exceeds the allowed size'}, 413)
+
+    size = store.write(key, request.stream, max_bytes)
+    if size is None:
+        return make_response({'error': 'Upload exceeds the allowed size'}, 413)
+    return make_response({'key': key, 'size': size}, 201)
+
+def get_local_object(key):
+    """Serve a file stored by LocalStore"""
+    path = get_storage().path_for(key)
+    if not path or not os.path.isfile(path):
+        return make_response({'error': 'File not found'}, 404)
+    return send_file(path)
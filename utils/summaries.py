@@ -0,0 +1,88 @@
+# utils/summaries.py
+import click
+from flask.cli import with_appcontext
+
+from models import db, Record, NormalUser, Media, MediaVariant, StatusHistory
+
+SUMMARY_COLUMNS = ('creator_name', 'thumbnail_url', 'media_count', 'status_changed_at')
+REFRESH_BATCH_SIZE = 1000
+
+def init_summaries(app):
+    """Register the refresh-summaries command"""
+    app.cli.add_command(refresh_summaries_command)
+
+def summary_values():
+    """
+    Correlated subqueries computing each summary column from the normalized tables
+
+    The same values routes.py and utils/media.py maintain on write; used to
+    back-fill rows written in bulk (seeders) and to repair drift.
+    """
+    first = db.aliased(Media, name='first_media')
+    first_media = (db.select(first.id)
+                   .where(first.record_id == Record.id)
+                   .order_by(first.position, first.id)
+                   .limit(1)
+                   .correlate(Record)
+                   .scalar_subquery())
+    return {
+        'creator_name': (db.select(NormalUser.name)
+                         .where(NormalUser.id == Record.normal_user_id)
+                         .correlate(Record)
+                         .scalar_subquery()),
+        'thumbnail_url': (db.select(MediaVariant.url)
+                          .join(Media, Media.blob_id == MediaVariant.blob_id)
+                          .where(Media.id == first_media, MediaVariant.content_type.like('image/%'))
+                          .order_by(MediaVariant.width)
+                          .limit(1)
+                          .correlate(Record)
+                          .scalar_subquery()),
+        'media_count': (db.select(db.func.count(Media.id))
+                        .where(Media.record_id == Record.id)
+                        .correlate(Record)
+                        .scalar_subquery()),
+        'status_changed_at': (db.select(db.func.max(StatusHistory.changed_at))
+                              .where(StatusHistory.record_id == Record.id)
+                              .correlate(Record)
+                              .scalar_subquery()),
+    }
+
+def refresh_summaries(record_ids=None, columns=SUMMARY_COLUMNS, batch_size=REFRESH_BATCH_SIZE):
+    """
+    Recompute summary columns with set-based UPDATEs
+
+    With record_ids, updates just those records (caller commits). Without,
+    walks the whole table in id ranges, committing per batch.
+
+    Returns:
+        int: Number of records updated
+    """
+    values = {column: value for column, value in summary_values().items() if column in columns}
+    options = {'synchronize_session': False}
+    if record_ids is not None:
+        if not record_ids:
+            return 0
+        return db.session.execute(db.update(Record).where(Record.id.in_(record_ids)).values(**values),
+                                  execution_options=options).rowcount
+
+    updated, last_id = 0, 0
+    while True:
+        upper = (db.session.query(Record.id)
+                 .filter(Record.id > last_id)
+                 .order_by(Record.id)
+                 .offset(batch_size - 1)
+                 .limit(1)
+                 .scalar())
+        window = Record.id > last_id if upper is None else Record.id.between(last_id + 1, upper)
+        updated += db.session.execute(db.update(Record).where(window).values(**values),
+                                      execution_options=options).rowcount
+        db.session.commit()
+        if upper is None:
+            return updated
+        last_id = upper
+
+@click.command('refresh-summaries')
+@with_appcontext
+def refresh_summaries_command():
+    """Recompute every record's creator name, thumbnail, media count and status time"""
+    click.echo(f"Refreshed {refresh_summaries()} record(s)")
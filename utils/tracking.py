@@ -0,0 +1,131 @@
+# utils/tracking.py
+import hashlib
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+from models import db, Record, StatusHistory, ArchivedRecord
+from utils.metrics import record_cache_lookup
+
+TOKEN_PREFIX = 'ANON-'
+
+def generate_tracking_token():
+    """Random tracking token for an anonymous report (128 bits, shown to the reporter once)"""
+    return f"{TOKEN_PREFIX}{secrets.token_hex(16).upper()}"
+
+def hash_tracking_token(token):
+    """
+    Digest stored in records.tracking_token_hash
+
+    Tokens are random, so a fast unsalted hash is enough to keep them out of
+    the database while still allowing an exact indexed lookup. Surrounding
+    whitespace and letter case are ignored.
+    """
+    return hashlib.sha256(token.strip().upper().encode()).hexdigest()
+
+def find_tracked_report(token_hash):
+    """
+    Status projection of the report with this token hash, one indexed query
+    (plus one on the archive when the report has been archived)
+
+    Returns:
+        dict: Public status fields plus status history, or None if no report matches
+    """
+    rows = (db.session.query(
+                Record.title, Record.type, Record.status, Record.urgency_level, Record.resolution_notes,
+                Record.created_at, Record.updated_at,
+                StatusHistory.old_status, StatusHistory.new_status, StatusHistory.change_reason,
+                StatusHistory.changed_at)
+            .outerjoin(StatusHistory, StatusHistory.record_id == Record.id)
+            .filter(Record.tracking_token_hash == token_hash)
+            .order_by(StatusHistory.changed_at, StatusHistory.id)
+            .all())
+    if not rows:
+        return _archived_report(token_hash)
+
+    report = rows[0]
+    return {
+        'title': report.title,
+        'type': report.type,
+        'status': report.status,
+        'urgency_level': report.urgency_level,
+        'resolution_notes': report.resolution_notes if report.status == 'resolved' else None,
+        'created_at': report.created_at.isoformat(),
+        'updated_at': report.updated_at.isoformat(),
+        # Admin identities are not part of the public projection
+        'history': [{
+            'old_status': row.old_status,
+            'new_status': row.new_status,
+            'change_reason': row.change_reason,
+            'changed_at': row.changed_at.isoformat()
+        } for row in rows if row.new_status is not None]
+    }
+
+def _archived_report(token_hash):
+    report = ArchivedRecord.query.filter_by(tracking_token_hash=token_hash).first()
+    if report is None:
+        return None
+    return {
+        'title': report.title,
+        'type': report.type,
+        'status': report.status,
+        'urgency_level': report.urgency_level,
+        'resolution_notes': report.resolution_notes if report.status == 'resolved' else None,
+        'created_at': report.created_at.isoformat(),
+        'updated_at': report.updated_at.isoformat(),
+        'history': [{key: entry[key] for key in ('old_status', 'new_status', 'change_reason', 'changed_at')}
+                    for entry in report.status_history]
+    }
+
+class TrackingCache:
+    """
+    Small in-process LRU of tracking projections, each kept for `ttl` seconds
+
+    Only found reports are cached, so a token looked up before its report is
+    visible (e.g. on a lagging replica) is not remembered as missing.
+    """
+
+    def __init__(self, ttl=30.0, max_entries=10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # token hash -> (projection, expires)
+        self._lock = threading.Lock()
+
+    def get(self, token_hash, load):
+        """Cached projection for a token hash, calling load(token_hash) on a miss"""
+        with self._lock:
+            entry = self._entries.get(token_hash)
+            if entry is not None and time.monotonic() < entry[1]:
+                self._entries.move_to_end(token_hash)
+                record_cache_lookup('tracking', hit=True)
+                return entry[0]
+
+        record_cache_lookup('tracking', hit=False)
+        projection = load(token_hash)
+        if projection is not None and self.ttl > 0:
+            with self._lock:
+                self._entries[token_hash] = (projection, time.monotonic() + self.ttl)
+                self._entries.move_to_end(token_hash)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return projection
+
+    def invalidate(self, token_hash):
+        with self._lock:
+            self._entries.pop(token_hash, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+tracking_cache = TrackingCache()
+
+def init_tracking(app):
+    """Apply TRACKING_CACHE_SECONDS / TRACKING_CACHE_SIZE to the shared cache"""
+    app.config.setdefault('TRACKING_CACHE_SECONDS', float(os.getenv('TRACKING_CACHE_SECONDS', 30)))
+    app.config.setdefault('TRACKING_CACHE_SIZE', int(os.getenv('TRACKING_CACHE_SIZE', 10000)))
+    tracking_cache.ttl = app.config['TRACKING_CACHE_SECONDS']
+    tracking_cache.max_entries = app.config['TRACKING_CACHE_SIZE']
+    tracking_cache.clear()
@@ -0,0 +1,135 @@
+# utils/triage.py
+from datetime import datetime
+
+import click
+from flask.cli import with_appcontext
+
+from models import db, Record
+
+# Reports waiting for an admin to pick them up
+TRIAGE_STATUSES = ('draft', 'under-investigation')
+
+# Points are roughly hours of waiting: a critical report outranks a medium one
+# until the medium one has waited about 60 hours longer
+URGENCY_POINTS = {'low': 0, 'medium': 12, 'high': 36, 'critical': 72}
+EMERGENCY_POINTS = 48
+VOTE_POINTS = 2
+MAX_VOTE_POINTS = 40
+AGE_POINTS_PER_HOUR = 1.0
+# Keeps stored priorities small; any fixed instant works
+AGE_EPOCH = datetime(2024, 1, 1)
+REFRESH_BATCH_SIZE = 1000
+CLAIM_ATTEMPTS = 3
+
+def priority_points(urgency_level, record_type, vote_count):
+    """Priority of a report before aging"""
+    return (URGENCY_POINTS.get(urgency_level, URGENCY_POINTS['medium'])
+            + (EMERGENCY_POINTS if record_type == 'emergency' else 0)
+            + min((vote_count or 0) * VOTE_POINTS, MAX_VOTE_POINTS))
+
+def _age_hours(moment):
+    return (moment - AGE_EPOCH).total_seconds() / 3600
+
+def triage_priority(urgency_level, record_type, vote_count, created_at, status, assigned_admin_id):
+    """
+    Value stored in records.triage_priority, or None when the report is not in the queue
+
+    Aging is folded in by subtracting the creation time: points + age x rate
+    orders the same as points - created_at x rate, because the current time is
+    the same for every row. Stored values therefore never go stale.
+    """
+    if status not in TRIAGE_STATUSES or assigned_admin_id is not None:
+        return None
+    return priority_points(urgency_level, record_type, vote_count) - _age_hours(created_at) * AGE_POINTS_PER_HOUR
+
+def refresh_priority(record):
+    """Recompute a record's queue priority after its urgency, type, votes, status or assignee changed"""
+    record.triage_priority = triage_priority(
+        record.urgency_level, record.type, record.vote_count, record.created_at or datetime.utcnow(),
+        record.status, record.assigned_admin_id
+    )
+
+def current_priority(stored, now=None):
+    """Aged priority points of a queued report right now"""
+    return round(stored + _age_hours(now or datetime.utcnow()) * AGE_POINTS_PER_HOUR, 1)
+
+def queued_records(limit):
+    """Highest-priority unassigned reports, read straight off the ix_records_triage index"""
+    return (Record.query
+            .filter(Record.triage_priority.isnot(None))
+            .order_by(Record.triage_priority.desc(), Record.id.desc())
+            .limit(limit))
+
+def claim_records(admin_id, count=1, ids=None):
+    """
+    Assign the next queued reports (or the given ones, if still queued) to an admin
+
+    Candidates are locked with FOR UPDATE SKIP LOCKED, so admins claiming at the
+    same time on PostgreSQL get different reports without waiting on each other.
+    Backends without row locks (SQLite) rely on the UPDATE only taking rows that
+    are still unassigned, and top up from the queue if another admin won a race.
+
+    Returns:
+        list: Claimed Record objects, highest priority first (committed)
+    """
+    claimed_ids = []
+    for _ in range(CLAIM_ATTEMPTS):
+        query = Record.query.filter(Record.triage_priority.isnot(None))
+        if ids is not None:
+            query = query.filter(Record.id.in_(ids))
+        candidates = [row.id for row in query.with_entities(Record.id)
+                      .order_by(Record.triage_priority.desc(), Record.id.desc())
+                      .limit(count - len(claimed_ids))
+                      .with_for_update(skip_locked=True)]
+        if not candidates:
+            break
+
+        won = db.session.execute(
+            db.update(Record)
+            .where(Record.id.in_(candidates), Record.assigned_admin_id.is_(None))
+            .values(assigned_admin_id=admin_id, triage_priority=None)
+            .returning(Record.id),
+            execution_options={'synchronize_session': False}
+        ).scalars().all()
+        db.session.commit()
+        claimed_ids.extend(won)
+        if len(won) == len(candidates) or len(claimed_ids) >= count:
+            break
+
+    if not claimed_ids:
+        return []
+    claimed = Record.query.filter(Record.id.in_(claimed_ids)).all()
+    order = {record_id: index for index, record_id in enumerate(claimed_ids)}
+    return sorted(claimed, key=lambda record: order[record.id])
+
+def refresh_all_priorities(batch_size=REFRESH_BATCH_SIZE):
+    """Recompute every record's stored priority (after changing the weights); returns the number updated"""
+    updated, last_id = 0, 0
+    while True:
+        rows = (db.session.query(Record.id, Record.urgency_level, Record.type, Record.vote_count,
+                                 Record.created_at, Record.status, Record.assigned_admin_id)
+                .filter(Record.id > last_id)
+                .order_by(Record.id)
+                .limit(batch_size)
+                .all())
+        if not rows:
+            return updated
+        db.session.execute(db.update(Record), [{
+            'id': row.id,
+            'triage_priority': triage_priority(row.urgency_level, row.type, row.vote_count,
+                                               row.created_at or datetime.utcnow(), row.status,
+                                               row.assigned_admin_id)
+        } for row in rows])
+        db.session.commit()
+        updated += len(rows)
+        last_id = rows[-1].id
+
+def init_triage(app):
+    """Register the refresh-triage command"""
+    app.cli.add_command(refresh_triage_command)
+
+@click.command('refresh-triage')
+@with_appcontext
+def refresh_triage_command():
+    """Recompute the admin queue priority of every record"""
+    click.echo(f"Refreshed {refresh_all_priorities()} record(s)")
@@ -1,15 +1,40 @@
 # utils/validators.py
 import re
-from urllib.parse import urlparse
+
+# Patterns and extension lists are built once at import, not per call
+GMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@gmail\.com$')
+MEDIA_URL_PATTERN = re.compile(r'^https?://[^/?#]+', re.IGNORECASE)
+PHONE_PATTERN = re.compile(r'^\+?[0-9]{10,15}$')
+PHONE_SEPARATORS = re.compile(r'[\s\-\(\)]')
+UNSAFE_CHARACTERS = re.compile(r'[<>\"\'%;()&+]')
+
+MEDIA_EXTENSIONS = {
+    'image': ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp'),
+    'video': ('.mp4', '.avi', '.mov', '.wmv', '.flv', '.webm', '.mkv'),
+}
+
+# Content types accepted for direct uploads -> (media type, stored file extension)
+MEDIA_CONTENT_TYPES = {
+    'image/jpeg': ('image', '.jpg'),
+    'image/png': ('image', '.png'),
+    'image/gif': ('image', '.gif'),
+    'image/webp': ('image', '.webp'),
+    'image/bmp': ('image', '.bmp'),
+    'video/mp4': ('video', '.mp4'),
+    'video/quicktime': ('video', '.mov'),
+    'video/webm': ('video', '.webm'),
+    'video/x-msvideo': ('video', '.avi'),
+    'video/x-matroska': ('video', '.mkv'),
+    'video/x-ms-wmv': ('video', '.wmv'),
+    'video/x-flv': ('video', '.flv'),
+}
 
 def validate_email(email):
     """Validate email format - Gmail only as per requirements"""
     if not email:
         return False
     
-    # Gmail validation pattern
-    gmail_pattern = r'^[a-zA-Z0-9._%+-]+@gmail\.com$'
-    return re.match(gmail_pattern, email) is not None
+    return GMAIL_PATTERN.match(email) is not None
 
 def validate_media_url(url, media_type=None):
     """Validate media URL format and accessibility"""
@@ -17,27 +42,14 @@ def validate_media_url(url, media_type=None):
         return True  # Empty URLs are allowed
     
     try:
-        # Basic URL validation
-        result = urlparse(url)
-        if not all([result.scheme, result.netloc]):
-            return False
-        
-        if result.scheme not in ['http', 'https']:
+        # Basic URL validation - http(s) scheme and a host
+        if not MEDIA_URL_PATTERN.match(url):
             return False
         
         # Media type specific validation
-        if media_type:
-            url_lower = url.lower()
-            
-            if media_type == 'image':
-                image_extensions = ['.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp']
-                if not any(url_lower.endswith(ext) for ext in image_extensions):
-                    return False
-            
-            elif media_type == 'video':
-                video_extensions = ['.mp4', '.avi', '.mov', '.wmv', '.flv', '.webm', '.mkv']
-                if not any(url_lower.endswith(ext) for ext in video_extensions):
-                    return False
+        extensions = MEDIA_EXTENSIONS.get(media_type)
+        if extensions and not url.lower().endswith(extensions):
+            return False
         
         return True
         
@@ -70,11 +82,10 @@ def validate_phone_number(phone):
         return True  # Phone is optional
     
     # Remove spaces and common separators
-    clean_phone = re.sub(r'[\s\-\(\)]', '', phone)
+    clean_phone = PHONE_SEPARATORS.sub('', phone)
     
     # Basic phone validation (digits and + sign)
-    phone_pattern = r'^\+?[0-9]{10,15}$'
-    return re.match(phone_pattern, clean_phone) is not None
+    return PHONE_PATTERN.match(clean_phone) is not None
 
 def validate_password_strength(password):
     """Validate password strength"""
@@ -89,5 +100,63 @@ def sanitize_input(text):
         return text
     
     # Remove potentially harmful characters
-    text = re.sub(r'[<>\"\'%;()&+]', '', text)
+    text = UNSAFE_CHARACTERS.sub('', text)
     return text.strip()
+
+# ------------------ Batch Validators ------------------
+# Column-at-a-time variants for bulk imports and data migrations. Each takes a
+# sequence of values and returns a list of booleans (a mask) in the same order,
+# with the same rules as the single-value validators above.
+
+def validate_emails(emails):
+    """Mask of valid Gmail addresses"""
+    match = GMAIL_PATTERN.match
+    return [bool(email) and match(email) is not None for email in emails]
+
+def validate_media_urls(urls, media_type=None):
+    """Mask of valid media URLs; empty URLs are allowed"""
+    match = MEDIA_URL_PATTERN.match
+    extensions = MEDIA_EXTENSIONS.get(media_type)
+    if extensions:
+        return [not url or (isinstance(url, str) and match(url) is not None and url.lower().endswith(extensions))
+                for url in urls]
+    return [not url or (isinstance(url, str) and match(url) is not None) for url in urls]
+
+def validate_coordinates_batch(latitudes, longitudes):
+    """Mask of valid coordinate pairs; a pair with either value missing is allowed"""
+    try:
+        # Fast path for numeric columns: chained range checks with no per-value conversion
+        return [lat is None or lng is None or (-90 <= lat <= 90 and -180 <= lng <= 180)
+                for lat, lng in zip(latitudes, longitudes)]
+    except TypeError:
+        pass
+
+    mask = []
+    for lat, lng in zip(latitudes, longitudes):
+        if lat is None or lng is None:
+            mask.append(True)
+            continue
+        try:
+            mask.append(-90 <= float(lat) <= 90 and -180 <= float(lng) <= 180)
+        except (ValueError, TypeError):
+            mask.append(False)
+    return mask
+
+def validate_phone_numbers(phones):
+    """Mask of valid phone numbers; empty numbers are allowed"""
+    strip, match = PHONE_SEPARATORS.sub, PHONE_PATTERN.match
+    return [not phone or match(strip('', phone)) is not None for phone in phones]
+
+def sanitize_inputs(texts):
+    """Sanitize a column of text values"""
+    strip = UNSAFE_CHARACTERS.sub
+    return [strip('', text).strip() if text else text for text in texts]
+
+def mask_errors(mask, message):
+    """
+    Turn a validation mask into an error list
+
+    Returns:
+        list: [(index, message)] for each False entry
+    """
+    return [(index, message) for index, ok in enumerate(mask) if not ok]